@@ -0,0 +1,263 @@
+"""
+bench.py
+
+Benchmarks dels punts d'entrada del projecte amb ofertes sintètiques.
+
+Cada benchmark s'executa en un procés nou sobre un CSV generat amb
+`benchmarks.generator`, que es desa a `benchmarks/data/` per reaprofitar-lo.
+Per a cada un es mostra el temps (mediana, mínim i màxim de les repeticions),
+les files per segon i el pic de memòria de la crida mesurada: el màxim
+reservat per sobre del que ja hi havia abans de cridar-la, amb tracemalloc i
+en una execució a part, sense comptar els imports ni la preparació. La
+memòria que reserva pyarrow pel seu compte no hi surt.
+
+Els resultats es comparen amb `baselines.json`: si el temps o la memòria
+superen la referència més la tolerància, el benchmark es marca com a
+regressió i el programa acaba amb codi 1. Les referències depenen de la
+màquina; `--save-baseline` les torna a desar.
+
+    python -m benchmarks.bench --rows 10000 100000
+    python -m benchmarks.bench --only preprocessing clean_salary --save-baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config.log_config import console, Table
+
+
+BENCH_DIR = Path(__file__).parent
+DATA_DIR = BENCH_DIR / "data"
+BASELINES = BENCH_DIR / "baselines.json"
+
+ROWS = [10_000]
+REPEAT = 3
+TOLERANCE = 0.25
+# Marge absolut: els benchmarks de pocs mil·lisegons tenen massa soroll
+MIN_SLACK_SECONDS = 0.01
+# I el mateix per a la memòria de les crides petites
+MIN_SLACK_MB = 1.0
+# Màxim de files per a la selecció de models (entrenar 6 models x 5 folds)
+MODEL_ROWS = 5_000
+
+
+# Cada benchmark rep el CSV i retorna (funció a mesurar, files que processa).
+# La preparació (llegir el CSV, codificar...) no es mesura.
+def _read(path):
+    return pd.read_csv(path)
+
+
+def bench_load_data(path):
+    from data.data import load_data
+    return lambda: load_data(path, cache=False), None
+
+
+def bench_load_data_cached(path):
+    from data.data import load_data
+    load_data(path)                                         # crea la còpia a la memòria cau
+    return lambda: load_data(path), None
+
+
+def _bench_clean(name):
+    def bench(path):
+        from src import preprocessing
+        df = _read(path)
+        return lambda: getattr(preprocessing, name)(df), len(df)
+    bench.__name__ = f"bench_{name}"
+    return bench
+
+
+def bench_preprocessing(path):
+    from src.preprocessing import preprocessing
+    df = _read(path)
+    return lambda: preprocessing(df), len(df)
+
+
+def bench_initial_correlations(path):
+    from src.eda import initial_correlations
+    df = _read(path)
+    # initial_correlations escriu a outputs/eda del directori actual
+    os.chdir(tempfile.mkdtemp())
+    return lambda: initial_correlations(df), len(df)
+
+
+def bench_model_selection(path):
+    import warnings
+
+    from src.encoding import FeatureEncoder
+    from src.evaluation import evaluate_models
+    from src.features import salary_targets
+    from src.models import get_models
+
+    warnings.filterwarnings("ignore")
+    df = _read(path)
+    df = df[df["Salary Estimate"] != "-1"].head(MODEL_ROWS)
+    encoder = FeatureEncoder().fit(df)
+    X, names = encoder.transform(df), encoder.feature_names_
+    y = salary_targets(df)["min_salary"].to_numpy()
+    return lambda: evaluate_models(get_models(), X, y, feature_names=names, n_jobs=1), len(df)
+
+
+CLEAN_FUNCTIONS = ["clean_salary", "clean_founded", "clean_size", "clean_revenue",
+                   "clean_type_of_ownership", "clean_sector", "clean_location"]
+
+BENCHMARKS = {
+    "load_data": bench_load_data,
+    "load_data_cached": bench_load_data_cached,
+    **{name: _bench_clean(name) for name in CLEAN_FUNCTIONS},
+    "preprocessing": bench_preprocessing,
+    "initial_correlations": bench_initial_correlations,
+    "model_selection": bench_model_selection,
+}
+
+
+def _peak_mb(func) -> float:
+    """Pic de memòria reservada durant `func()`, per sobre de la d'abans de cridar-la."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return (peak - before) / 1e6
+
+
+def _run(name: str, path: str, rows: int, repeat: int, cache_dir: str) -> dict:
+    """S'executa en un procés nou: prepara el benchmark i el repeteix."""
+    import contextlib
+    import io
+
+    os.environ["DATA_CACHE_DIR"] = cache_dir
+    func, processed = BENCHMARKS[name](path)
+    times = []
+    # Els missatges de les funcions no surten al resultat
+    with contextlib.redirect_stdout(io.StringIO()):
+        from config.log_config import console as inner
+        inner.quiet = True
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        # tracemalloc alenteix la crida: la memòria es mesura en una execució a part
+        peak_mb = _peak_mb(func)
+    processed = processed or rows
+    median = float(np.median(times))
+    return {"name": name, "rows": processed, "seconds": median, "min": min(times), "max": max(times),
+            "rows_per_s": processed / median, "peak_mb": peak_mb}
+
+
+def dataset(rows: int, seed: int = 0) -> Path:
+    """CSV sintètic de `rows` files (es genera el primer cop)."""
+    from benchmarks.generator import write_postings
+
+    path = DATA_DIR / f"postings-{rows}-{seed}.csv"
+    if not path.exists():
+        write_postings(path, rows, seed)
+    return path
+
+
+def run_benchmarks(names=None, rows=ROWS, repeat: int = REPEAT) -> list:
+    names = names or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Benchmarks desconeguts: {sorted(unknown)}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for n in rows:
+            path = dataset(n)
+            for name in names:
+                # Un procés per benchmark: no hi ha res en memòria dels anteriors
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    result = pool.submit(_run, name, str(path), n, repeat, cache_dir).result()
+                result["dataset"] = n
+                results.append(result)
+                console.print(f"[info]{name} ({n} files):[/info] {result['seconds']:.3f} s")
+    return results
+
+
+def _key(result: dict) -> str:
+    return f"{result['name']}@{result['dataset']}"
+
+
+def load_baselines(path=BASELINES) -> dict:
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_baselines(results: list, path=BASELINES):
+    baselines = load_baselines(path)
+    baselines.update({_key(r): {"seconds": round(r["seconds"], 4), "peak_mb": round(r["peak_mb"], 2)}
+                      for r in results})
+    Path(path).write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
+    console.print(f"[success]Referències desades a {path}[/success]")
+
+
+def compare(results: list, baselines: dict, tolerance: float = TOLERANCE) -> list:
+    """Marca cada resultat amb 'status' (ok / regressió / sense referència). Retorna les regressions."""
+    regressions = []
+    for r in results:
+        base = baselines.get(_key(r))
+        if base is None:
+            r["status"] = "sense referència"
+            continue
+        r["vs_baseline"] = r["seconds"] / base["seconds"]
+        slower = r["seconds"] > base["seconds"] * (1 + tolerance) + MIN_SLACK_SECONDS
+        bigger = r["peak_mb"] > base["peak_mb"] * (1 + tolerance) + MIN_SLACK_MB
+        r["status"] = "regressió" if slower or bigger else "ok"
+        if slower or bigger:
+            regressions.append(r)
+    return regressions
+
+
+def print_results(results: list):
+    table = Table(title="Benchmarks", show_lines=True)
+    for col in ["Benchmark", "Files", "Temps (s)", "Mín / màx (s)", "Files/s", "Pic (MB)", "vs ref.", "Estat"]:
+        table.add_column(col, style="cyan" if col == "Benchmark" else None)
+    for r in results:
+        style = {"ok": "green", "regressió": "red"}.get(r["status"], "yellow")
+        ratio = f"{r['vs_baseline']:.2f}x" if "vs_baseline" in r else "-"
+        table.add_row(r["name"], str(r["rows"]), f"{r['seconds']:.3f}", f"{r['min']:.3f} / {r['max']:.3f}",
+                      f"{r['rows_per_s']:,.0f}", f"{r['peak_mb']:.1f}", ratio, f"[{style}]{r['status']}[/{style}]")
+    console.print(table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks amb ofertes sintètiques")
+    parser.add_argument("--rows", type=int, nargs="+", default=ROWS, help="Mides dels datasets")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks a executar")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Marge sobre la referència abans de marcar una regressió")
+    parser.add_argument("--save-baseline", action="store_true", help="Desar els resultats com a referència")
+    parser.add_argument("--json", help="Desar els resultats en un fitxer JSON")
+    args = parser.parse_args(argv)
+
+    console.rule("[title]Benchmarks[/title]")
+    results = run_benchmarks(args.only, args.rows, args.repeat)
+    regressions = compare(results, load_baselines(), args.tolerance)
+    print_results(results)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        save_baselines(results)
+    elif regressions:
+        console.print(f"[error]{len(regressions)} regressions respecte a la referència[/error]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+generator.py
+
+Generador d'ofertes sintètiques amb les mateixes columnes que DataAnalyst.csv.
+
+Les freqüències per defecte imiten les del dataset de Kaggle (mides, ingressos,
+tipus de propietat, percentatge de '-1' de cada columna, salaris entre 24K i
+190K...). Els atributs de l'empresa (valoració, seu, mida, fundació, indústria i
+sector, ingressos) són els mateixos a totes les seves ofertes, com a les dades
+reals, perquè les imputacions per empresa tinguin sentit. Els títols es
+construeixen combinant nivell, àmbit i sufix, així que n'hi ha molts de
+diferents però uns pocs concentren la majoria de files.
+
+Amb `PostingGenerator.from_csv` les freqüències de les columnes categòriques
+s'aprenen d'un CSV real. Es pot escriure qualsevol nombre de files per blocs
+(`write_postings`) sense tenir-les totes en memòria.
+
+    python -m benchmarks.generator 1000000 ofertes.csv
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config.log_config import console
+from src.features import BEST_WORDS, INDUSTRY_GROUPS
+from src.preprocessing import METRO_MAP
+
+
+COLUMNS = [
+    "Unnamed: 0", "Job Title", "Salary Estimate", "Job Description", "Rating",
+    "Company Name", "Location", "Headquarters", "Size", "Founded", "Type of ownership",
+    "Industry", "Sector", "Revenue", "Competitors", "Easy Apply",
+]
+
+SIZES = {
+    "51 to 200 employees": 421, "10000+ employees": 375, "1001 to 5000 employees": 348,
+    "1 to 50 employees": 347, "201 to 500 employees": 249, "501 to 1000 employees": 211,
+    "-1": 163, "5001 to 10000 employees": 97, "Unknown": 42,
+}
+REVENUES = {
+    "Unknown / Non-Applicable": 615, "$100 to $500 million (USD)": 218, "$50 to $100 million (USD)": 199,
+    "$10+ billion (USD)": 189, "-1": 163, "$10 to $25 million (USD)": 123, "$1 to $5 million (USD)": 112,
+    "$2 to $5 billion (USD)": 111, "$25 to $50 million (USD)": 110, "Less than $1 million (USD)": 102,
+    "$1 to $2 billion (USD)": 76, "$500 million to $1 billion (USD)": 70, "$5 to $10 million (USD)": 64,
+}
+OWNERSHIP = {
+    "Company - Private": 1273, "Company - Public": 452, "-1": 163, "Nonprofit Organization": 124,
+    "Subsidiary or Business Segment": 89, "Government": 37, "College / University": 34, "Hospital": 19,
+    "Unknown": 16, "Other Organization": 13, "Contract": 11, "School / School District": 9,
+    "Private Practice / Firm": 9, "Franchise": 2, "Self-employed": 2,
+}
+# Sector de cada grup d'indústria
+GROUP_SECTOR = {
+    "IT & Software": "Information Technology", "Consulting & Finance": "Finance",
+    "Health & Pharma": "Health Care", "Education": "Education", "Manufacturing & Industrial": "Manufacturing",
+    "Retail & Consumer": "Retail", "Construction & Engineering": "Construction, Repair & Maintenance",
+    "Media & Marketing": "Media", "Government & Public": "Government",
+    "Energy & Utilities": "Oil, Gas, Energy & Utilities", "Transportation": "Transportation & Logistics",
+}
+FOREIGN_HQ = ["London, United Kingdom", "Toronto, Canada", "Bangalore, India", "Paris, France", "Dublin, Ireland"]
+
+# Parts dels títols (nivell + àmbit + rol + sufix) i pes de cada una
+TITLE_LEVELS = {"": 60, "Senior ": 12, "Sr. ": 3, "Junior ": 5, "Lead ": 3, "Principal ": 1, "Entry Level ": 1,
+                "Associate ": 2, "Staff ": 1}
+TITLE_AREAS = {"Data": 55, "Business": 8, "Marketing": 3, "Financial": 3, "Healthcare Data": 2, "Reporting": 2,
+               "SQL Data": 1, "Data Quality": 1, "Data Governance": 1, "Product": 2, "Clinical Data": 1,
+               "Research": 2, "Operations": 2, "Risk": 1, "Pricing": 1}
+TITLE_ROLES = {"Analyst": 85, "Engineer": 4, "Scientist": 3, "Specialist": 4, "Manager": 3, "Intern": 1}
+TITLE_SUFFIXES = {"": 80, " I": 3, " II": 4, " III": 2, " IV": 1, " - Remote": 2, " (Contract)": 2,
+                  ", Analytics": 1, " - Entry Level": 1, " - Healthcare": 1}
+
+DESCRIPTION_WORDS = [
+    "data", "analysis", "team", "business", "experience", "work", "skills", "reporting", "requirements",
+    "information", "management", "ability", "sql", "excel", "python", "tableau", "support", "develop",
+    "years", "degree", "knowledge", "strong", "communication", "including", "analytical", "tools",
+    "process", "quality", "provide", "project", "clients", "systems", "insights", "stakeholders",
+    "dashboards", "statistical", "customer", "opportunity", "benefits", "employer", "equal", "position",
+    "responsibilities", "qualifications", "preferred", "required", "bachelors", "environment", "solutions",
+]
+
+
+def _weighted(pool: dict):
+    values = np.array(list(pool), dtype=object)
+    weights = np.array(list(pool.values()), dtype=float)
+    return values, weights / weights.sum()
+
+
+def _zipf(values, exponent: float = 1.1):
+    weights = 1 / np.arange(1, len(values) + 1) ** exponent
+    return np.array(values, dtype=object), weights / weights.sum()
+
+
+class PostingGenerator:
+    """
+    Args:
+        seed (int): Llavor del generador aleatori.
+        n_companies (int): Empreses diferents. Per defecte 2/3 de les files
+            (com al dataset), amb un màxim de `max_companies`.
+        description_words (int): Paraules mitjanes per descripció.
+    """
+
+    def __init__(self, seed: int = 0, n_companies: int = None, max_companies: int = 200_000,
+                 description_words: int = 400):
+        self.seed = seed
+        self.n_companies = n_companies
+        self.max_companies = max_companies
+        self.description_words = description_words
+        industries = [i for group in INDUSTRY_GROUPS.values() for i in group]
+        self.pools = {
+            "Size": _weighted(SIZES),
+            "Revenue": _weighted(REVENUES),
+            "Type of ownership": _weighted(OWNERSHIP),
+            "Location": _zipf(list(METRO_MAP), 0.8),
+            "Industry": _zipf(["-1"] + industries, 0.9),
+        }
+        self.industry_sector = {i: GROUP_SECTOR[g] for g, group in INDUSTRY_GROUPS.items() for i in group}
+        self.industry_sector["-1"] = "-1"
+
+    @classmethod
+    def from_csv(cls, path, **kwargs) -> "PostingGenerator":
+        """Generador amb les freqüències de les columnes categòriques d'un CSV real."""
+        generator = cls(**kwargs)
+        df = pd.read_csv(path)
+        for col in generator.pools:
+            counts = df[col].astype(str).value_counts()
+            generator.pools[col] = (counts.index.to_numpy(dtype=object), (counts / counts.sum()).to_numpy())
+        pairs = df[["Industry", "Sector"]].astype(str).drop_duplicates("Industry")
+        generator.industry_sector = dict(zip(pairs["Industry"], pairs["Sector"]))
+        return generator
+
+    def _choice(self, rng, col: str, n: int) -> np.ndarray:
+        values, p = self.pools[col]
+        return values[rng.choice(len(values), n, p=p)]
+
+    def _companies(self, rng, n_rows: int) -> pd.DataFrame:
+        n = self.n_companies or min(self.max_companies, max(20, int(n_rows * 2 / 3)))
+        rating = np.where(rng.random(n) < 0.12, -1.0, np.round(np.clip(rng.normal(3.7, 0.6, n), 1, 5), 1))
+        names = np.array([f"Company {i}" for i in range(n)], dtype=object)
+        # Com a Kaggle: el nom porta la valoració darrere d'un salt de línia
+        names = np.where(rating > 0, names + "\n" + rating.astype(str), names)
+        location = self._choice(rng, "Location", n)
+        hq = np.where(rng.random(n) < 0.5, location, self._choice(rng, "Location", n))
+        hq = np.where(rng.random(n) < 0.03, rng.choice(FOREIGN_HQ, n), hq)
+        industry = self._choice(rng, "Industry", n)
+        missing = rng.random(n) < 0.07                      # empreses sense informació
+        founded = np.where(rng.random(n) < 0.22, -1, 2020 - rng.gamma(1.5, 25, n).astype(int))
+        return pd.DataFrame({
+            "Rating": rating,
+            "Company Name": names,
+            "Headquarters": np.where(missing, "-1", hq),
+            "Size": np.where(missing, "-1", self._choice(rng, "Size", n)),
+            "Founded": np.where(missing, -1, founded),
+            "Type of ownership": np.where(missing, "-1", self._choice(rng, "Type of ownership", n)),
+            "Industry": np.where(missing, "-1", industry),
+            "Sector": np.where(missing, "-1", [self.industry_sector.get(i, "-1") for i in industry]),
+            "Revenue": np.where(missing, "-1", self._choice(rng, "Revenue", n)),
+        })
+
+    def _titles(self, rng, n: int) -> np.ndarray:
+        parts = [TITLE_LEVELS, TITLE_AREAS, TITLE_ROLES, TITLE_SUFFIXES]
+        title = np.full(n, "", dtype=object)
+        for i, pool in enumerate(parts):
+            values, p = _weighted(pool)
+            title = title + (" " if i == 2 else "") + values[rng.choice(len(values), n, p=p)]
+        return title
+
+    def _descriptions(self, rng, n: int) -> list:
+        vocabulary = list(dict.fromkeys(DESCRIPTION_WORDS + BEST_WORDS))
+        vocabulary += [f"term{i}" for i in range(2000)]      # cua llarga de paraules rares
+        words, p = _zipf(vocabulary, 1.0)
+        lengths = np.maximum(20, rng.lognormal(np.log(self.description_words), 0.4, n).astype(int))
+        tokens = words[rng.choice(len(words), lengths.sum(), p=p)]
+        out, start = [], 0
+        for length in lengths:
+            doc = tokens[start:start + length]
+            start += length
+            # Paràgrafs de ~60 paraules separats per salts de línia
+            out.append("\n".join(" ".join(doc[i:i + 60]) for i in range(0, length, 60)))
+        return out
+
+    def _salaries(self, rng, n: int) -> np.ndarray:
+        low = np.clip(rng.lognormal(np.log(55), 0.3, n), 24, 113).astype(int)
+        high = low + rng.integers(15, 80, n)
+        salary = np.array([f"${a}K-${b}K (Glassdoor est.)" for a, b in zip(low, high)], dtype=object)
+        salary[rng.random(n) < 0.0005] = "-1"
+        return salary
+
+    def sample(self, n: int, start: int = 0, companies: pd.DataFrame = None, rng=None) -> pd.DataFrame:
+        """`n` ofertes (la columna 'Unnamed: 0' comença a `start`)."""
+        rng = rng or np.random.default_rng(self.seed)
+        companies = companies if companies is not None else self._companies(rng, n)
+        company = companies.iloc[rng.integers(0, len(companies), n)].reset_index(drop=True)
+        # Una part de les ofertes no és a la mateixa ciutat que la seu
+        location = np.where(rng.random(n) < 0.6, company["Headquarters"].to_numpy(),
+                            self._choice(rng, "Location", n))
+        location = np.where(np.isin(location, ["-1", *FOREIGN_HQ]), self._choice(rng, "Location", n), location)
+
+        df = pd.DataFrame({
+            "Unnamed: 0": np.arange(start, start + n),
+            "Job Title": self._titles(rng, n),
+            "Salary Estimate": self._salaries(rng, n),
+            "Job Description": self._descriptions(rng, n),
+            "Rating": company["Rating"],
+            "Company Name": company["Company Name"],
+            "Location": location,
+            "Headquarters": company["Headquarters"],
+            "Size": company["Size"],
+            "Founded": company["Founded"],
+            "Type of ownership": company["Type of ownership"],
+            "Industry": company["Industry"],
+            "Sector": company["Sector"],
+            "Revenue": company["Revenue"],
+            "Competitors": np.where(rng.random(n) < 0.77, "-1",
+                                    [", ".join(f"Company {c}" for c in rng.integers(0, 1000, k))
+                                     for k in rng.integers(1, 4, n)]),
+            "Easy Apply": np.where(rng.random(n) < 0.036, "True", "-1"),
+        })
+        return df[COLUMNS]
+
+    def iter_chunks(self, n: int, chunk_size: int = 100_000):
+        """Blocs d'ofertes fins a `n` files, amb les mateixes empreses a tots els blocs."""
+        rng = np.random.default_rng(self.seed)
+        companies = self._companies(rng, n)
+        for start in range(0, n, chunk_size):
+            yield self.sample(min(chunk_size, n - start), start, companies, rng)
+
+
+def generate_postings(n: int, seed: int = 0, source=None) -> pd.DataFrame:
+    """`n` ofertes sintètiques en un DataFrame."""
+    generator = PostingGenerator.from_csv(source, seed=seed) if source else PostingGenerator(seed)
+    return pd.concat(generator.iter_chunks(n), ignore_index=True)
+
+
+def write_postings(path, n: int, seed: int = 0, chunk_size: int = 100_000, source=None) -> Path:
+    """Escriu `n` ofertes sintètiques a `path` per blocs."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    generator = PostingGenerator.from_csv(source, seed=seed) if source else PostingGenerator(seed)
+    start = time.perf_counter()
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(generator.iter_chunks(n, chunk_size)):
+            chunk.to_csv(f, header=(i == 0), index=False)
+    tmp.replace(path)
+    console.print(f"[info]{n} ofertes sintètiques a {path}[/info] ({time.perf_counter() - start:.1f} s)")
+    return path
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2253
+    out = sys.argv[2] if len(sys.argv) > 2 else f"postings-{n}.csv"
+    write_postings(out, n)
@@ -0,0 +1,226 @@
+"""
+tracing.py
+
+Mesures de temps i memòria de cada etapa (càrrega, neteja, EDA, entrenament,
+predicció).
+
+Per defecte està desactivat i cada etapa instrumentada només comprova un
+booleà. S'activa amb la variable d'entorn PIPELINE_TRACE=1 (també 'true',
+'yes' o 'on'; '0' o 'false' no l'activen) o amb `TRACER.enable()`. Per a cada etapa es desa:
+
+- temps de rellotge i files per segon,
+- files i mida (MB) del DataFrame d'entrada i del de sortida,
+- memòria del procés (RSS) al final i pic des de l'inici del procés.
+
+`TRACER.print_summary()` mostra una taula i `TRACER.export(path)` desa les
+etapes en JSON amb el format de traça de Chrome (es pot obrir a
+chrome://tracing o a https://ui.perfetto.dev). Amb PIPELINE_TRACE_DIR es desa
+una traça per execució en aquest directori en sortir del programa.
+
+    @traced("clean_salary")
+    def clean_salary(df): ...
+
+    with TRACER.stage("train", rows=len(X)) as span:
+        ...
+        span.done(result)
+"""
+
+import atexit
+import functools
+import json
+import os
+import resource
+import time
+from pathlib import Path
+
+from config.log_config import console, Table
+
+
+TRACE_ENV = "PIPELINE_TRACE"
+TRACE_DIR_ENV = "PIPELINE_TRACE_DIR"
+
+_PAGE_MB = os.sysconf("SC_PAGE_SIZE") / 2**20 if hasattr(os, "sysconf") else 0
+
+
+def rss_mb() -> float:
+    """Memòria resident actual del procés en MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Pic de memòria resident del procés en MB (ru_maxrss és en KB a Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def frame_info(obj):
+    """(files, MB) d'un DataFrame, Series, array, matriu dispersa o dict de columnes."""
+    if obj is None:
+        return None, None
+    if isinstance(obj, int):                                       # nombre de files
+        return obj, None
+    if hasattr(obj, "memory_usage") and hasattr(obj, "shape"):    # DataFrame o Series
+        return obj.shape[0], float(obj.memory_usage(index=True, deep=False).sum()) / 1e6
+    if hasattr(obj, "nnz"):                                        # matriu dispersa
+        size = sum(getattr(obj, a).nbytes for a in ("data", "indices", "indptr") if hasattr(obj, a))
+        return obj.shape[0], size / 1e6
+    if hasattr(obj, "nbytes") and hasattr(obj, "shape"):          # array
+        return (obj.shape[0] if obj.shape else 1), obj.nbytes / 1e6
+    if isinstance(obj, dict) and obj:                              # {columna: Series}
+        values = list(obj.values())
+        rows = len(values[0]) if hasattr(values[0], "__len__") else None
+        return rows, sum(getattr(v, "nbytes", 0) for v in values) / 1e6
+    return None, None
+
+
+class Span:
+    """Una etapa en curs. `done(sortida)` registra la mida de la sortida."""
+
+    def __init__(self, tracer, name: str, frame=None, rows: int = None):
+        self.tracer = tracer
+        self.name = name
+        self.rows_in, self.mb_in = frame_info(frame)
+        if rows is not None:
+            self.rows_in = rows
+        self.rows_out = self.mb_out = None
+
+    def done(self, output=None):
+        self.rows_out, self.mb_out = frame_info(output)
+
+    def __enter__(self):
+        self.depth = len(self.tracer._stack)
+        self.tracer._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        self.tracer._stack.pop()
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        self.tracer.records.append({
+            "name": self.name,
+            "depth": self.depth,
+            "start": self.start - self.tracer.origin,
+            "seconds": seconds,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rows_per_s": rows / seconds if rows and seconds > 0 else None,
+            "mb_in": self.mb_in,
+            "mb_out": self.mb_out,
+            "rss_mb": rss_mb(),
+            "peak_rss_mb": peak_rss_mb(),
+            "error": None if exc_type is None else exc_type.__name__,
+        })
+        return False
+
+
+class _NullSpan:
+    """Etapa quan el traçat està desactivat: no fa res."""
+
+    def done(self, output=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.records = []
+        self._stack = []
+        self.origin = time.perf_counter()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+        return self
+
+    def reset(self):
+        self.records = []
+        self._stack = []
+        self.origin = time.perf_counter()
+
+    def stage(self, name: str, frame=None, rows: int = None):
+        """Context manager que mesura una etapa. `frame` és l'entrada (per files i mida)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, frame, rows)
+
+    def print_summary(self):
+        table = Table(title="Etapes (traça)", show_lines=True)
+        for col, style in [("Etapa", "cyan"), ("Temps (s)", "magenta"), ("Files", "green"),
+                           ("Files/s", "green"), ("MB entrada", None), ("MB sortida", None),
+                           ("RSS (MB)", "red"), ("Pic RSS (MB)", "red")]:
+            table.add_column(col, style=style)
+
+        def fmt(value, spec):
+            return "-" if value is None else format(value, spec)
+
+        # Ordre d'inici, amb les etapes niades sagnades
+        for r in sorted(self.records, key=lambda r: r["start"]):
+            rows = r["rows_in"] if r["rows_in"] is not None else r["rows_out"]
+            name = "  " * r["depth"] + r["name"] + (f" [error]({r['error']})[/error]" if r["error"] else "")
+            table.add_row(name, f"{r['seconds']:.3f}", fmt(rows, "d"), fmt(r["rows_per_s"], ",.0f"),
+                          fmt(r["mb_in"], ".1f"), fmt(r["mb_out"], ".1f"),
+                          f"{r['rss_mb']:.0f}", f"{r['peak_rss_mb']:.0f}")
+        console.print(table)
+
+    def export(self, path) -> Path:
+        """Desa les etapes en JSON (format de traça de Chrome, durades en µs)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        events = [{
+            "name": r["name"], "ph": "X", "pid": os.getpid(), "tid": 0,
+            "ts": r["start"] * 1e6, "dur": r["seconds"] * 1e6,
+            "args": {k: v for k, v in r.items() if k not in ("name", "start", "seconds")},
+        } for r in self.records]
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, indent=1))
+        console.print(f"[info]Traça desada a:[/info] {path}")
+        return path
+
+
+def _env_flag(name: str) -> bool:
+    """Variable d'entorn activada: '1', 'true', 'yes' o 'on' (sense distingir majúscules)."""
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+TRACER = Tracer(enabled=_env_flag(TRACE_ENV) or bool(os.environ.get(TRACE_DIR_ENV)))
+
+
+def traced(name: str = None):
+    """
+    Decorador per a funcions d'etapa. El primer argument (si és un
+    DataFrame) és l'entrada i el valor retornat la sortida.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with TRACER.stage(stage_name, args[0] if args else None) as span:
+                result = func(*args, **kwargs)
+                span.done(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def _export_at_exit():
+    if TRACER.records:
+        trace_dir = Path(os.environ[TRACE_DIR_ENV])
+        TRACER.export(trace_dir / f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json")
+
+
+if os.environ.get(TRACE_DIR_ENV):
+    atexit.register(_export_at_exit)
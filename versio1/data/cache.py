@@ -0,0 +1,98 @@
+"""
+cache.py
+
+Memòria cau columnar per als CSV del projecte.
+
+El primer cop que es llegeix un CSV es desa una còpia en format Feather (Arrow)
+sense comprimir, identificada pel hash del contingut del fitxer. Les lectures
+següents fan servir la còpia amb memory-map en lloc de tornar a parsejar el
+CSV. Es desa el DataFrame tal com el retorna `pd.read_csv`, de manera que les
+columnes category només apareixen si `load_data(compact=True)` torna a aplicar
+`compact_dtypes` després de llegir (o si es demanen amb `dtype=` a
+`read_csv_cached`).
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from config.log_config import console
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_ARROW = True
+except ImportError:  # Sense pyarrow no hi ha memòria cau, es llegeix el CSV
+    HAS_ARROW = False
+
+
+CACHE_DIR = Path(os.environ.get("DATA_CACHE_DIR", Path(__file__).parent / "cache"))
+CACHE_SUFFIX = ".feather"
+
+
+def file_hash(path: Path, extra: str = "", chunk_size: int = 1 << 20) -> str:
+    """Hash (blake2b) del contingut del fitxer i, opcionalment, d'un text extra."""
+    digest = hashlib.blake2b(extra.encode(), digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(csv_path: Path, cache_dir: Path = CACHE_DIR, **read_csv_kwargs) -> Path:
+    """Ruta de la còpia columnar: nom del CSV + hash del contingut i dels paràmetres de lectura."""
+    csv_path = Path(csv_path)
+    extra = repr(sorted(read_csv_kwargs.items())) if read_csv_kwargs else ""
+    return Path(cache_dir) / f"{csv_path.stem}-{file_hash(csv_path, extra)}{CACHE_SUFFIX}"
+
+
+def latest_cache(stem: str, cache_dir: Path = CACHE_DIR):
+    """Retorna la còpia més recent d'un CSV (per nom) o None si no n'hi ha."""
+    candidates = sorted(Path(cache_dir).glob(f"{stem}-*{CACHE_SUFFIX}"),
+                        key=lambda p: p.stat().st_mtime)
+    return candidates[-1] if candidates else None
+
+
+def read_cache(path: Path) -> pd.DataFrame:
+    """
+    Llegeix una còpia Feather. El memory-map evita llegir el fitxer sencer a
+    memòria, però `to_pandas` crea un DataFrame nou (una còpia de les dades):
+    amb `self_destruct` i `split_blocks` la taula Arrow s'allibera columna a
+    columna mentre es converteix, i el pic de memòria queda a prop d'una còpia.
+    """
+    from pyarrow import feather
+    table = feather.read_table(path, memory_map=True)
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def write_cache(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    df.to_feather(tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+
+def read_csv_cached(csv_path, cache_dir: Path = CACHE_DIR, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Llegeix un CSV fent servir la memòria cau columnar si existeix.
+
+    Args:
+        csv_path: Ruta del CSV.
+        cache_dir: Directori de la memòria cau.
+        **read_csv_kwargs: Paràmetres per a `pd.read_csv` (p. ex. dtype) que
+            s'apliquen el primer cop; els tipus resultants queden desats.
+    """
+    csv_path = Path(csv_path)
+    if not HAS_ARROW:
+        return pd.read_csv(csv_path, **read_csv_kwargs)
+
+    path = cache_path(csv_path, cache_dir, **read_csv_kwargs)
+    if path.exists():
+        console.print(f"[info]Llegint memòria cau:[/info] {path}")
+        return read_cache(path)
+
+    df = pd.read_csv(csv_path, **read_csv_kwargs)
+    write_cache(df, path)
+    console.print(f"[info]Memòria cau creada:[/info] {path}")
+    return df
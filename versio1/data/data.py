@@ -4,24 +4,76 @@ data.py
 Descarregar les dades des del dataset de Kaggle 'andrewmvd/data-analyst-jobs'
 """
 
+import os
 import pandas as pd
-import kagglehub
 from pathlib import Path
-import numpy as np
 from config.log_config import *
+from data.cache import read_csv_cached, read_cache, latest_cache, HAS_ARROW
+from data.profile import DataProfile, print_profile
+from config.tracing import traced
+from src.dtypes import compact_dtypes
 
 
-def load_data():
-    console.rule("[title]Descarrega de dades[/title]")
+DATASET = "andrewmvd/data-analyst-jobs"
+CSV_NAME = "DataAnalyst.csv"
+
+# Ruta local del CSV. Si està definida no es descarrega res (mode offline).
+DATA_PATH_ENV = "DATA_ANALYST_CSV"
+OFFLINE_ENV = "DATA_OFFLINE"
+
 
-    # Descarregar des de KaggleHub
-    path = kagglehub.dataset_download("andrewmvd/data-analyst-jobs")
-    console.print(f"[info]Dataset descarregat en:[/info] {path}")
+@traced("load_data")
+def load_data(path=None, offline=None, cache: bool = True, compact: bool = False):
+    """
+    Carrega el dataset.
+
+    Args:
+        path (str | Path, optional): CSV local. Si s'indica, no es fa servir
+            KaggleHub. Per defecte es llegeix de la variable d'entorn
+            DATA_ANALYST_CSV.
+        offline (bool, optional): No accedir a la xarxa. Si no hi ha `path`,
+            es fa servir l'última còpia a la memòria cau. Per defecte, True si
+            la variable d'entorn DATA_OFFLINE està definida.
+        cache (bool): Fer servir la memòria cau columnar (Feather).
+        compact (bool): Passar els textos repetits a categòriques i els
+            números al tipus més petit (`compact_dtypes`) i mostrar la
+            memòria abans i després.
+    """
+    console.rule("[title]Descarrega de dades[/title]")
 
-    csv_path = Path(path) / "DataAnalyst.csv"
+    path = path or os.environ.get(DATA_PATH_ENV)
+    if offline is None:
+        offline = bool(os.environ.get(OFFLINE_ENV))
+
+    if path is not None:
+        csv_path = Path(path)
+        console.print(f"[info]Dataset local:[/info] {csv_path}")
+    elif offline:
+        cached = latest_cache(Path(CSV_NAME).stem) if HAS_ARROW else None
+        if cached is None:
+            raise FileNotFoundError(
+                f"Mode offline sense dades: indica un CSV amb {DATA_PATH_ENV} "
+                f"o carrega'l un cop amb connexió per crear la memòria cau."
+            )
+        console.print(f"[info]Mode offline, llegint memòria cau:[/info] {cached}")
+        data = read_cache(cached)
+        if compact:
+            data = compact_dtypes(data, report=True)
+        console.print(f"[success]Dades carregades correctament:[/success] "
+                      f"{data.shape[0]} files, {data.shape[1]} columnes.")
+        return data
+    else:
+        import kagglehub
+
+        # Descarregar des de KaggleHub
+        path = kagglehub.dataset_download(DATASET)
+        console.print(f"[info]Dataset descarregat en:[/info] {path}")
+        csv_path = Path(path) / CSV_NAME
 
     # Carregar el CSV amb pandas
-    data = pd.read_csv(csv_path)
+    data = read_csv_cached(csv_path) if cache else pd.read_csv(csv_path)
+    if compact:
+        data = compact_dtypes(data, report=True)
 
     console.print(f"[success]Dades carregades correctament:[/success] "
                   f"{data.shape[0]} files, {data.shape[1]} columnes.")
@@ -30,37 +82,20 @@ def load_data():
 
 
 
-def data_description(data):
+def data_description(data, profile=None):
     """
     Muestra un resumen de los atributos del dataset indicando:
     - Tipo (numérico o no numérico)
     - Número de valores únicos
-    - Número de valores nulos
+    - Número de valores nulos (incluyendo -1 y "-1")
+
+    Args:
+        data (pd.DataFrame): Conjunt de dades.
+        profile (DataProfile, optional): Perfil ja calculat (p. ex. amb
+            `profile_csv`). Si és None es calcula a partir de `data`.
     """
     console.rule("[title]Descripció de les dades[/title]")
-
-    numeric_features = data.select_dtypes(np.number).keys()
-    non_numeric = [k for k in data.keys() if k not in numeric_features]
-
-    # Función auxiliar para crear tabla
-    def print_table(cols, tipo):
-        table = Table(title=f"{tipo}", show_lines=True)
-        table.add_column("Atribut", style="cyan")
-        table.add_column("Únics", style="green")
-        table.add_column("Nulos", style="red")
-
-        for col in cols:
-            unique_count = data[col].nunique()
-            null_count = data[col].isnull().sum()
-            null_count += (data[col] == -1).sum()  # Considerar -1 como nulo
-            null_count += (data[col] == "-1").sum()  # Considerar "-1" como nulo
-            table.add_row(col, str(unique_count), str(null_count))
-
-        console.print(table)
-
-    # Imprimir tablas
-    print_table(numeric_features, "Atributs numèrics")
-    print_table(non_numeric, "Atributs no numèrics")
+    print_profile(profile or DataProfile.from_frame(data))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+"""
+profile.py
+
+Perfil de les columnes d'un dataset en una sola passada per columna.
+
+Per a cada columna es calcula el tipus, el nombre de valors únics, de nuls i
+de cada valor sentinella (`SENTINELS`: -1, "-1", "Unknown"...). Cada columna
+es codifica un sol cop amb `factorize` i els sentinelles es busquen entre els
+valors únics, no entre totes les files.
+
+Els perfils es poden combinar (`merge`), així que es pot perfilar un CSV per
+blocs. Per poder combinar els únics, cada perfil desa el hash dels valors
+diferents de cada columna (els números, com a float64). El perfil d'un CSV es desa al costat de la seva
+còpia a la memòria cau (mateix hash del contingut).
+"""
+
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config.log_config import console, Table
+from data.cache import CACHE_DIR, cache_path
+
+
+# Valors que fan servir les dades per indicar que falta la informació
+SENTINELS = (-1, "-1", "Unknown", "Unknown / Non-Applicable")
+# Sentinelles que `data_description` compta com a nuls
+MISSING_SENTINELS = (-1, "-1")
+
+PROFILE_SUFFIX = ".profile.pkl"
+
+
+def _sentinel_label(value) -> str:
+    return repr(value) if isinstance(value, str) else str(value)
+
+
+class ColumnProfile:
+    """
+    Perfil d'una columna: files, nuls, recompte de cada sentinella i hash dels
+    valors diferents.
+    """
+
+    def __init__(self, name, numeric: bool, rows: int, nulls: int, sentinels: dict, hashes: np.ndarray):
+        self.name = name
+        self.numeric = numeric
+        self.rows = rows
+        self.nulls = nulls
+        self.sentinels = sentinels
+        self.hashes = hashes
+
+    @classmethod
+    def from_series(cls, series: pd.Series, sentinels=SENTINELS):
+        codes, uniques = pd.factorize(series)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        index = pd.Index(uniques)
+        found = {}
+        for value in sentinels:
+            try:
+                position = index.get_indexer([value])[0]
+            except (TypeError, ValueError):
+                position = -1
+            found[value] = int(counts[position]) if position >= 0 else 0
+        numeric = pd.api.types.is_numeric_dtype(series)
+        # Els números es passen a float64 abans del hash: un bloc llegit com a
+        # enter i un altre com a real (p. ex. amb un NaN) donen els mateixos hash
+        values = np.asarray(uniques, dtype=np.float64) if numeric else np.asarray(uniques, dtype=object)
+        hashes = np.sort(pd.util.hash_array(values))
+        return cls(series.name, numeric, len(series),
+                   int((codes < 0).sum()), found, hashes)
+
+    @property
+    def unique(self) -> int:
+        return len(self.hashes)
+
+    @property
+    def missing(self) -> int:
+        """Nuls més sentinelles de `MISSING_SENTINELS` (el 'Nulos' de `data_description`)."""
+        return self.nulls + sum(self.sentinels.get(v, 0) for v in MISSING_SENTINELS)
+
+    def merge(self, other: "ColumnProfile") -> "ColumnProfile":
+        sentinels = {v: self.sentinels.get(v, 0) + other.sentinels.get(v, 0)
+                     for v in dict.fromkeys([*self.sentinels, *other.sentinels])}
+        return ColumnProfile(self.name, self.numeric and other.numeric, self.rows + other.rows,
+                             self.nulls + other.nulls, sentinels, np.union1d(self.hashes, other.hashes))
+
+
+class DataProfile:
+    """Perfil de totes les columnes d'un DataFrame (o de diversos blocs)."""
+
+    def __init__(self, columns: dict = None):
+        self.columns = columns or {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, sentinels=SENTINELS):
+        return cls({col: ColumnProfile.from_series(df[col], sentinels) for col in df.columns})
+
+    @property
+    def rows(self) -> int:
+        return next(iter(self.columns.values())).rows if self.columns else 0
+
+    def merge(self, other: "DataProfile") -> "DataProfile":
+        """Perfil de la unió de files de dos perfils amb les mateixes columnes."""
+        if not self.columns:
+            return other
+        if list(self.columns) != list(other.columns):
+            raise ValueError("Els perfils no tenen les mateixes columnes")
+        return DataProfile({col: p.merge(other.columns[col]) for col, p in self.columns.items()})
+
+    def update(self, chunk: pd.DataFrame, sentinels=SENTINELS) -> "DataProfile":
+        """Afegeix un bloc de files al perfil."""
+        merged = self.merge(DataProfile.from_frame(chunk, sentinels))
+        self.columns = merged.columns
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        """Una fila per columna: tipus, únics, nuls, sentinelles i absents (nuls + -1)."""
+        rows = []
+        for col, p in self.columns.items():
+            row = {"Atribut": col, "Numèric": p.numeric, "Files": p.rows, "Únics": p.unique,
+                   "Nuls": p.nulls}
+            row.update({_sentinel_label(v): n for v, n in p.sentinels.items()})
+            row["Absents"] = p.missing
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        pd.to_pickle(self, tmp)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path) -> "DataProfile":
+        return pd.read_pickle(path)
+
+
+def profile_path(csv_path, cache_dir: Path = CACHE_DIR, **read_csv_kwargs) -> Path:
+    """Ruta del perfil: la de la còpia a la memòria cau amb un altre sufix."""
+    path = cache_path(csv_path, cache_dir, **read_csv_kwargs)
+    return path.with_name(path.name.removesuffix(path.suffix) + PROFILE_SUFFIX)
+
+
+def profile_csv(csv_path, chunksize: int = None, cache: bool = True, cache_dir: Path = CACHE_DIR,
+                **read_csv_kwargs) -> DataProfile:
+    """
+    Perfil d'un CSV, llegit sencer o per blocs de `chunksize` files. Amb
+    `cache` el perfil es desa i es reaprofita mentre el CSV no canviï.
+    """
+    path = profile_path(csv_path, cache_dir, **read_csv_kwargs) if cache else None
+    if path is not None and path.exists():
+        console.print(f"[info]Llegint perfil desat:[/info] {path}")
+        return DataProfile.load(path)
+
+    if chunksize:
+        profile = DataProfile()
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, **read_csv_kwargs):
+            profile.update(chunk)
+    else:
+        profile = DataProfile.from_frame(pd.read_csv(csv_path, **read_csv_kwargs))
+
+    if path is not None:
+        profile.save(path)
+    return profile
+
+
+def print_profile(profile: DataProfile):
+    """Taules de `data_description` (atributs numèrics i no numèrics) a partir del perfil."""
+
+    # Función auxiliar para crear tabla
+    def print_table(cols, tipo):
+        table = Table(title=f"{tipo}", show_lines=True)
+        table.add_column("Atribut", style="cyan")
+        table.add_column("Únics", style="green")
+        table.add_column("Nulos", style="red")
+
+        for col in cols:
+            p = profile.columns[col]
+            table.add_row(col, str(p.unique), str(p.missing))
+
+        console.print(table)
+
+    # Imprimir tablas
+    print_table([c for c, p in profile.columns.items() if p.numeric], "Atributs numèrics")
+    print_table([c for c, p in profile.columns.items() if not p.numeric], "Atributs no numèrics")
+
+
+def check_profile(csv_path, chunksize: int = 500):
+    """
+    Compara el perfil (sencer i per blocs) amb les comparacions columna a
+    columna de `data_description` i `check_missing` del notebook.
+    """
+    import tempfile
+
+    console.rule("[title]Perfil de les columnes[/title]")
+    df = pd.read_csv(csv_path)
+
+    start = time.perf_counter()
+    expected = {}
+    for col in df.columns:
+        expected[col] = {"Únics": df[col].nunique(), "Nuls": df[col].isnull().sum()}
+        for value in SENTINELS:
+            expected[col][_sentinel_label(value)] = (df[col] == value).sum()
+        expected[col]["Absents"] = expected[col]["Nuls"] + (df[col] == -1).sum() + (df[col] == "-1").sum()
+    expected = pd.DataFrame.from_dict(expected, orient="index")
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    profile = DataProfile.from_frame(df)
+    profile_time = time.perf_counter() - start
+    result = profile.to_frame().set_index("Atribut")[expected.columns]
+    assert (result.to_numpy() == expected.to_numpy()).all(), result.compare(expected)
+    console.print(f"[success]Mateixos recomptes que les comparacions per columna[/success] "
+                  f"({loop_time:.3f} s -> {profile_time:.3f} s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Tot com a text perquè tots els blocs tinguin els mateixos tipus
+        text = {col: str for col in df.columns if not pd.api.types.is_numeric_dtype(df[col])}
+        chunked = profile_csv(csv_path, chunksize=chunksize, cache_dir=tmp, dtype=text)
+        whole = DataProfile.from_frame(pd.read_csv(csv_path, dtype=text))
+        assert chunked.to_frame().equals(whole.to_frame())
+        console.print(f"[success]Mateix perfil per blocs de {chunksize} files[/success]")
+
+        start = time.perf_counter()
+        profile_csv(csv_path, chunksize=chunksize, cache_dir=tmp, dtype=text)
+        console.print(f"[info]Perfil desat:[/info] {time.perf_counter() - start:.3f} s")
+
+    print_profile(profile)
+
+
+if __name__ == "__main__":
+    import sys
+
+    check_profile(sys.argv[1])
@@ -1,15 +1,153 @@
-from data.data import load_data
-from src.eda import eda
-from src.preprocessing import preprocessing
+"""
+main.py
 
-def main():
-    # Carregar dades
-    df = load_data()
-    print(df.info())
-    eda(df)
+Punt d'entrada amb subordres:
+
+    python main.py describe [CSV]
+    python main.py eda [CSV]
+    python main.py preprocess [CSV] [-o data_preprocessed.csv] [--compact]
+    python main.py train [CSV] --model model.pkl [--select [--full-grids]]
+    python main.py predict ofertes.csv prediccions.csv --model model.pkl
+    python main.py run DataAnalyst.csv [--targets preprocessed] [--export .]
+
+Sense CSV les dades es carreguen amb `load_data` (DATA_ANALYST_CSV, memòria
+cau o KaggleHub). Cada subordre importa només els mòduls que fa servir:
+`describe` i `predict` no carreguen matplotlib, seaborn ni scikit-learn.
+Amb `--trace` es mostra el temps i la memòria de cada etapa.
+"""
+
+import argparse
+import sys
+
+
+def _load(args):
+    from data.data import load_data
+    return load_data(args.csv, compact=getattr(args, "compact", False))
+
+
+def describe(args):
+    from data.data import data_description
+
+    if args.csv:
+        # Perfil per blocs i desat: no cal carregar tot el CSV
+        from data.profile import profile_csv
+        data_description(None, profile_csv(args.csv, args.chunksize))
+    else:
+        data_description(_load(args))
+
+
+def eda(args):
+    from src.eda import eda
+    eda(_load(args))
+
+
+def preprocess(args):
+    from config.log_config import console
+    from src.preprocessing import preprocessing
+
+    df = preprocessing(_load(args), report=args.report, compact=args.compact)
+    if args.output:
+        df.to_csv(args.output, index=False)
+        console.print(f"[success]Dades netejades desades a {args.output}[/success]")
+
+
+def train(args):
+    from config.log_config import console
+    from src.predictor import train_predictor
+
+    df = _load(args)
+    predictor, encoder, _ = train_predictor(df)
+    predictor.save(args.model)
+    console.print(f"[success]Model desat a {args.model}[/success]")
+
+    if args.select:
+        from src.features import salary_targets
+        from src.training import PARAM_GRIDS, TARGETS, train_all_targets
+
+        labelled = df[df["Salary Estimate"] != "-1"]
+        result = train_all_targets(encoder.transform(labelled), salary_targets(labelled)[TARGETS].to_numpy(),
+                                   param_grids=PARAM_GRIDS if args.full_grids else None,
+                                   feature_names=encoder.feature_names_)
+        console.print(result["metrics"].to_string(index=False))
+
+
+def predict(args):
+    from src.scoring import score_csv
+
+    options = {"chunksize": args.chunksize} if args.chunksize else {}
+    score_csv(args.input, args.output, args.model, workers=args.workers, id_column=args.id_column, **options)
+
+
+def run(args):
+    from src.workflow import main as run_workflow
+
+    argv = [args.csv] if args.csv else []
+    argv += ["--targets", *args.targets] if args.targets else []
+    argv += ["--force", *args.force] if args.force else []
+    argv += ["--workers", str(args.workers)] if args.workers else []
+    argv += ["--export", args.export] if args.export else []
+    argv += ["--full-grids"] if args.full_grids else []
+    run_workflow(argv)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Anàlisi i predicció del salari d'ofertes de Data Analyst")
+    parser.add_argument("--trace", action="store_true", help="Mostrar el temps i la memòria de cada etapa")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(name, func, help, csv=True):
+        sub = commands.add_parser(name, help=help)
+        if csv:
+            sub.add_argument("csv", nargs="?", help="CSV d'ofertes (per defecte, load_data)")
+        sub.set_defaults(func=func)
+        return sub
+
+    sub = command("describe", describe, "Atributs, valors únics i nuls")
+    sub.add_argument("--chunksize", type=int, default=None, help="Llegir el CSV per blocs de files")
+
+    command("eda", eda, "Gràfics de distribució i correlacions inicials")
+
+    sub = command("preprocess", preprocess, "Neteja de les dades")
+    sub.add_argument("-o", "--output", help="CSV on desar les dades netejades")
+    sub.add_argument("--report", action="store_true", help="Temps i memòria de cada etapa")
+    sub.add_argument("--compact", action="store_true", help="Tipus compactes (categòriques, enters petits)")
+
+    sub = command("train", train, "Entrenar i desar el predictor del salari")
+    sub.add_argument("--model", required=True, help="On desar el SalaryPredictor (pickle)")
+    sub.add_argument("--select", action="store_true",
+                     help="Fer també la comparació de models i la cerca d'hiperparàmetres")
+    sub.add_argument("--full-grids", action="store_true",
+                     help="Cercar també RandomForest i GradientBoosting (molt més lent)")
+
+    sub = command("predict", predict, "Predicció per lots d'un CSV d'ofertes", csv=False)
+    sub.add_argument("input", help="CSV d'ofertes crues")
+    sub.add_argument("output", help="CSV de sortida amb les prediccions")
+    sub.add_argument("--model", required=True, help="SalaryPredictor desat (pickle)")
+    sub.add_argument("--chunksize", type=int, default=None)
+    sub.add_argument("--workers", type=int, default=None)
+    sub.add_argument("--id-column", default=None)
+
+    sub = command("run", run, "Flux dels notebooks amb artefactes reaprofitables (src/workflow.py)")
+    sub.add_argument("--targets", nargs="+", help="Tasques a obtenir (per defecte, totes)")
+    sub.add_argument("--force", nargs="+", help="Tasques a executar encara que no canviïn")
+    sub.add_argument("--workers", type=int, default=None)
+    sub.add_argument("--export", help="Directori on escriure data_preprocessed.csv i data_predicted.csv")
+    sub.add_argument("--full-grids", action="store_true",
+                     help="Cercar també RandomForest i GradientBoosting (molt més lent)")
+    return parser
+
+
+def main(argv=None):
+    from config.tracing import TRACER
+
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        TRACER.enable()
+
+    args.func(args)
+    if TRACER.enabled:
+        TRACER.print_summary()
 
-    # Netejar dades
-    
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
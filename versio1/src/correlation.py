@@ -0,0 +1,168 @@
+"""
+correlation.py
+
+Matriu de Cramér's V entre columnes categòriques.
+
+`cramers_v` d'eda.py fa un `pd.crosstab` i un `chi2_contingency` per a cada
+parella ordenada de columnes (k² crides, la diagonal inclosa i cada parella
+dos cops). Aquí cada columna es codifica un sol cop amb `factorize`, la taula
+de contingència surt d'un `np.bincount` dels codis i només es calcula el
+triangle superior, que després es copia a l'inferior. Les parelles es poden
+repartir entre processos.
+
+Les columnes amb més de `max_categories` valors diferents (p. ex. 'Job
+Description') es descarten o, amb `high_cardinality="hash"`, es redueixen a
+`max_categories` grups amb un hash del valor.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from config.log_config import console
+
+
+MAX_CATEGORIES = 500
+
+# Tipus de les columnes de text: object (pandas 2), string / 'str' (pandas 3)
+# i category (`load_data(compact=True)`)
+TEXT_DTYPES = ["object", "string", "category"]
+
+
+def _encode(values: pd.Series, max_categories, high_cardinality: str):
+    """Codis enters (-1 per als nuls) i nombre de categories, o None si es descarta."""
+    codes, uniques = pd.factorize(values)
+    if max_categories is None or len(uniques) <= max_categories:
+        return codes, len(uniques)
+    if high_cardinality == "skip":
+        return None
+    hashed = pd.util.hash_array(np.asarray(uniques, dtype=object)) % np.uint64(max_categories)
+    hashed = hashed.astype(np.int64)
+    return np.where(codes >= 0, hashed[codes], -1), max_categories
+
+
+def _cramers_v(a: np.ndarray, na: int, b: np.ndarray, nb: int) -> float:
+    """Com `cramers_v(x, y)` d'eda.py a partir dels codis de les dues columnes."""
+    valid = (a >= 0) & (b >= 0)
+    if not valid.all():
+        a, b = a[valid], b[valid]
+    table = np.bincount(a * nb + b, minlength=na * nb).reshape(na, nb).astype(float)
+    # crosstab només té les categories que apareixen
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    r, k = table.shape
+    n = table.sum()
+
+    # chi2_contingency (amb la correcció de Yates quan dof == 1)
+    dof = (r - 1) * (k - 1)
+    if dof == 0:
+        chi2 = 0.0
+    else:
+        expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+        if dof == 1:
+            diff = expected - table
+            table = table + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+        chi2 = ((table - expected) ** 2 / expected).sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(np.sqrt(chi2 / n / min(k - 1, r - 1)))
+
+
+def _pairs_block(encoded, pairs):
+    return [_cramers_v(*encoded[i], *encoded[j]) for i, j in pairs]
+
+
+def cramers_v_matrix(df: pd.DataFrame, columns=None, max_categories: int = MAX_CATEGORIES,
+                     high_cardinality: str = "skip", n_jobs: int = 1) -> pd.DataFrame:
+    """
+    Matriu simètrica de Cramér's V.
+
+    Args:
+        columns (list): Columnes a comparar. Per defecte les de text
+            (`TEXT_DTYPES`).
+        max_categories (int): Màxim de valors diferents per columna. None per
+            no limitar.
+        high_cardinality (str): 'skip' per descartar les columnes que el
+            superen o 'hash' per agrupar-ne els valors.
+        n_jobs (int): Processos per calcular les parelles.
+    """
+    if high_cardinality not in ("skip", "hash"):
+        raise ValueError(f"high_cardinality ha de ser 'skip' o 'hash', no {high_cardinality!r}")
+    if columns is None:
+        columns = df.select_dtypes(include=TEXT_DTYPES).columns
+
+    encoded, kept, skipped = [], [], []
+    for col in columns:
+        result = _encode(df[col], max_categories, high_cardinality)
+        if result is None:
+            skipped.append(col)
+        else:
+            encoded.append(result)
+            kept.append(col)
+    if skipped:
+        console.print(f"[warning]Columnes amb més de {max_categories} valors descartades:[/warning] "
+                      + ", ".join(skipped))
+
+    pairs = [(i, j) for i in range(len(kept)) for j in range(i, len(kept))]
+    if n_jobs == 1 or len(pairs) < 2:
+        values = _pairs_block(encoded, pairs)
+    else:
+        blocks = np.array_split(np.arange(len(pairs)), min(len(pairs), 4 * abs(n_jobs) if n_jobs > 0 else 32))
+        parts = Parallel(n_jobs=n_jobs)(
+            delayed(_pairs_block)(encoded, [pairs[p] for p in block]) for block in blocks if len(block))
+        values = [v for part in parts for v in part]
+
+    matrix = np.empty((len(kept), len(kept)))
+    for (i, j), value in zip(pairs, values):
+        matrix[i, j] = matrix[j, i] = value
+    return pd.DataFrame(matrix, index=kept, columns=kept)
+
+
+def check_correlation(df: pd.DataFrame):
+    """
+    Compara `cramers_v_matrix` amb el bucle de `initial_correlations` (mateix
+    text arrodonit a 3 decimals) i mostra el temps de cada un.
+    """
+    from src.eda import cramers_v
+
+    console.rule("[title]Matriu de Cramér's V[/title]")
+    categorical = df.select_dtypes(include=TEXT_DTYPES)
+
+    start = time.perf_counter()
+    expected = pd.DataFrame(
+        {c1: [cramers_v(categorical[c1], categorical[c2]) for c2 in categorical.columns]
+         for c1 in categorical.columns},
+        index=categorical.columns,
+    )
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full = cramers_v_matrix(df, max_categories=None)
+    full_time = time.perf_counter() - start
+    assert full.round(3).to_string() == expected.round(3).to_string()
+    console.print(f"[success]Mateix informe amb totes les columnes[/success] "
+                  f"({loop_time:.2f} s -> {full_time:.2f} s)")
+
+    for n_jobs in (1, -1):
+        start = time.perf_counter()
+        capped = cramers_v_matrix(df, n_jobs=n_jobs)
+        capped_time = time.perf_counter() - start
+        kept = list(capped.columns)
+        assert capped.round(3).to_string() == expected.loc[kept, kept].round(3).to_string()
+        console.print(f"[info]Límit de {MAX_CATEGORIES} valors, n_jobs={n_jobs}:[/info] "
+                      f"{len(kept)} columnes, {capped_time:.3f} s")
+
+    hashed = cramers_v_matrix(df, high_cardinality="hash")
+    console.print(f"[info]Amb hashing:[/info] {hashed.shape[0]} columnes")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_correlation(df)
@@ -0,0 +1,179 @@
+"""
+dtypes.py
+
+Tipus compactes per a les dades carregades i per a les variables generades.
+
+`load_data` deixa tots els textos com a `object` (un objecte Python per fila,
+encara que 'Company Name', 'Location', 'Industry'... tinguin pocs valors
+diferents) i les variables generades tenen els comptadors i les marques 0/1
+en int64. `compact_dtypes`:
+
+- textos repetits -> `category` (codis enters + una sola còpia de cada text),
+- enters -> el tipus enter més petit que hi cap (marques 0/1 -> uint8),
+- reals sense nuls i amb valors enters (les dummies i els comptadors de la
+  matriu de `FeatureEncoder`) -> enter, com els enters,
+- la resta de reals, si float32 els representa exactament (edats, mides,
+  salaris amb nuls) -> float32; 'Rating' i semblants només amb `float32=True`,
+- booleans (dummies) es queden en bool.
+
+Les funcions de neteja (`map_unique`, `salary_columns`, `.map` dels mapejos)
+treballen amb els codis de les categòriques, així que el resultat de
+`preprocessing()` és el mateix amb els dos tipus d'entrada. L'EDA
+(`column_summary`) i `cramers_v_matrix` tracten les columnes category com les
+de text.
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.log_config import console, Table
+
+
+# Columnes de DataAnalyst.csv que sempre es passen a categòriques
+CATEGORY_COLUMNS = [
+    "Salary Estimate", "Company Name", "Location", "Headquarters", "Size",
+    "Type of ownership", "Industry", "Sector", "Revenue",
+]
+
+# Altres textos: categòrics si els valors diferents no passen d'aquesta fracció de files
+MAX_UNIQUE_RATIO = 0.5
+
+
+def _compact_object(values: pd.Series, always: bool, max_unique_ratio: float) -> pd.Series:
+    if always or values.nunique(dropna=False) <= max_unique_ratio * len(values):
+        return values.astype("category")
+    return values
+
+
+def _compact_integer(values: pd.Series) -> pd.Series:
+    if values.empty:
+        return values
+    low, high = values.min(), values.max()
+    if low >= 0 and high <= 1:
+        return values.astype(np.uint8)
+    return pd.to_numeric(values, downcast="unsigned" if low >= 0 else "integer")
+
+
+def _compact_float(values: pd.Series, lossy: bool) -> pd.Series:
+    if values.notna().all() and np.array_equal(values.to_numpy(), np.round(values.to_numpy())):
+        # Sense nuls i tot enters (dummies i comptadors de la matriu codificada)
+        return _compact_integer(values.astype(np.int64))
+    narrow = values.astype(np.float32)
+    if lossy:
+        return narrow
+    same = (narrow.to_numpy(dtype=np.float64) == values.to_numpy()) | values.isna().to_numpy()
+    return narrow if same.all() else values
+
+
+def compact_dtypes(df: pd.DataFrame, categories=CATEGORY_COLUMNS, max_unique_ratio: float = MAX_UNIQUE_RATIO,
+                   float32: bool = False, report: bool = False) -> pd.DataFrame:
+    """
+    Còpia de `df` amb tipus més petits (vegeu el mòdul).
+
+    Args:
+        categories (list): Columnes de text que es passen sempre a categòriques.
+        max_unique_ratio (float): La resta de textos es passen a categòriques
+            si tenen com a màxim aquesta fracció de valors diferents.
+        float32 (bool): Passar a float32 també els reals que no hi caben
+            exactament (p. ex. 'Rating': 3.9 -> 3.9000001).
+        report (bool): Mostrar la memòria abans i després.
+    """
+    always = set(categories)
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        kind = values.dtype.kind
+        if kind == "O" or isinstance(values.dtype, pd.StringDtype):
+            values = _compact_object(values, col in always, max_unique_ratio)
+        elif kind in "iu":
+            values = _compact_integer(values)
+        elif kind == "f":
+            values = _compact_float(values, float32)
+        columns[col] = values
+    out = pd.DataFrame(columns, index=df.index)
+
+    if report:
+        memory_report(df, out)
+    return out
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame, top: int = 15):
+    """Taula de memòria (MB) i tipus per columna abans i després, amb el total."""
+    mb_before = before.memory_usage(index=False, deep=True) / 1e6
+    mb_after = after.memory_usage(index=False, deep=True) / 1e6
+
+    table = Table(title="Memòria per columna", show_lines=False)
+    for col, style in [("Columna", "cyan"), ("Tipus", None), ("Abans (MB)", "red"),
+                       ("Després (MB)", "green"), ("Reducció", "magenta")]:
+        table.add_column(col, style=style)
+
+    def ratio(a, b):
+        return f"{a / b:.1f}x" if b > 0 else "-"
+
+    # Primer les columnes que ocupaven més
+    shown = mb_before.sort_values(ascending=False).index[:top]
+    for col in shown:
+        table.add_row(str(col), f"{before[col].dtype} -> {after[col].dtype}", f"{mb_before[col]:.2f}",
+                      f"{mb_after[col]:.2f}", ratio(mb_before[col], mb_after[col]))
+    if len(before.columns) > top:
+        rest = before.columns.difference(shown)
+        table.add_row(f"({len(rest)} columnes més)", "", f"{mb_before[rest].sum():.2f}",
+                      f"{mb_after[rest].sum():.2f}", ratio(mb_before[rest].sum(), mb_after[rest].sum()))
+    total_before, total_after = mb_before.sum(), mb_after.sum()
+    table.add_row("[bold]Total[/bold]", "", f"{total_before:.2f}", f"{total_after:.2f}",
+                  ratio(total_before, total_after))
+    console.print(table)
+
+
+def _as_object(values: pd.Series) -> pd.Series:
+    return values.astype(object).where(values.notna(), None)
+
+
+def check_dtypes(df: pd.DataFrame):
+    """
+    Compara `preprocessing()` amb les dades originals i amb les compactes
+    (mateixos valors) i mostra la memòria i el temps de cada cas.
+    """
+    from src.encoding import FeatureEncoder
+    from src.preprocessing import preprocessing
+
+    console.rule("[title]Tipus compactes[/title]")
+    compact = compact_dtypes(df, report=True)
+    for col in df.columns:
+        assert _as_object(compact[col]).equals(_as_object(df[col])), col
+
+    console.quiet = True
+    start = time.perf_counter()
+    expected = preprocessing(df)
+    object_time = time.perf_counter() - start
+    start = time.perf_counter()
+    result = preprocessing(compact)
+    compact_time = time.perf_counter() - start
+    console.quiet = False
+
+    for col in expected.columns:
+        if not pd.api.types.is_numeric_dtype(expected[col]):
+            # Text (object o `str` a pandas 3) contra category
+            pd.testing.assert_series_equal(_as_object(result[col]), _as_object(expected[col]))
+        else:
+            # Les columnes originals ja entren compactes
+            pd.testing.assert_series_equal(result[col], expected[col], check_dtype=col not in df.columns)
+    console.print(f"[success]preprocessing() dona el mateix resultat[/success] "
+                  f"({len(df)} files: {object_time:.3f} s amb object, {compact_time:.3f} s amb category)")
+
+    console.print("[info]Variables codificades (FeatureEncoder):[/info]")
+    encoded = FeatureEncoder().fit(df).transform_frame(df)
+    narrow = compact_dtypes(encoded, report=True)
+    assert np.array_equal(narrow.to_numpy(dtype=float), encoded.to_numpy())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_dtypes(df)
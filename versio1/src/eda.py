@@ -4,78 +4,158 @@ eda.py
 Funcions per anàlisi exploratori visual del dataset Data Analyst Jobs.
 """
 
+import hashlib
+import json
+import time
+
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
 import numpy as np
 
 from pathlib import Path
+from joblib import Parallel, delayed
 from scipy.stats import chi2_contingency
 from config.log_config import console
+from config.tracing import traced
+from src.correlation import MAX_CATEGORIES, cramers_v_matrix
 from data.data import load_data
 
 
-def plot_column_distribution(df: pd.DataFrame, cols: list = None, max_per_page: int = 2):
+EDA_DIR = Path("outputs/eda")
+# Estadístiques de cada pàgina de l'última execució
+PAGES_MANIFEST = ".eda_pages.json"
+
+# Atributs per veure en histogrames
+EDA_COLUMNS = ["Rating", "Founded", "Salary Estimate", "Size", "Type of ownership", "Industry", "Sector", "Revenue", "Easy Apply"]
+
+
+def column_summary(series: pd.Series, bins: int = 20) -> dict:
+    """
+    Tot el que cal per dibuixar una columna, calculat un sol cop: recompte de
+    valors (barres) o histograma, valors únics i nuls.
+    """
+    nunique = series.nunique()
+    summary = {"name": series.name, "nunique": int(nunique), "nulls": int(series.isnull().sum())}
+    if not pd.api.types.is_numeric_dtype(series) or nunique < 10:
+        # Categórica (object o category) o discreta → barras
+        summary["kind"] = "bar"
+        summary["counts"] = series.value_counts()
+    else:
+        # Numérica continua → histograma (com `plot(kind="hist", bins=bins)`)
+        summary["kind"] = "hist"
+        summary["counts"], summary["edges"] = np.histogram(series.dropna(), bins=bins)
+    return summary
+
+
+def _summary_signature(summaries: list, dpi: int, fmt: str) -> str:
+    digest = hashlib.blake2b(repr((dpi, fmt)).encode(), digest_size=16)
+    for s in summaries:
+        digest.update(repr((s["name"], s["kind"], s["nunique"], s["nulls"])).encode())
+        if s["kind"] == "bar":
+            digest.update(pd.util.hash_pandas_object(s["counts"]).to_numpy().tobytes())
+            digest.update(repr(list(s["counts"].index.map(str))).encode())
+        else:
+            digest.update(s["counts"].tobytes())
+            digest.update(s["edges"].tobytes())
+    return digest.hexdigest()
+
+
+def _render_page(summaries: list, file_path: Path, dpi: int):
+    """
+    Dibuixa i desa una pàgina. Fa servir una `Figure` pròpia amb el canvas
+    Agg, sense pyplot: no canvia el backend ni les figures obertes de qui crida.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5 * len(summaries)))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(len(summaries), 1, squeeze=False)[:, 0]
+    for ax, s in zip(axes, summaries):
+        if s["kind"] == "bar":
+            s["counts"].plot(kind="bar", ax=ax, color="skyblue", edgecolor="black")
+            ax.set_ylabel("Número")
+        else:
+            edges = s["edges"]
+            ax.hist(edges[:-1], bins=edges, weights=s["counts"], color="salmon", edgecolor="black")
+            ax.set_ylabel("Frecuencia")
+        ax.set_title(f"Distribución de {s['name']} (únicos: {s['nunique']}, nulos: {s['nulls']})")
+        ax.set_xlabel(s["name"])
+
+    fig.tight_layout()
+    fig.savefig(file_path, dpi=dpi)
+    return file_path
+
+
+@traced()
+def plot_column_distribution(df: pd.DataFrame, cols: list = None, max_per_page: int = 2,
+                             out_dir=EDA_DIR, fmt: str = "png", dpi: int = 300,
+                             n_jobs: int = -1, force: bool = False) -> list:
     """
     Genera gràfics de barres per a variables categòriques/discretes i histogrames per a variables contínues
     de les columnes seleccionades del DataFrame.
 
+    Les pàgines es dibuixen en paral·lel. Les pàgines que ja existeixen i
+    les estadístiques de les quals no han canviat des de l'última execució
+    (vegeu `PAGES_MANIFEST`) no es tornen a dibuixar.
+
     Args:
         df (pd.DataFrame): Conjunt de dades.
         cols (list, optional): Llista de columnes a graficar. Si és None, s'utilitzen totes.
-        ncols (int): Nombre de columnes de subgràfics.
+        max_per_page (int): Nombre de columnes per pàgina.
+        fmt (str): Format de les imatges ('png', 'svg', 'pdf'...).
+        dpi (int): Resolució de les imatges.
+        n_jobs (int): Processos per dibuixar les pàgines.
+        force (bool): Dibuixar totes les pàgines encara que no hagin canviat.
+
+    Returns:
+        list: Rutes de les pàgines.
     """
     if cols is None:
         cols = df.columns.tolist()
 
     # Filtrar columnes
     cols = [c for c in cols if c in df.columns]
+    summaries = [column_summary(df[c]) for c in cols]
 
-    total_cols = len(cols)
-    pages = (total_cols + max_per_page - 1) // max_per_page
-
-    for page in range(pages):
-        start_idx = page * max_per_page
-        end_idx = min(start_idx + max_per_page, total_cols)
-        page_cols = cols[start_idx:end_idx]
-
-        fig, axes = plt.subplots(len(page_cols), 1, figsize=(10, 5 * len(page_cols)))
-        if len(page_cols) == 1:
-            axes = [axes]  # Asegurar lista para iterar
-
-        for ax, col in zip(axes, page_cols):
-            if df[col].dtype == "object" or df[col].nunique() < 10:
-                # Categórica o discreta → barras
-                df[col].value_counts().plot(kind="bar", ax=ax, color="skyblue", edgecolor="black")
-                ax.set_ylabel("Número")
-            else:
-                # Numérica continua → histograma
-                df[col].plot(kind="hist", ax=ax, bins=20, color="salmon", edgecolor="black")
-                ax.set_ylabel("Frecuencia")
-            ax.set_title(f"Distribución de {col} (únicos: {df[col].nunique()}, nulos: {df[col].isnull().sum()})")
-            ax.set_xlabel(col)
-
-        plt.tight_layout()
-        
-        # Guardar figura
-        file_path = Path("outputs/eda") / f"eda_page_{page+1}.png"
-        fig.savefig(file_path, dpi=300)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / PAGES_MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    pages, pending = [], []
+    for start_idx in range(0, len(cols), max_per_page):
+        page_summaries = summaries[start_idx:start_idx + max_per_page]
+        file_path = out_dir / f"eda_page_{start_idx // max_per_page + 1}.{fmt}"
+        signature = _summary_signature(page_summaries, dpi, fmt)
+        pages.append(file_path)
+        if force or not file_path.exists() or manifest.get(file_path.name) != signature:
+            pending.append((page_summaries, file_path, signature))
+
+    if n_jobs == 1 or len(pending) < 2:
+        saved = [_render_page(p, path, dpi) for p, path, _ in pending]
+    else:
+        saved = Parallel(n_jobs=n_jobs)(delayed(_render_page)(p, path, dpi) for p, path, _ in pending)
+
+    for file_path in saved:
         console.print(f"[info]Figura guardada en:[/info] {file_path}")
+    if len(pending) < len(pages):
+        console.print(f"[info]{len(pages) - len(pending)} pàgines sense canvis[/info]")
 
-        # Mostrar figura
-        #plt.show()
+    manifest.update({path.name: signature for _, path, signature in pending})
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return pages
 
 
-def plot_eda(df: pd.DataFrame):
+def plot_eda(df: pd.DataFrame, **kwargs):
     """
-    Funció principal per fer l'EDA
+    Funció principal per fer l'EDA. Els arguments addicionals van a
+    `plot_column_distribution` (fmt, dpi, n_jobs, force...).
     """
     console.rule("[title]Anàlisi exploratori visual[/title]")
 
-    # Atributs per veure en histogrames
-    cols = ["Rating", "Founded", "Salary Estimate", "Size", "Type of ownership", "Industry", "Sector", "Revenue", "Easy Apply"]
-
-    plot_column_distribution(df, cols=cols, max_per_page=2)
+    plot_column_distribution(df, cols=EDA_COLUMNS, max_per_page=2, **kwargs)
     console.print("[success]Anàlisi exploratori visual complet[/success]")
 
 
@@ -88,27 +168,23 @@ def cramers_v(x, y):
     return np.sqrt(phi2 / min(k - 1, r - 1))
 
 
-def initial_correlations(df: pd.DataFrame):
+@traced()
+def initial_correlations(df: pd.DataFrame, max_categories: int = MAX_CATEGORIES,
+                         high_cardinality: str = "skip", n_jobs: int = -1):
     """
     Funció per calcular les correlacions inicials y guardar-les en un arxiu de text.
+
+    Les columnes categòriques amb més de `max_categories` valors diferents es
+    descarten o s'agrupen amb hashing (vegeu `cramers_v_matrix`).
     """
     numeric = df.select_dtypes(include=["number"])
-    categorical = df.select_dtypes(include=["object"])
 
     # Correlations
     corr_num = numeric.corr()
 
     # Cramér's V
-    corr_cat = pd.DataFrame(
-        {
-            col1: [
-                cramers_v(categorical[col1], categorical[col2])
-                for col2 in categorical.columns
-            ]
-            for col1 in categorical.columns
-        },
-        index=categorical.columns,
-    )
+    corr_cat = cramers_v_matrix(df, max_categories=max_categories,
+                                high_cardinality=high_cardinality, n_jobs=n_jobs)
 
     # Forzar impresión completa
     corr_num_text = corr_num.round(3).to_string(max_rows=None, max_cols=None)
@@ -123,7 +199,7 @@ def initial_correlations(df: pd.DataFrame):
     )
 
     # Guardar archivo
-    out_dir = Path("outputs/eda")
+    out_dir = EDA_DIR
     out_dir.mkdir(parents=True, exist_ok=True)
     txt_path = out_dir / "simple_correlation_report.txt"
 
@@ -143,6 +219,47 @@ def eda(df: pd.DataFrame):
     console.print("[success]Anàlisi exploratori complet[/success]")
 
 
+def check_rendering(df: pd.DataFrame, cols: list = EDA_COLUMNS, max_per_page: int = 2, dpi: int = 100):
+    """
+    Dibuixa totes les columnes dues vegades en un directori temporal (la
+    segona no ha de dibuixar res) i compara el temps amb el bucle original,
+    que no tancava les figures.
+    """
+    import tempfile
+
+    console.rule("[title]Dibuix de les pàgines de l'EDA[/title]")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for start_idx in range(0, len(cols), max_per_page):
+            page_cols = cols[start_idx:start_idx + max_per_page]
+            fig, axes = plt.subplots(len(page_cols), 1, figsize=(10, 5 * len(page_cols)))
+            axes = [axes] if len(page_cols) == 1 else axes
+            for ax, col in zip(axes, page_cols):
+                if not pd.api.types.is_numeric_dtype(df[col]) or df[col].nunique() < 10:
+                    df[col].value_counts().plot(kind="bar", ax=ax, color="skyblue", edgecolor="black")
+                else:
+                    df[col].plot(kind="hist", ax=ax, bins=20, color="salmon", edgecolor="black")
+                ax.set_title(f"Distribución de {col} (únicos: {df[col].nunique()}, nulos: {df[col].isnull().sum()})")
+            plt.tight_layout()
+            fig.savefig(Path(tmp) / f"old_{start_idx}.png", dpi=dpi)
+        loop_time = time.perf_counter() - start
+        leaked = len(plt.get_fignums())
+        plt.close("all")
+
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            pages = plot_column_distribution(df, cols, max_per_page, out_dir=tmp, dpi=dpi)
+            timings.append(time.perf_counter() - start)
+        assert all(p.exists() for p in pages)
+        assert not plt.get_fignums()
+
+    console.print(f"[info]{len(pages)} pàgines:[/info] bucle original {loop_time:.2f} s "
+                  f"({leaked} figures obertes), nou {timings[0]:.2f} s, sense canvis {timings[1]:.2f} s")
+    console.print("[success]Cap figura oberta després de dibuixar[/success]")
+
+
 if __name__ == "__main__":
     df = load_data()
     plot_eda(df)
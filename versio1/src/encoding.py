@@ -0,0 +1,340 @@
+"""
+encoding.py
+
+Codificador de variables amb fit/transform.
+
+`fit` aprèn un cop els vocabularis de les variables categòriques (grups de
+propietat i d'indústria, rol, estat, ciutat i estat de la seu) i els valors per
+omplir nuls. `transform` converteix ofertes noves directament a codis enters i
+d'aquí a una matriu preassignada amb el mateix ordre de columnes que
+data_preprocessed.csv (sense les columnes objectiu), sense `pd.get_dummies` ni
+`pd.concat`.
+
+Valors no vistos durant el `fit`:
+- Categòriques: totes les dummies del grup a 0 (com `handle_unknown='ignore'`).
+- Empreses noves: 'Company Offers' = 1.
+- 'Company Age' nul·la: les regles de `GroupImputer` (`AGE_IMPUTATIONS`), com
+  al notebook: mediana de l'empresa, després mediana del grup de mida ('Size
+  Bin') i, si la mida no es coneix, la mediana global.
+- Altres numèriques nul·les: es fa servir la mediana apresa al `fit`.
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from src.features import (
+    BEST_WORDS, SENIORITY_MAPPING, map_industry, map_ownership, clean_text, num_competitors,
+)
+from src.imputation import AGE_IMPUTATIONS, GroupImputer, size_bin
+from src.parsing import parse_founded, parse_size, map_unique
+from src.text import TokenIndex
+from src.titles import TITLES
+
+
+RAW_COLUMNS = [
+    "Job Title", "Job Description", "Rating", "Company Name", "Location",
+    "Headquarters", "Size", "Founded", "Type of ownership", "Industry", "Competitors",
+    "Easy Apply",
+]
+
+TARGETS = ["min_salary", "max_salary", "avg_salary"]
+
+
+def layout(words=BEST_WORDS) -> list:
+    """
+    Ordre de les variables de data_preprocessed.csv. Cada element és
+    (nom, tipus): 'num' és una columna, 'cat' un bloc de dummies amb prefix = nom.
+    """
+    return [
+        ("Rating", "num"),
+        ("Company Age", "num"),
+        ("Ownership_Group", "cat"),
+        ("Industry_Group", "cat"),
+        ("Seniority_code", "num"),
+        ("Role", "cat"),
+        *[(f"contains_{word}", "num") for word in words],
+        ("Company Offers", "num"),
+        ("num_competitors", "num"),
+        ("state", "cat"),
+        ("city", "cat"),
+        ("StateHeadquarters", "cat"),
+        ("Easy_Apply", "num"),
+    ]
+
+# A partir d'aquesta mida de lot es calcula cada valor diferent un sol cop
+SMALL_BATCH = 64
+
+
+# Senioritat i rol amb el classificador compilat (amb memòria per títol)
+_seniority = TITLES.seniority
+_role = TITLES.role
+
+
+def _map_values(values, func) -> np.ndarray:
+    if len(values) > SMALL_BATCH:
+        return map_unique(pd.Series(values, dtype=object), func).to_numpy(dtype=object)
+    return np.array([func(v) for v in values], dtype=object)
+
+
+def _is_missing(value) -> bool:
+    return value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value))
+
+
+def _columns(data) -> dict:
+    """Columnes crues com a arrays d'objectes. Accepta DataFrame, dict o llista de dicts."""
+    if isinstance(data, pd.DataFrame):
+        return {c: data[c].to_numpy(dtype=object) for c in RAW_COLUMNS}
+    if isinstance(data, dict):
+        data = [data]
+    return {c: np.array([row[c] for row in data], dtype=object) for c in RAW_COLUMNS}
+
+
+def _frequent(values: np.ndarray, min_share: float) -> list:
+    counts = pd.Series(values).value_counts()
+    return sorted(counts[counts / len(values) > min_share].index)
+
+
+def frame_to_csr(df: pd.DataFrame):
+    """
+    Converteix un DataFrame numèric/booleà (p. ex. data_preprocessed.csv) a
+    (matriu CSR, índex de columnes) columna a columna, sense passar per una
+    matriu densa intermèdia.
+    """
+    from scipy import sparse
+
+    rows, cols, data = [], [], []
+    for j, col in enumerate(df.columns):
+        values = df[col].to_numpy(dtype=float)
+        nz = np.flatnonzero(values)
+        rows.append(nz)
+        cols.append(np.full(len(nz), j))
+        data.append(values[nz])
+
+    X = sparse.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+        shape=df.shape,
+    )
+    X.sort_indices()
+    return X, df.columns
+
+
+def _state(location):
+    return location.split(',')[-1].strip()
+
+
+def _city(location):
+    return location.split(',')[0].strip()
+
+
+def _size(size):
+    return None if _is_missing(size) else parse_size(size)
+
+
+class FeatureEncoder:
+    """
+    Args:
+        min_share (float): Proporció mínima d'ofertes perquè un estat o una
+            ciutat tingui columna pròpia (1% al notebook).
+        words (list): Paraules de les columnes 'contains_<paraula>'.
+    """
+
+    def __init__(self, min_share: float = 0.01, words=BEST_WORDS):
+        self.min_share = min_share
+        self.words = list(words)
+
+    # Variables derivades (abans de codificar)
+    def _derive(self, cols: dict) -> dict:
+        location = cols["Location"]
+        company = cols["Company Name"].copy()
+        missing = np.array([_is_missing(c) for c in company], dtype=bool)
+        company[missing] = [f"{loc}Company" for loc in location[missing]]
+
+        state = _map_values(location, _state)
+
+        hq_state = np.empty(len(location), dtype=object)
+        for i, (hq, name) in enumerate(zip(cols["Headquarters"], company)):
+            if _is_missing(hq) or hq == '-1':
+                hq = self.hq_by_company_.get(name) if hasattr(self, "hq_by_company_") else None
+            hq = None if hq is None else _state(hq)
+            hq_state[i] = state[i] if hq in (None, '-1', '') else hq
+
+        derived = {
+            "Company Name": company,
+            "Rating": np.array([np.nan if _is_missing(r) or r == -1 else r for r in cols["Rating"]], dtype=float),
+            "Company Age": np.array(
+                [np.nan if (age := parse_founded(f)) is None else age for f in cols["Founded"]], dtype=float),
+            "Size mean": np.array(_map_values(cols["Size"], _size), dtype=float),
+            "Ownership_Group": _map_values(cols["Type of ownership"], map_ownership),
+            "Industry_Group": _map_values(cols["Industry"], map_industry),
+            "Seniority_code": np.array([SENIORITY_MAPPING[s] for s in _map_values(cols["Job Title"], _seniority)], dtype=float),
+            "Role": _map_values(cols["Job Title"], _role),
+            "num_competitors": np.array([num_competitors(c) for c in cols["Competitors"]], dtype=float),
+            "state": state,
+            "city": _map_values(location, _city),
+            "StateHeadquarters": hq_state,
+            "Easy_Apply": np.array([1.0 if e == 'True' else 0.0 for e in cols["Easy Apply"]]),
+        }
+        if len(location) > SMALL_BATCH:
+            flags = TokenIndex().fit(cols["Job Description"]).contains(self.words).toarray()
+        else:
+            description = [clean_text(d) for d in cols["Job Description"]]
+            flags = [[word in d for word in self.words] for d in description]
+        flags = np.asarray(flags, dtype=float).reshape(len(location), len(self.words))
+        for j, word in enumerate(self.words):
+            derived[f"contains_{word}"] = flags[:, j]
+        return derived
+
+    def fit(self, df: pd.DataFrame):
+        cols = _columns(df)
+
+        # Seus conegudes de cada empresa (només si n'hi ha una)
+        company = pd.Series(cols["Company Name"]).fillna(pd.Series(cols["Location"]) + "Company")
+        hq = pd.Series(cols["Headquarters"]).replace('-1', np.nan)
+        known = pd.DataFrame({"company": company, "hq": hq}).dropna()
+        unique_hq = known.groupby("company")["hq"].nunique()
+        single = unique_hq[unique_hq == 1].index
+        self.hq_by_company_ = known[known["company"].isin(single)].groupby("company")["hq"].first().to_dict()
+
+        derived = self._derive(cols)
+
+        self.company_counts_ = pd.Series(derived["Company Name"]).value_counts().to_dict()
+        ages = pd.DataFrame({name: derived[name] for name in ("Company Name", "Company Age", "Size mean")})
+        imputer = GroupImputer(AGE_IMPUTATIONS).fit(ages)
+        tables = {group: table for _, group, table in imputer.statistics_}
+        self.company_age_ = tables["Company Name"]
+        self.age_by_size_ = tables["Size Bin"]
+        self.size_edges_ = imputer.size_edges_
+        self.fill_values_ = {
+            "Rating": float(np.nanmedian(derived["Rating"])),
+            "Company Age": float(np.nanmedian(derived["Company Age"])),
+        }
+
+        self.vocabularies_ = {
+            "Ownership_Group": sorted(set(derived["Ownership_Group"])),
+            "Industry_Group": sorted(set(derived["Industry_Group"])),
+            "Role": sorted(set(derived["Role"])),
+            "state": _frequent(derived["state"], self.min_share),
+            "city": _frequent(derived["city"], self.min_share),
+            "StateHeadquarters": sorted(set(derived["StateHeadquarters"])),
+        }
+        self._build_layout()
+        return self
+
+    def _build_layout(self):
+        self.layout_ = layout(self.words)
+        self.feature_names_ = []
+        self.offsets_ = {}
+        self.lookup_ = {}
+        for name, kind in self.layout_:
+            self.offsets_[name] = len(self.feature_names_)
+            if kind == "num":
+                self.feature_names_.append(name)
+            else:
+                vocab = self.vocabularies_[name]
+                self.lookup_[name] = {v: i for i, v in enumerate(vocab)}
+                self.feature_names_.extend(f"{name}_{v}" for v in vocab)
+
+    def codes(self, name: str, values) -> np.ndarray:
+        """Codis enters d'una variable categòrica (-1 si el valor no s'ha vist)."""
+        lookup = self.lookup_[name]
+        return np.fromiter((lookup.get(v, -1) for v in values), dtype=np.intp, count=len(values))
+
+    def _encoded(self, data):
+        """Genera (offset, tipus, valors o codis) per a cada bloc de variables."""
+        cols = _columns(data)
+        derived = self._derive(cols)
+
+        # Imputació de nuls i variables apreses al fit
+        age = derived["Company Age"]
+        for i in np.flatnonzero(np.isnan(age)):
+            age[i] = self.company_age_.get(derived["Company Name"][i], np.nan)
+        missing = np.flatnonzero(np.isnan(age))
+        if len(missing):
+            bins = size_bin(derived["Size mean"][missing], self.size_edges_)
+            age[missing] = [self.age_by_size_.get(b, self.fill_values_["Company Age"]) for b in bins]
+        rating = derived["Rating"]
+        rating[np.isnan(rating)] = self.fill_values_["Rating"]
+        derived["Company Offers"] = np.array(
+            [self.company_counts_.get(c, 1) for c in derived["Company Name"]], dtype=float)
+
+        n = len(rating)
+        blocks = []
+        for name, kind in self.layout_:
+            values = derived[name] if kind == "num" else self.codes(name, derived[name])
+            blocks.append((self.offsets_[name], kind, values))
+        return n, blocks
+
+    def transform(self, data, sparse: bool = False):
+        """
+        Matriu de variables (files x len(feature_names_)) en float64.
+
+        Args:
+            sparse (bool): Retornar una matriu CSR de SciPy en lloc d'un array
+                dens. Les columnes són les de `feature_names_`.
+        """
+        n, blocks = self._encoded(data)
+        if sparse:
+            return self._to_csr(n, blocks)
+
+        X = np.zeros((n, len(self.feature_names_)))
+        rows = np.arange(n)
+        for offset, kind, values in blocks:
+            if kind == "num":
+                X[:, offset] = values
+            else:
+                seen = values >= 0
+                X[rows[seen], offset + values[seen]] = 1.0
+        return X
+
+    def _to_csr(self, n, blocks):
+        from scipy import sparse
+
+        rows, cols, data = [], [], []
+        for offset, kind, values in blocks:
+            if kind == "num":
+                nz = np.flatnonzero(values)
+                rows.append(nz)
+                cols.append(np.full(len(nz), offset))
+                data.append(values[nz])
+            else:
+                seen = np.flatnonzero(values >= 0)
+                rows.append(seen)
+                cols.append(offset + values[seen])
+                data.append(np.ones(len(seen)))
+
+        X = sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n, len(self.feature_names_)),
+        )
+        X.sort_indices()
+        return X
+
+    def transform_sparse(self, data):
+        """Retorna (matriu CSR, índex de columnes)."""
+        return self.transform(data, sparse=True), pd.Index(self.feature_names_)
+
+    def transform_frame(self, data, compact: bool = False) -> pd.DataFrame:
+        """
+        Variables en un DataFrame. Amb `compact` les dummies i les marques
+        'contains_*' són uint8 i la resta de columnes el tipus més petit que
+        les representa exactament (`compact_dtypes`).
+        """
+        frame = pd.DataFrame(self.transform(data), columns=self.feature_names_)
+        if compact:
+            from src.dtypes import compact_dtypes
+            frame = compact_dtypes(frame)
+        return frame
+
+    def fit_transform(self, df: pd.DataFrame) -> np.ndarray:
+        return self.fit(df).transform(df)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path) -> "FeatureEncoder":
+        with open(path, "rb") as f:
+            return pickle.load(f)
@@ -0,0 +1,177 @@
+"""
+evaluation.py
+
+Validació creuada amb un sol ajust per fold.
+
+Al notebook cada model passa per tres `cross_val_score` (MAE, RMSE i R²) i
+`get_mae` el torna a validar: cada model s'entrena quatre cops per fold. Aquí
+cada model s'entrena un sol cop per fold (els folds en paral·lel) i es desen
+les prediccions fora de fold. Totes les mètriques, incloses les que s'afegeixin
+més endavant, es calculen a partir d'aquestes prediccions.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import delayed
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+
+from config.log_config import console
+from config.tracing import TRACER
+from src.fit_cache import array_hash, cached_parallel
+from src.models import NUM_COLS
+from src.training import train_targets
+
+
+METRICS = {
+    "MAE": mean_absolute_error,
+    "RMSE": lambda y_true, y_pred: np.sqrt(mean_squared_error(y_true, y_pred)),
+    "R2": r2_score,
+}
+
+
+def _fit_predict(model, X, Y, train_idx, test_idx, scale_cols, feature_names):
+    fitted = train_targets(model, X[train_idx], Y[train_idx], scale_cols, feature_names)
+    return fitted.predict(X[test_idx]).reshape(len(test_idx), -1)
+
+
+def cross_val_predictions(model, X, Y, cv=None, scale_cols=NUM_COLS, feature_names=None,
+                          n_jobs: int = -1, cache=None):
+    """
+    Prediccions fora de fold amb un sol ajust per fold.
+
+    Args:
+        cv: Objecte de sklearn (KFold...) o nombre de folds. Per defecte,
+            KFold(5, shuffle=True, random_state=42) com al notebook.
+        Y: Un objectiu (vector) o diversos (files x objectius).
+        cache (FitCache): Memòria cau de les prediccions de cada fold.
+
+    Returns:
+        (prediccions, folds): prediccions de la mateixa forma que Y (2D) i el
+        número de fold de cada fila.
+    """
+    cv = KFold(n_splits=cv or 5, shuffle=True, random_state=42) if cv is None or isinstance(cv, int) else cv
+    Y = np.asarray(Y, dtype=float).reshape(len(Y), -1)
+    splits = list(cv.split(X))
+
+    keys = []
+    if cache is not None:
+        data = (array_hash(X), array_hash(Y), list(scale_cols), feature_names)
+        keys = [cache.key("oof", model, data, train_idx, test_idx) for train_idx, test_idx in splits]
+    parts = cached_parallel(cache, keys, [
+        delayed(_fit_predict)(model, X, Y, train_idx, test_idx, scale_cols, feature_names)
+        for train_idx, test_idx in splits
+    ], n_jobs)
+
+    pred = np.empty_like(Y)
+    folds = np.empty(len(Y), dtype=int)
+    for k, ((_, test_idx), part) in enumerate(zip(splits, parts)):
+        pred[test_idx] = part
+        folds[test_idx] = k
+    return pred, folds
+
+
+def fold_scores(Y, pred, folds, metrics=METRICS, targets=None) -> pd.DataFrame:
+    """Mètriques de cada fold i objectiu a partir de les prediccions fora de fold."""
+    Y = np.asarray(Y, dtype=float).reshape(len(Y), -1)
+    pred = np.asarray(pred).reshape(len(pred), -1)
+    targets = targets or [f"y{i}" for i in range(Y.shape[1])]
+    rows = []
+    for k in np.unique(folds):
+        mask = folds == k
+        for i, target in enumerate(targets):
+            rows.append({"Fold": int(k), "Objectiu": target,
+                         **{name: func(Y[mask, i], pred[mask, i]) for name, func in metrics.items()}})
+    return pd.DataFrame(rows)
+
+
+def summarize(scores: pd.DataFrame, metrics=METRICS) -> pd.DataFrame:
+    """Mitjana i desviació de cada mètrica per objectiu (columnes '<mètrica>_mean/_std')."""
+    grouped = scores.groupby("Objectiu", sort=False)[list(metrics)]
+    summary = grouped.mean().add_suffix("_mean").join(grouped.std(ddof=0).add_suffix("_std"))
+    return summary[[f"{m}_{s}" for m in metrics for s in ("mean", "std")]].reset_index()
+
+
+def evaluate_models(models: dict, X, Y, cv=None, metrics=METRICS, targets=None,
+                    scale_cols=NUM_COLS, feature_names=None, n_jobs: int = -1, cache=None):
+    """
+    Compara models amb validació creuada (una fila per model i objectiu, com la
+    taula `results` del notebook).
+
+    Returns:
+        (results, oof): DataFrame de resultats i {model: (prediccions, folds)}
+        per calcular més mètriques sense tornar a entrenar.
+    """
+    tables, oof = [], {}
+    for name, model in models.items():
+        with TRACER.stage(f"evaluate_models:{name}", X):
+            pred, folds = cross_val_predictions(model, X, Y, cv, scale_cols, feature_names, n_jobs, cache)
+        oof[name] = (pred, folds)
+        summary = summarize(fold_scores(Y, pred, folds, metrics, targets), metrics)
+        summary.insert(0, "Model", name)
+        tables.append(summary)
+    return pd.concat(tables, ignore_index=True), oof
+
+
+def check_evaluation(df: pd.DataFrame):
+    """
+    Compara les mètriques i el temps amb el bucle del notebook (tres
+    `cross_val_score` per model i `get_mae`) per a 'min_salary'.
+    """
+    from sklearn.metrics import make_scorer
+    from sklearn.model_selection import cross_val_score, train_test_split
+    from sklearn.pipeline import make_pipeline
+
+    from src.encoding import FeatureEncoder
+    from src.features import salary_targets
+    from src.models import ColumnScaler, column_positions, get_models
+
+    console.rule("[title]Validació creuada amb un sol ajust per fold[/title]")
+    df = df[df["Salary Estimate"] != "-1"]
+    encoder = FeatureEncoder().fit(df)
+    X, names = encoder.transform(df), encoder.feature_names_
+    y = salary_targets(df)["min_salary"].to_numpy()
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=0)
+    models = get_models()
+    kf = KFold(n_splits=5, shuffle=True, random_state=42)
+
+    start = time.perf_counter()
+    expected = {}
+    for name, model in models.items():
+        pipeline = make_pipeline(ColumnScaler(column_positions(NUM_COLS, names)), model)
+        expected[name] = {
+            "MAE": -cross_val_score(pipeline, X_train, y_train, cv=kf, n_jobs=-1,
+                                    scoring=make_scorer(METRICS["MAE"], greater_is_better=False)).mean(),
+            "RMSE": -cross_val_score(pipeline, X_train, y_train, cv=kf, n_jobs=-1,
+                                     scoring=make_scorer(METRICS["RMSE"], greater_is_better=False)).mean(),
+            "R2": cross_val_score(pipeline, X_train, y_train, cv=kf, n_jobs=-1,
+                                  scoring=make_scorer(METRICS["R2"])).mean(),
+        }
+        cross_val_score(pipeline, X_train, y_train, cv=5, n_jobs=-1, scoring="neg_mean_absolute_error")  # get_mae
+    notebook_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results, oof = evaluate_models(models, X_train, y_train, kf, targets=["min_salary"], feature_names=names)
+    harness_time = time.perf_counter() - start
+
+    for row in results.itertuples(index=False):
+        for metric, value in expected[row.Model].items():
+            assert np.isclose(getattr(row, f"{metric}_mean"), value, rtol=1e-6), (row.Model, metric)
+    console.print("[success]Mateixes mètriques que cross_val_score[/success]")
+    console.print(results.round(3).to_string(index=False))
+    console.print(f"[info]Bucle del notebook:[/info] {notebook_time:.1f} s")
+    console.print(f"[info]Un ajust per fold:[/info] {harness_time:.1f} s "
+                  f"({notebook_time / harness_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_evaluation(df)
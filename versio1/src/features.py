@@ -0,0 +1,170 @@
+"""
+features.py
+
+Variables derivades del notebook Preprocessing.ipynb: grups d'indústria i de
+propietat, senioritat i rol a partir del 'Job Title', paraules clau de la
+'Job Description', nombre de competidors, estat i ciutat de la 'Location'...
+"""
+
+import re
+
+import pandas as pd
+
+from src.parsing import salary_columns
+from src.text import TokenIndex
+
+
+INDUSTRY_GROUPS = {
+    'IT & Software': ['IT Services', 'Computer Hardware & Software', 'Enterprise Software & Network Solutions', 'Internet', 'Telecommunications Services', 'Venture Capital & Private Equity'],
+    'Consulting & Finance': ['Consulting', 'Investment Banking & Asset Management', 'Financial Transaction Processing', 'Brokerage Services', 'Financial Analytics & Research', 'Banks & Credit Unions', 'Insurance Carriers', 'Insurance Agencies & Brokerages', 'Stock Exchanges'],
+    'Health & Pharma': ['Health Care Services & Hospitals', 'Biotech & Pharmaceuticals', 'Health Care Products Manufacturing', 'Health, Beauty, & Fitness', 'Social Assistance', 'Health Fundraising Organizations'],
+    'Education': ['Colleges & Universities', 'K-12 Education', 'Education Training Services', 'Preschool & Child Care'],
+    'Manufacturing & Industrial': ['Industrial Manufacturing', 'Electrical & Electronic Manufacturing', 'Consumer Products Manufacturing', 'Miscellaneous Manufacturing', 'Chemical Manufacturing', 'Food & Beverage Manufacturing', 'Transportation Equipment Manufacturing'],
+    'Retail & Consumer': ['Consumer Electronics & Appliances Stores', 'Department, Clothing, & Shoe Stores', 'Grocery Stores & Supermarkets', 'Food & Beverage Stores', 'Convenience Stores & Truck Stops', 'Vehicle Dealers', 'Pet & Pet Supplies Stores', 'Sporting Goods Stores', 'Home Centers & Hardware Stores', 'Other Retail Stores', 'Casual Restaurants', 'Cable, Internet & Telephone Providers'],
+    'Construction & Engineering': ['Architectural & Engineering Services', 'Construction', 'Commercial Equipment Repair & Maintenance', 'Building & Personnel Services', 'Logistics & Supply Chain'],
+    'Media & Marketing': ['Advertising & Marketing', 'TV Broadcast & Cable Networks', 'Publishing', 'News Outlet', 'Motion Picture Production & Distribution', 'Audiovisual', 'Catering & Food Service Contractors'],
+    'Government & Public': ['Federal Agencies', 'State & Regional Agencies', 'Municipal Governments'],
+    'Energy & Utilities': ['Energy', 'Oil & Gas Services', 'Utilities'],
+    'Transportation': ['Trucking', 'Transportation Management', 'Express Delivery Services', 'Truck Rental & Leasing'],
+}
+INDUSTRY_MAPPING = {industry: group for group, industries in INDUSTRY_GROUPS.items() for industry in industries}
+INDUSTRY_OTHER = 'Other / Miscellaneous'
+
+OWNERSHIP_GROUPS = {
+    "Private": ["Company - Private"],
+    "Public": ["Company - Public"],
+    "Government": ["Government"],
+    "Public/Nonprofit": ["Hospital", "School / School District", "Nonprofit Organization"],
+    "University": ["College / University"],
+}
+OWNERSHIP_GROUP_MAP = {x: group for group, values in OWNERSHIP_GROUPS.items() for x in values}
+OWNERSHIP_OTHER = "Other"
+
+SENIORITY_ORDER = ["junior", "mid", "senior", "manager"]
+SENIORITY_MAPPING = {"junior": 0, "mid": 1, "senior": 2, "manager": 3}
+
+# Paraules de la 'Job Description' escollides amb l'ANOVA del notebook
+BEST_WORDS = ['requirements', 'team', 'reporting', 'information', 'management', 'skills']
+
+US_STATES = {
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN',
+    'IA', 'KS', 'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV',
+    'NH', 'NJ', 'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN',
+    'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY', 'DC', 'PR'
+}
+
+
+def map_industry(industry):
+    return INDUSTRY_MAPPING.get(industry, INDUSTRY_OTHER)
+
+
+def map_ownership(x):
+    return OWNERSHIP_GROUP_MAP.get(x, OWNERSHIP_OTHER)
+
+
+def clean_title(title):
+    title = title.lower()
+    title = re.sub(r'[^a-z0-9\s]', '', title)  # eliminar símbols
+    title = re.sub(r'\s+', ' ', title).strip()
+    return title
+
+
+def extract_seniority(title):
+    t = title.lower()
+
+    if any(x in t for x in ["director", "manegement", "head", "vp", "manager", "lead", " iv", "iv "]) \
+        or re.search(r'\bIV\b', title):
+        return "manager"
+
+    elif any(x in t for x in ["senior", "sr ", "principal", "iii", "specialist"]):
+        return "senior"
+
+    elif any(x in t for x in ["ii"]):
+        return "mid"
+
+    elif any(x in t for x in ["junior", "jr ", "entry level", "intern", "summer", "associate"]) \
+        or re.search(r'\bI\b', title):
+        return "junior"
+
+    else:
+        return "mid"
+
+
+def extract_role(title):
+    t = title.lower()
+
+    # rols especifics
+    if re.search(r'\bdata scientist\b', t) or re.search(r'\bdata engineer\b', t) or "developer" in t:
+        return "data_scientist"
+    if re.search(r'\bdata warehouse\b', t) or "etl" in t or "integration" in t:
+        return "data_warehouse"
+
+    # rols de negoci
+    if "financial" in t or "pricing" in t or "accounting" in t or "revenue" in t:
+        return "financial_analyst"
+    if "marketing" in t or "product" in t:
+        return "marketing_analyst"
+    if "business analyst" in t:
+        return "business_analyst"
+
+    # rols especialitzats
+    if "quality" in t:
+        return "data_quality"
+    if "governance" in t or "steward" in t or "lineage" in t:
+        return "data_governance"
+    if "report" in t or "visualization" in t:
+        return "data_reporting"
+    if "management analyst" in t or "management" in t:
+        return "data_management"
+    if "health" in t or "clinical" in t or "patient" in t or "epidemiology" in t or "healthcare" in t:
+        return "healthcare_analyst"
+    if "security" in t or "risk" in t or "protection" in t:
+        return "security_analyst"
+    if "sql" in t:
+        return "sql_analyst"
+
+    # rols generals
+    if "data analyst" in t:
+        return "data_analyst"
+
+    # altres
+    return "other"
+
+
+def clean_text(text):
+    text = text.lower()  # Convertir a minúscules
+    text = re.sub(r'\d+', '', text)  # Eliminar nombres
+    text = re.sub(r'[^\w\s]', '', text)  # Eliminar signes de puntuació
+    return text
+
+
+def num_competitors(competitors):
+    return 0 if competitors == '-1' else len(competitors.split(','))
+
+
+def salary_targets(df: pd.DataFrame) -> pd.DataFrame:
+    """'min_salary', 'max_salary' i 'avg_salary' en milers (com al notebook)."""
+    return salary_columns(df["Salary Estimate"]) / 1000
+
+
+def state_and_city(location: pd.Series):
+    """Retorna (estat, ciutat) a partir de la 'Location' ('Austin, TX')."""
+    parts = location.str.split(',')
+    return parts.str[-1].str.strip(), parts.str[0].str.strip()
+
+
+def title_features(title: pd.Series) -> pd.DataFrame:
+    """'Seniority_code' i 'Role' del 'Job Title' (un sol cop per títol diferent)."""
+    from src.titles import TITLES
+
+    classified = TITLES.classify(title)
+    return pd.DataFrame({
+        "Seniority_code": classified["Seniority_code"].astype(int),
+        "Role": classified["Role"].astype(object),
+    })
+
+
+def description_features(description: pd.Series, words=BEST_WORDS) -> pd.DataFrame:
+    """Columnes 'contains_<paraula>' (1/0) de la 'Job Description'."""
+    flags = TokenIndex().fit(description).contains(list(words)).toarray().astype(int)
+    return pd.DataFrame(flags, index=description.index, columns=[f'contains_{word}' for word in words])
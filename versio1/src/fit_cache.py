@@ -0,0 +1,239 @@
+"""
+fit_cache.py
+
+Memòria cau en disc de models entrenats i de resultats per fold.
+
+Cada entrada s'identifica pel hash de les dades d'entrenament (X i y), la
+classe i els paràmetres del model, les columnes normalitzades i la partició
+(índexs d'entrenament i de test). Si res d'això canvia, tornar a executar la
+selecció de models llegeix els resultats del disc en lloc d'entrenar.
+
+La mida total està limitada: quan se supera, s'esborren les entrades usades
+fa més temps (la data de modificació es renova a cada lectura) fins a quedar
+per sota del 90% del límit. La mida es porta comptada a cada escriptura, així
+que el directori només es recorre quan cal esborrar.
+"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import sklearn
+from joblib import Parallel
+from scipy import sparse
+
+from config.log_config import console
+
+
+FIT_CACHE_DIR = Path(os.environ.get("MODEL_CACHE_DIR",
+                                    Path(__file__).parent.parent / "data" / "cache" / "models"))
+MAX_CACHE_MB = float(os.environ.get("MODEL_CACHE_MB", 2048))
+CACHE_SUFFIX = ".joblib"
+# En superar el límit, s'esborra fins a aquesta fracció
+EVICT_TO = 0.9
+
+_MISSING = object()
+
+
+def array_hash(X) -> str:
+    """Hash del contingut d'un array dens o d'una matriu CSR."""
+    digest = hashlib.blake2b(digest_size=16)
+    if sparse.issparse(X):
+        X = X.tocsr()
+        parts = [X.data, X.indices, X.indptr]
+    else:
+        parts = [np.ascontiguousarray(X)]
+    digest.update(repr((type(X).__name__, X.shape, [str(p.dtype) for p in parts])).encode())
+    for part in parts:
+        digest.update(np.ascontiguousarray(part).view(np.uint8))
+    return digest.hexdigest()
+
+
+def estimator_key(model) -> str:
+    """Classe i paràmetres del model (també dels models niats) com a text."""
+    params = []
+    for name, value in sorted(model.get_params(deep=False).items()):
+        params.append((name, estimator_key(value) if hasattr(value, "get_params") else repr(value)))
+    return f"{type(model).__module__}.{type(model).__qualname__}{params}"
+
+
+class FitCache:
+    """
+    Args:
+        path: Directori de la memòria cau.
+        max_mb (float): Mida màxima en MB.
+    """
+
+    def __init__(self, path=FIT_CACHE_DIR, max_mb: float = MAX_CACHE_MB):
+        self.path = Path(path)
+        self.max_bytes = max_mb * 1e6
+        self.hits = self.misses = self.evictions = 0
+        self._total = None      # bytes al disc, es calcula a la primera escriptura
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Clau d'una entrada a partir de les parts (text, arrays o models)."""
+        digest = hashlib.blake2b(sklearn.__version__.encode(), digest_size=20)
+        for part in parts:
+            if isinstance(part, np.ndarray) or sparse.issparse(part):
+                part = array_hash(part)
+            elif hasattr(part, "get_params"):
+                part = estimator_key(part)
+            digest.update(repr(part).encode())
+        return digest.hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str, default=None):
+        path = self._file(key)
+        try:
+            value = joblib.load(path)
+        except (FileNotFoundError, EOFError):
+            self.misses += 1
+            return default
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        path = self._file(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self._total is None:
+            self._total = self._size_bytes()
+        replaced = path.stat().st_size if path.exists() else 0
+        tmp = path.with_suffix(".tmp")
+        joblib.dump(value, tmp)
+        self._total += tmp.stat().st_size - replaced
+        os.replace(tmp, path)
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        for path in self.path.glob(f"*/*{CACHE_SUFFIX}"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:       # esborrada per un altre procés
+                continue
+            yield st.st_mtime, st.st_size, path
+
+    def _size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        files = sorted(self._entries())
+        total = sum(size for _, size, _ in files)
+        if total > self.max_bytes:
+            for _, size, path in files:
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                self.evictions += 1
+        self._total = total
+
+    def size_mb(self) -> float:
+        return self._size_bytes() / 1e6
+
+    def clear(self):
+        for path in self.path.glob(f"*/*{CACHE_SUFFIX}"):
+            path.unlink()
+        self._total = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0, "size_mb": self.size_mb()}
+
+    def print_stats(self):
+        s = self.stats()
+        console.print(f"[info]Memòria cau de models:[/info] {s['hits']} encerts, {s['misses']} errades "
+                      f"({s['hit_rate']:.0%}), {s['evictions']} esborrades, {s['size_mb']:.1f} MB")
+
+
+def cached_parallel(cache, keys: list, calls: list, n_jobs: int = -1) -> list:
+    """
+    Executa `calls` (llista de `delayed(...)`) en paral·lel excepte les que ja
+    són a la memòria cau amb la clau corresponent de `keys`. Les lectures i
+    escriptures es fan al procés principal.
+    """
+    if cache is None:
+        return Parallel(n_jobs=n_jobs)(calls)
+
+    results = [cache.get(key, _MISSING) for key in keys]
+    missing = [i for i, value in enumerate(results) if value is _MISSING]
+    computed = Parallel(n_jobs=n_jobs)(calls[i] for i in missing)
+    for i, value in zip(missing, computed):
+        cache.put(keys[i], value)
+        results[i] = value
+    return results
+
+
+def cached_fit(cache, model, X, Y, scale_cols, feature_names=None):
+    """`train_targets` amb el model entrenat desat a la memòria cau."""
+    from src.training import train_targets
+
+    if cache is None:
+        return train_targets(model, X, Y, scale_cols, feature_names)
+    key = cache.key("fit", model, X, np.asarray(Y), list(scale_cols), feature_names)
+    fitted = cache.get(key, _MISSING)
+    if fitted is _MISSING:
+        fitted = train_targets(model, X, Y, scale_cols, feature_names)
+        cache.put(key, fitted)
+    return fitted
+
+
+def check_fit_cache(df, cache_dir=None):
+    """
+    Executa dos cops la comparació de models del notebook amb la memòria cau i
+    mostra el temps i els encerts de cada execució.
+    """
+    import tempfile
+
+    from sklearn.model_selection import train_test_split
+
+    from src.encoding import FeatureEncoder
+    from src.evaluation import evaluate_models
+    from src.features import salary_targets
+    from src.models import get_models
+
+    console.rule("[title]Memòria cau de models[/title]")
+    df = df[df["Salary Estimate"] != "-1"]
+    encoder = FeatureEncoder().fit(df)
+    X, names = encoder.transform(df), encoder.feature_names_
+    y = salary_targets(df)["min_salary"].to_numpy()
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FitCache(cache_dir or tmp)
+        previous = None
+        for run in (1, 2):
+            start = time.perf_counter()
+            results, _ = evaluate_models(get_models(), X_train, y_train, feature_names=names, cache=cache)
+            console.print(f"[info]Execució {run}:[/info] {time.perf_counter() - start:.2f} s")
+            cache.print_stats()
+            if previous is not None:
+                assert results.equals(previous)
+            previous = results
+        console.print("[success]Mateixos resultats llegint de la memòria cau[/success]")
+
+        small = FitCache(cache.path, max_mb=cache.size_mb() / 2)
+        small._evict()
+        console.print(f"[info]Límit de {small.max_bytes / 1e6:.2f} MB:[/info] "
+                      f"{small.evictions} entrades esborrades, {small.size_mb():.2f} MB")
+
+
+if __name__ == "__main__":
+    import sys
+
+    import pandas as pd
+
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_fit_cache(df)
@@ -0,0 +1,172 @@
+"""
+models.py
+
+Models de regressió del notebook Modelitzacio.ipynb i funcions per entrenar-los
+i predir. Les funcions accepten tant DataFrames o arrays densos com matrius CSR
+de SciPy (sense convertir-les a denses).
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression, Ridge, Lasso
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.pipeline import make_pipeline
+
+from config.log_config import console
+
+
+# Columnes numèriques contínues a normalitzar
+NUM_COLS = ['Company Age', 'Company Offers', 'num_competitors']
+
+
+def get_models() -> dict:
+    """Models a provar (els mateixos que al notebook)."""
+    return {
+        'LinearRegression': LinearRegression(),
+        'Ridge': Ridge(alpha=1.0, random_state=42),
+        'Lasso': Lasso(alpha=0.1, random_state=42),
+        'RandomForest': RandomForestRegressor(n_estimators=100, random_state=42),
+        'GradientBoosting': GradientBoostingRegressor(n_estimators=100, random_state=42),
+        'KNN': KNeighborsRegressor(n_neighbors=5)
+    }
+
+
+def column_positions(columns, feature_names) -> list:
+    """Posicions de `columns` dins de `feature_names`."""
+    index = pd.Index(feature_names)
+    return [int(index.get_loc(c)) for c in columns]
+
+
+class ColumnScaler(BaseEstimator, TransformerMixin):
+    """
+    StandardScaler només per a unes columnes. Accepta DataFrames (columnes per
+    nom), arrays densos i matrius CSR (columnes per posició). Amb CSR només
+    es tornen denses les columnes escalades.
+    """
+
+    def __init__(self, columns=NUM_COLS):
+        self.columns = columns
+
+    def _values(self, X):
+        if isinstance(X, pd.DataFrame):
+            return X[self.columns].to_numpy(dtype=float)
+        if sparse.issparse(X):
+            return X[:, self.columns].toarray()
+        return np.asarray(X, dtype=float)[:, self.columns]
+
+    def fit(self, X, y=None):
+        values = self._values(X)
+        self.mean_ = values.mean(axis=0)
+        scale = values.std(axis=0)
+        self.scale_ = np.where(scale == 0, 1.0, scale)
+        return self
+
+    def transform(self, X):
+        scaled = (self._values(X) - self.mean_) / self.scale_
+
+        if isinstance(X, pd.DataFrame):
+            X = X.copy()
+            X[self.columns] = scaled
+            return X
+
+        if not sparse.issparse(X):
+            X = np.array(X, dtype=float)
+            X[:, self.columns] = scaled
+            return X
+
+        coo = X.tocoo()
+        keep = ~np.isin(coo.col, self.columns)
+        n = X.shape[0]
+        rows = np.concatenate([coo.row[keep], np.repeat(np.arange(n), len(self.columns))])
+        cols = np.concatenate([coo.col[keep], np.tile(self.columns, n)])
+        data = np.concatenate([coo.data[keep], scaled.ravel()])
+        out = sparse.csr_matrix((data, (rows, cols)), shape=X.shape)
+        out.sort_indices()
+        return out
+
+
+def train(model, X, y, scale_cols=NUM_COLS, feature_names=None):
+    """
+    Entrena `model` amb les columnes `scale_cols` normalitzades.
+
+    Args:
+        X: DataFrame, array dens o matriu CSR.
+        feature_names: Noms de les columnes de X quan no és un DataFrame, per
+            trobar la posició de `scale_cols`.
+    """
+    columns = list(scale_cols)
+    if not isinstance(X, pd.DataFrame) and feature_names is not None:
+        columns = column_positions(columns, feature_names)
+    pipeline = make_pipeline(ColumnScaler(columns), clone(model))
+    return pipeline.fit(X, y)
+
+
+def predict(pipeline, X) -> np.ndarray:
+    return pipeline.predict(X)
+
+
+def _synthetic_design(rows: int, categories: int, blocks: int = 5, seed: int = 0):
+    """Matriu CSR amb 3 columnes numèriques i `blocks` grups one-hot."""
+    rng = np.random.default_rng(seed)
+    numeric = rng.normal(size=(rows, 3))
+    codes = rng.integers(0, categories, size=(rows, blocks)) + categories * np.arange(blocks)
+    X = sparse.hstack([
+        sparse.csr_matrix(numeric),
+        sparse.csr_matrix((np.ones(rows * blocks), (np.repeat(np.arange(rows), blocks), codes.ravel())),
+                          shape=(rows, categories * blocks)),
+    ]).tocsr()
+    y = numeric @ [1.0, -2.0, 0.5] + X[:, 3:].sum(axis=1).A1 + rng.normal(size=rows)
+    return X, y
+
+
+def _nbytes(X) -> int:
+    if sparse.issparse(X):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+
+def sparse_report(rows=(2_000, 20_000, 50_000), categories=(20, 100), max_dense_mb: float = 1000):
+    """
+    Compara memòria i temps d'entrenament entre la matriu densa i la CSR per a
+    diferents nombres de files i de categories.
+    """
+    from rich.table import Table
+
+    table = Table(title="Dens vs CSR", show_lines=True)
+    for col in ["Files", "Columnes", "Dens (MB)", "CSR (MB)", "Model", "Dens (s)", "CSR (s)"]:
+        table.add_column(col, style="cyan")
+
+    models = {
+        "Ridge": Ridge(alpha=1.0),
+        "Lasso": Lasso(alpha=0.1),
+        "KNN": KNeighborsRegressor(n_neighbors=5),
+    }
+    for n in rows:
+        for k in categories:
+            X, y = _synthetic_design(n, k)
+            dense_mb = n * X.shape[1] * 8 / 1e6
+            X_dense = X.toarray() if dense_mb <= max_dense_mb else None
+            for name, model in models.items():
+                times = []
+                for data in (X_dense, X):
+                    if data is None:
+                        times.append("-")
+                        continue
+                    start = time.perf_counter()
+                    fitted = train(model, data, y, scale_cols=[0, 1, 2])
+                    if name == "KNN":
+                        predict(fitted, data[:500])
+                    times.append(f"{time.perf_counter() - start:.3f}")
+                table.add_row(str(n), str(X.shape[1]), f"{dense_mb:.1f}", f"{_nbytes(X) / 1e6:.1f}",
+                              name, *times)
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    sparse_report()
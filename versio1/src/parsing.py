@@ -0,0 +1,209 @@
+"""
+parsing.py
+
+Parsers columnars per a 'Salary Estimate', 'Size', 'Revenue' i 'Founded'.
+
+Els valors d'aquestes columnes es repeteixen molt (unes desenes de valors
+diferents per milers d'ofertes), així que cada valor diferent es parseja un
+sol cop i el resultat es propaga a totes les files amb els codis de
+`pd.factorize`. Els parsers escalars són els mateixos que es feien servir fila
+a fila, de manera que el resultat és idèntic.
+"""
+
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.log_config import console
+
+
+SALARY_PATTERN = re.compile(r"(\d+)")
+CURRENT_YEAR = 2025
+
+
+# Parsers escalars (un valor)
+def parse_salary(text):
+    """Retorna (min, max) en unitats de salari a partir de 'Salary Estimate'."""
+    numbers = SALARY_PATTERN.findall(text)
+    if len(numbers) >= 2:
+        return int(numbers[0]) * 1000, int(numbers[1]) * 1000
+    else:
+        return None, None
+
+
+def parse_size(size):
+    """'201 to 500 employees' -> 350, '10000+ employees' -> 10000.0"""
+    if size in [None, '-1', 'Unknown / Non-Applicable']:
+        return None
+    if '+' in size:
+        return float(size.replace('+ employees', '').strip())
+    if 'to' in size:
+        low, high = size.replace('employees', '').split('to')
+        return int((float(low) + float(high)) / 2)
+    return None
+
+
+def parse_revenue(rev):
+    """'$100 to $500 million (USD)' -> 300000000.0"""
+    if rev in ['Unknown / Non-Applicable', '-1', None]:
+        return None
+
+    rev = rev.replace('(USD)', '').replace('$', '').strip()
+
+    # Caso "X to Y million" o "billion"
+    if 'to' in rev:
+        low, high = rev.split('to')
+        low = low.strip()
+        high = high.strip()
+
+        # Identificar unidad
+        if 'million' in high:
+            mul = 1_000_000
+        elif 'billion' in high:
+            mul = 1_000_000_000
+        else:
+            return None
+
+        low_val = float(low.replace('million', '').replace('billion', '').strip()) * mul
+        high_val = float(high.replace('million', '').replace('billion', '').strip()) * mul
+
+        return (low_val + high_val) / 2
+
+    return None
+
+
+def parse_founded(year):
+    """Any de fundació -> edat de l'empresa. -1 o nul -> None"""
+    return CURRENT_YEAR - year if (pd.notna(year) and year != -1) else None
+
+
+# Parsers columnars
+def factorize(values: pd.Series):
+    """
+    (codis, valors diferents) com `pd.factorize(values, use_na_sentinel=False)`.
+    Si la columna és categòrica es fan servir els seus codis i categories
+    directament, sense tornar a fer hash dels textos.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories.to_numpy(dtype=object)
+        missing = codes < 0
+        if missing.any():
+            # Els nuls van al final, com un valor més
+            codes = np.where(missing, len(uniques), codes)
+            uniques = np.append(uniques, np.array([np.nan], dtype=object))
+        return codes, uniques
+    return pd.factorize(values, use_na_sentinel=False)
+
+
+def map_unique(values: pd.Series, func) -> pd.Series:
+    """
+    Aplica `func` un sol cop per valor diferent de `values` i propaga el
+    resultat a totes les files. Equivalent a `values.apply(func)`.
+    """
+    codes, uniques = factorize(values)
+    parsed = pd.Series([func(u) for u in uniques])
+    return _broadcast(parsed, codes, values.index, values.name)
+
+
+def _broadcast(parsed: pd.Series, codes: np.ndarray, index: pd.Index, name=None) -> pd.Series:
+    result = pd.Series(parsed.to_numpy().take(codes), index=index, name=name)
+    if result.dtype != parsed.dtype:
+        result = result.astype(parsed.dtype)
+    return result
+
+
+def salary_columns(salary: pd.Series) -> pd.DataFrame:
+    """
+    Retorna un DataFrame amb 'min_salary', 'max_salary' i 'avg_salary' a partir
+    de la columna 'Salary Estimate'.
+    """
+    codes, uniques = factorize(salary)
+    lows, highs = zip(*[parse_salary(u) for u in uniques]) if len(uniques) else ((), ())
+
+    low = _broadcast(pd.Series(lows, dtype=None if lows else object), codes, salary.index, "min_salary")
+    high = _broadcast(pd.Series(highs, dtype=None if highs else object), codes, salary.index, "max_salary")
+    avg = ((low + high) / 2).rename("avg_salary")
+
+    return pd.DataFrame({"min_salary": low, "max_salary": high, "avg_salary": avg})
+
+
+def size_mean(size: pd.Series) -> pd.Series:
+    return map_unique(size, parse_size)
+
+
+def revenue_mean(revenue: pd.Series) -> pd.Series:
+    return map_unique(revenue, parse_revenue)
+
+
+def company_age(founded: pd.Series) -> pd.Series:
+    return map_unique(founded, parse_founded)
+
+
+def _rows_per_second(func, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return len(args[0]) / best
+
+
+def check_parsers(df: pd.DataFrame):
+    """
+    Compara els parsers columnars amb l'aplicació fila a fila i mostra les
+    files/s de cada versió.
+    """
+    from pandas.testing import assert_series_equal
+    from rich.table import Table
+
+    console.rule("[title]Parsers columnars[/title]")
+
+    # Salary
+    legacy = pd.DataFrame(index=df.index)
+    legacy["min_salary"], legacy["max_salary"] = zip(*df["Salary Estimate"].apply(parse_salary))
+    salary = salary_columns(df["Salary Estimate"])
+    assert_series_equal(salary["min_salary"], legacy["min_salary"])
+    assert_series_equal(salary["max_salary"], legacy["max_salary"])
+    assert_series_equal(salary["avg_salary"], (legacy["min_salary"] + legacy["max_salary"]) / 2,
+                        check_names=False)
+
+    cases = [
+        ("Size", parse_size, size_mean),
+        ("Revenue", parse_revenue, revenue_mean),
+        ("Founded", parse_founded, company_age),
+    ]
+    for col, scalar, columnar in cases:
+        assert_series_equal(columnar(df[col]), df[col].apply(scalar))
+    console.print("[success]Resultats idèntics a l'aplicació fila a fila[/success]")
+
+    table = Table(title="Files/s", show_lines=True)
+    table.add_column("Columna", style="cyan")
+    table.add_column("Fila a fila", style="red")
+    table.add_column("Columnar", style="green")
+    table.add_column("Acceleració", style="magenta")
+
+    def legacy_salary(s):
+        return zip(*s.apply(parse_salary))
+
+    cases = [("Salary Estimate", legacy_salary, salary_columns)] + [
+        (col, lambda s, f=scalar: s.apply(f), columnar) for col, scalar, columnar in cases
+    ]
+    for col, slow, fast in cases:
+        slow_rps = _rows_per_second(lambda s: list(slow(s)), df[col])
+        fast_rps = _rows_per_second(fast, df[col])
+        table.add_row(col, f"{slow_rps:,.0f}", f"{fast_rps:,.0f}", f"{fast_rps / slow_rps:.1f}x")
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_parsers(df)
@@ -0,0 +1,160 @@
+"""
+pipeline.py
+
+Executor d'etapes per a la neteja de dades.
+
+Cada etapa declara les columnes que llegeix i les que escriu, i retorna només
+les columnes noves. L'executor no copia el DataFrame a cada etapa: acumula les
+columnes noves i construeix la sortida un sol cop al final, eliminant les
+columnes descartades en un únic pas. Les columnes de l'entrada que es
+conserven es copien en construir la sortida, perquè modificar el resultat no
+canviï el DataFrame original.
+"""
+
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Callable
+
+import pandas as pd
+from rich.table import Table
+
+from config.log_config import console
+from config.tracing import TRACER
+
+
+@dataclass
+class Stage:
+    """
+    Etapa del pipeline.
+
+    Args:
+        name (str): Nom de l'etapa (per l'informe).
+        func (Callable): Funció que rep les columnes d'entrada i retorna un
+            DataFrame o un diccionari {columna: Series} amb les columnes noves.
+        reads (list): Columnes que llegeix l'etapa.
+        writes (list): Columnes que escriu. Accepta patrons ('Sector_*') per
+            a les columnes dummies.
+    """
+    name: str
+    func: Callable
+    reads: list
+    writes: list = field(default_factory=list)
+
+    def check_writes(self, columns):
+        undeclared = [c for c in columns
+                      if not any(fnmatchcase(c, pattern) for pattern in self.writes)]
+        if undeclared:
+            raise ValueError(f"L'etapa '{self.name}' escriu columnes no declarades: {undeclared}")
+
+
+@dataclass
+class StageStats:
+    name: str
+    rows: int
+    seconds: float
+    peak_mb: float      # None si no s'ha mesurat (profile=False)
+    columns: int
+
+
+class StageInput:
+    """
+    Vista de només lectura sobre el DataFrame original i les columnes ja
+    generades. Només dona accés a les columnes declarades a `reads`.
+    """
+
+    def __init__(self, stage: Stage, df: pd.DataFrame, produced: dict):
+        self._stage = stage
+        self._df = df
+        self._produced = produced
+
+    def __getitem__(self, col):
+        if col not in self._stage.reads:
+            raise KeyError(f"L'etapa '{self._stage.name}' llegeix '{col}' sense declarar-ho")
+        if col in self._produced:
+            return self._produced[col]
+        return self._df[col]
+
+    def __contains__(self, col):
+        return col in self._produced or col in self._df.columns
+
+    def __len__(self):
+        return len(self._df)
+
+    @property
+    def index(self):
+        return self._df.index
+
+
+def run_stages(df: pd.DataFrame, stages: list, drop: list = (), profile: bool = False):
+    """
+    Executa les etapes sobre `df` i retorna (DataFrame resultant, estadístiques).
+
+    Les columnes noves s'afegeixen al final en l'ordre en què es generen. Si
+    una etapa reescriu una columna existent, el valor nou substitueix l'antic
+    a la mateixa posició. Les columnes de `drop` s'eliminen al final. Les
+    columnes de `df` que es conserven es copien: la sortida no comparteix
+    memòria amb l'entrada.
+
+    Args:
+        profile (bool): Si és True, mesura també el pic de memòria de cada
+            etapa amb tracemalloc (té cost afegit).
+    """
+    produced = {}
+    stats = []
+
+    for stage in stages:
+        view = StageInput(stage, df, produced)
+        missing = [c for c in stage.reads if c not in view]
+        if missing:
+            raise KeyError(f"Falten columnes per a l'etapa '{stage.name}': {missing}")
+
+        if profile:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with TRACER.stage(stage.name, rows=len(df)) as span:
+            out = stage.func(view)
+            span.done(out)
+        seconds = time.perf_counter() - start
+        peak = None
+        if profile:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        out = dict(out.items())
+        stage.check_writes(out)
+        produced.update(out)
+        stats.append(StageStats(stage.name, len(df), seconds,
+                                None if peak is None else peak / 1e6, len(out)))
+
+    start = time.perf_counter()
+    drop = set(drop)
+    parts = {c: produced[c] if c in produced else df[c].copy()
+             for c in df.columns if c not in drop}
+    parts.update((c, col) for c, col in produced.items() if c not in drop and c not in parts)
+    result = pd.concat(parts, axis=1) if parts else df.iloc[:, :0]
+    stats.append(StageStats("build", len(df), time.perf_counter() - start, None, result.shape[1]))
+
+    return result, stats
+
+
+def print_stats(stats: list):
+    # La columna de memòria només es mostra si s'ha mesurat (profile=True)
+    memory = any(s.peak_mb is not None for s in stats)
+
+    table = Table(title="Etapes", show_lines=True)
+    table.add_column("Etapa", style="cyan")
+    table.add_column("Files", style="green")
+    table.add_column("Temps (ms)", style="magenta")
+    if memory:
+        table.add_column("Pic memòria (MB)", style="red")
+    table.add_column("Columnes", style="green")
+
+    for s in stats:
+        row = [s.name, str(s.rows), f"{s.seconds * 1000:.2f}"]
+        if memory:
+            row.append("-" if s.peak_mb is None else f"{s.peak_mb:.2f}")
+        table.add_row(*row, str(s.columns))
+
+    console.print(table)
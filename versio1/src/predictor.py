@@ -0,0 +1,237 @@
+"""
+predictor.py
+
+Predicció del salari d'una sola oferta amb poca latència.
+
+A partir d'un `FeatureEncoder` ajustat i dels models lineals entrenats (un per
+objectiu, p. ex. min_salary i max_salary) es precalculen taules de consulta:
+per a cada valor de cada variable categòrica, la seva contribució a cada
+objectiu. La normalització de les columnes numèriques es plega dins dels
+coeficients. Predir una oferta és sumar contribucions, sense DataFrames ni
+matrius.
+"""
+
+import pickle
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from config.log_config import console
+from config.tracing import traced
+from src.encoding import FeatureEncoder, _state, _city, _seniority, _role, _is_missing, _size
+from src.features import (
+    SENIORITY_MAPPING, clean_text, map_industry, map_ownership, num_competitors, salary_targets,
+)
+from src.imputation import size_bin
+from src.parsing import parse_founded
+
+
+class SalaryPredictor:
+    """
+    Args:
+        encoder (FeatureEncoder): Codificador ajustat.
+        pipelines (dict): {objectiu: pipeline ajustat (ColumnScaler + model lineal)}.
+    """
+
+    def __init__(self, encoder: FeatureEncoder, pipelines: dict):
+        self.encoder = encoder
+        self.targets = list(pipelines)
+
+        weights, intercepts = [], []
+        for pipeline in pipelines.values():
+            scaler, model = pipeline[0], pipeline[-1]
+            coef = np.asarray(model.coef_, dtype=float).copy()
+            intercept = float(model.intercept_)
+            cols = scaler.columns
+            if cols and not isinstance(cols[0], (int, np.integer)):
+                from src.models import column_positions
+                cols = column_positions(cols, encoder.feature_names_)
+            coef[cols] /= scaler.scale_
+            intercept -= float((coef[cols] * scaler.mean_).sum())
+            weights.append(coef)
+            intercepts.append(intercept)
+
+        W = np.vstack(weights).T  # variables x objectius
+        self._weights = W
+        self._intercept = tuple(intercepts)
+        self._numeric = {}
+        self._tables = {}
+        for name, kind in encoder.layout_:
+            offset = encoder.offsets_[name]
+            if kind == "num":
+                self._numeric[name] = tuple(W[offset].tolist())
+            else:
+                self._tables[name] = {value: tuple(W[offset + i].tolist())
+                                      for value, i in encoder.lookup_[name].items()}
+
+        self._zero = (0.0,) * len(self.targets)
+        self._words = [(word, self._numeric[f"contains_{word}"]) for word in encoder.words]
+
+        self._build_caches()
+
+    def _build_caches(self):
+        # Contribucions per valor cru (els valors es repeteixen molt)
+        self._ownership = lru_cache(maxsize=1 << 12)(self._ownership_contribution)
+        self._industry = lru_cache(maxsize=1 << 12)(self._industry_contribution)
+        self._title = lru_cache(maxsize=1 << 16)(self._title_contribution)
+        self._location = lru_cache(maxsize=1 << 16)(self._location_contribution)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ("_ownership", "_industry", "_title", "_location"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_caches()
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path) -> "SalaryPredictor":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _ownership_contribution(self, ownership):
+        return self._tables["Ownership_Group"].get(map_ownership(ownership), self._zero)
+
+    def _industry_contribution(self, industry):
+        return self._tables["Industry_Group"].get(map_industry(industry), self._zero)
+
+    def _title_contribution(self, title):
+        seniority = SENIORITY_MAPPING[_seniority(title)]
+        role = self._tables["Role"].get(_role(title), self._zero)
+        return tuple(s * seniority + r for s, r in zip(self._numeric["Seniority_code"], role))
+
+    def _location_contribution(self, location):
+        state = self._tables["state"].get(_state(location), self._zero)
+        city = self._tables["city"].get(_city(location), self._zero)
+        return tuple(s + c for s, c in zip(state, city))
+
+    def predict_one(self, posting: dict) -> dict:
+        """Prediu els objectius per a una oferta (dict amb les columnes crues)."""
+        enc = self.encoder
+        num = self._numeric
+        location = posting["Location"]
+
+        company = posting["Company Name"]
+        if _is_missing(company):
+            company = f"{location}Company"
+
+        rating = posting["Rating"]
+        if _is_missing(rating) or rating == -1:
+            rating = enc.fill_values_["Rating"]
+
+        age = parse_founded(posting["Founded"])
+        if age is None:
+            age = enc.company_age_.get(company)
+        if age is None:
+            size = _size(posting["Size"])
+            bin_ = np.nan if size is None else size_bin(size, enc.size_edges_)[0]
+            age = enc.age_by_size_.get(bin_, enc.fill_values_["Company Age"])
+
+        hq = posting["Headquarters"]
+        if _is_missing(hq) or hq == '-1':
+            hq = enc.hq_by_company_.get(company)
+        hq = None if hq is None else _state(hq)
+        if hq in (None, '-1', ''):
+            hq = _state(location)
+
+        values = (
+            (rating, num["Rating"]),
+            (age, num["Company Age"]),
+            (enc.company_counts_.get(company, 1), num["Company Offers"]),
+            (num_competitors(posting["Competitors"]), num["num_competitors"]),
+            (1.0 if posting["Easy Apply"] == 'True' else 0.0, num["Easy_Apply"]),
+        )
+        parts = (
+            self._ownership(posting["Type of ownership"]),
+            self._industry(posting["Industry"]),
+            self._title(posting["Job Title"]),
+            self._location(location),
+            self._tables["StateHeadquarters"].get(hq, self._zero),
+        )
+
+        description = clean_text(posting["Job Description"])
+        words = [w for word, w in self._words if word in description]
+
+        result = {}
+        for t, target in enumerate(self.targets):
+            total = self._intercept[t]
+            for value, w in values:
+                total += value * w[t]
+            for w in parts:
+                total += w[t]
+            for w in words:
+                total += w[t]
+            result[target] = total
+        return result
+
+    def predict(self, data) -> pd.DataFrame:
+        """Prediccions per lots (DataFrame o llista de dicts) amb la matriu CSR."""
+        X = self.encoder.transform(data, sparse=True)
+        index = data.index if isinstance(data, pd.DataFrame) else None
+        return pd.DataFrame(X @ self._weights + np.array(self._intercept), columns=self.targets, index=index)
+
+
+@traced()
+def train_predictor(df: pd.DataFrame, model=None, targets=("min_salary", "max_salary")):
+    """
+    Ajusta el codificador i un model lineal per objectiu (Ridge(alpha=0.01)
+    per defecte, el millor model del notebook) i retorna
+    (SalaryPredictor, encoder, pipelines).
+    """
+    from sklearn.linear_model import Ridge
+
+    from src.models import train
+
+    model = model if model is not None else Ridge(alpha=0.01)
+    df = df[df["Salary Estimate"] != "-1"]
+    encoder = FeatureEncoder().fit(df)
+    X = encoder.transform(df)
+    y = salary_targets(df)
+    pipelines = {t: train(model, X, y[t].to_numpy(), feature_names=encoder.feature_names_)
+                 for t in targets}
+    return SalaryPredictor(encoder, pipelines), encoder, pipelines
+
+
+def check_predictor(df: pd.DataFrame):
+    """
+    Compara les prediccions una a una amb la predicció per lots del mateix
+    model i mesura la latència per oferta.
+    """
+    predictor, encoder, pipelines = train_predictor(df)
+    df = df[df["Salary Estimate"] != "-1"]
+    X = encoder.transform(df)
+    postings = df.to_dict("records")
+
+    batch = {t: p.predict(X) for t, p in pipelines.items()}
+    single = [predictor.predict_one(p) for p in postings]
+    for t in predictor.targets:
+        diff = np.abs(np.array([s[t] for s in single]) - batch[t]).max()
+        assert diff < 1e-6, f"{t}: diferència màxima {diff}"
+    console.print("[success]Prediccions idèntiques a la predicció per lots[/success]")
+
+    latencies = []
+    for posting in postings:
+        start = time.perf_counter()
+        predictor.predict_one(posting)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1e6
+    console.print(f"[info]Latència per oferta:[/info] p50 {np.percentile(latencies, 50):.1f} µs, "
+                  f"p99 {np.percentile(latencies, 99):.1f} µs")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_predictor(df)
@@ -0,0 +1,198 @@
+"""
+regularization.py
+
+Cerca de l'alpha de Ridge i de Lasso sense reentrenar per a cada valor.
+
+- Ridge: per a cada fold es fa una sola SVD de la matriu d'entrenament
+  (centrada, com fa Ridge amb intercept) i l'error de tots els alphas s'obté
+  amb productes de matrius petites. També hi ha l'error leave-one-out amb una
+  sola SVD de tota la matriu.
+- Lasso: per a cada fold es calcula el camí de regularització amb
+  `lasso_path`, de l'alpha més gran al més petit, començant cada ajust des de
+  la solució de l'anterior.
+
+Les dues funcions retornen el mateix que `grid_search_targets`, així que es
+poden fer servir amb centenars d'alphas per a tots els objectius alhora.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.linear_model import lasso_path
+from sklearn.model_selection import KFold
+
+from config.log_config import console
+from src.encoding import TARGETS
+from src.models import NUM_COLS, ColumnScaler, column_positions
+
+
+def _prepare(X, Y, scale_cols, feature_names):
+    X = X.toarray() if sparse.issparse(X) else np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float).reshape(len(Y), -1)
+    cols = list(scale_cols)
+    if feature_names is not None:
+        cols = column_positions(cols, feature_names)
+    return X, Y, cols
+
+
+def _scaled_fold(X, cols, train_idx, test_idx):
+    """Normalitza com el pipeline (ColumnScaler ajustat només amb el fold d'entrenament)."""
+    scaler = ColumnScaler(cols).fit(X[train_idx])
+    return scaler.transform(X[train_idx]), scaler.transform(X[test_idx])
+
+
+def _result(mae: np.ndarray, alphas, targets):
+    scores = pd.DataFrame(mae, columns=list(targets))
+    scores.insert(0, "Hiperparàmetres", [{"alpha": float(a)} for a in alphas])
+    best = {target: ({"alpha": float(alphas[int(np.argmin(mae[:, i]))])}, float(mae[:, i].min()))
+            for i, target in enumerate(targets)}
+    return best, scores
+
+
+def ridge_path(X, Y, alphas, targets=TARGETS, cv: int = 5, scale_cols=NUM_COLS, feature_names=None):
+    """
+    MAE de validació creuada (KFold sense barrejar, com GridSearchCV(cv=5)) de
+    Ridge per a tots els `alphas` amb una SVD per fold.
+
+    Returns:
+        (best, scores) com `grid_search_targets`.
+    """
+    X, Y, cols = _prepare(X, Y, scale_cols, feature_names)
+    alphas = np.asarray(alphas, dtype=float)
+    mae = np.zeros((len(alphas), Y.shape[1]))
+
+    for train_idx, test_idx in KFold(n_splits=cv).split(X):
+        X_train, X_test = _scaled_fold(X, cols, train_idx, test_idx)
+        x_mean, y_mean = X_train.mean(axis=0), Y[train_idx].mean(axis=0)
+        U, s, Vt = np.linalg.svd(X_train - x_mean, full_matrices=False)
+        UtY = U.T @ (Y[train_idx] - y_mean)                  # k x objectius
+        Z = (X_test - x_mean) @ Vt.T                         # files de test x k
+        D = s / (s ** 2 + alphas[:, None])                   # alphas x k
+        pred = np.einsum("mk,ak,kt->amt", Z, D, UtY) + y_mean
+        mae += np.abs(pred - Y[test_idx]).mean(axis=1)
+
+    return _result(mae / cv, alphas, targets)
+
+
+def ridge_loo(X, Y, alphas, targets=TARGETS, scale_cols=NUM_COLS, feature_names=None):
+    """
+    MAE leave-one-out de Ridge per a tots els `alphas` amb una sola SVD:
+    el residu sense la fila i és e_i / (1 - h_ii).
+
+    Returns:
+        (best, scores) com `grid_search_targets`.
+    """
+    X, Y, cols = _prepare(X, Y, scale_cols, feature_names)
+    X = ColumnScaler(cols).fit_transform(X)
+    alphas = np.asarray(alphas, dtype=float)
+    n = len(X)
+
+    Xc, Yc = X - X.mean(axis=0), Y - Y.mean(axis=0)
+    U, s, _ = np.linalg.svd(Xc, full_matrices=False)
+    UtY = U.T @ Yc
+    shrink = s ** 2 / (s ** 2 + alphas[:, None])             # alphas x k
+
+    mae = np.empty((len(alphas), Y.shape[1]))
+    for a, f in enumerate(shrink):
+        residual = Yc - U @ (f[:, None] * UtY)
+        leverage = 1 / n + (U ** 2) @ f                      # diagonal de la matriu H
+        mae[a] = np.abs(residual / (1 - leverage)[:, None]).mean(axis=0)
+
+    return _result(mae, alphas, targets)
+
+
+def lasso_cv_path(X, Y, alphas, targets=TARGETS, cv: int = 5, scale_cols=NUM_COLS,
+                  feature_names=None, max_iter: int = 5000, tol: float = 1e-4):
+    """
+    MAE de validació creuada de Lasso per a tots els `alphas` amb un camí de
+    regularització per fold i objectiu (cada alpha comença de la solució de
+    l'anterior).
+
+    Returns:
+        (best, scores) com `grid_search_targets`.
+    """
+    X, Y, cols = _prepare(X, Y, scale_cols, feature_names)
+    alphas = np.asarray(alphas, dtype=float)
+    order = np.argsort(alphas)[::-1]                         # de més gran a més petit
+    mae = np.zeros((len(alphas), Y.shape[1]))
+
+    for train_idx, test_idx in KFold(n_splits=cv).split(X):
+        X_train, X_test = _scaled_fold(X, cols, train_idx, test_idx)
+        x_mean = X_train.mean(axis=0)
+        Xc = np.asfortranarray(X_train - x_mean)
+        for t in range(Y.shape[1]):
+            y_mean = Y[train_idx, t].mean()
+            _, coefs, _ = lasso_path(Xc, Y[train_idx, t] - y_mean, alphas=alphas[order],
+                                     max_iter=max_iter, tol=tol)
+            pred = (X_test - x_mean) @ coefs + y_mean        # files de test x alphas
+            mae[order, t] += np.abs(pred - Y[test_idx, t][:, None]).mean(axis=0)
+
+    return _result(mae / cv, alphas, targets)
+
+
+def check_regularization(df: pd.DataFrame, n_alphas: int = 100):
+    """
+    Compara `ridge_path` i `lasso_cv_path` amb GridSearchCV (mateixa graella,
+    cv=5, MAE) per a 'min_salary' i 'max_salary': mateix alpha i temps.
+    """
+    import warnings
+
+    from sklearn.exceptions import ConvergenceWarning
+    from sklearn.linear_model import Lasso, Ridge
+    from sklearn.model_selection import GridSearchCV, train_test_split
+    from sklearn.pipeline import make_pipeline
+
+    from src.encoding import FeatureEncoder
+    from src.features import salary_targets
+
+    console.rule("[title]Camí de regularització de Ridge i Lasso[/title]")
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+    df = df[df["Salary Estimate"] != "-1"]
+    encoder = FeatureEncoder().fit(df)
+    X, names = encoder.transform(df), encoder.feature_names_
+    targets = ["min_salary", "max_salary"]
+    Y = salary_targets(df)[targets].to_numpy()
+    X_train, _, Y_train, _ = train_test_split(X, Y, test_size=0.3, random_state=0)
+    cols = column_positions(NUM_COLS, names)
+
+    searches = {
+        "Ridge": (Ridge(), np.logspace(-3, 4, n_alphas), ridge_path),
+        "Lasso": (Lasso(max_iter=5000), np.logspace(-4, 1, n_alphas), lasso_cv_path),
+    }
+    for name, (model, alphas, path) in searches.items():
+        start = time.perf_counter()
+        best, _ = path(X_train, Y_train, alphas, targets, feature_names=names)
+        path_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, target in enumerate(targets):
+            pipeline = make_pipeline(ColumnScaler(cols), model)
+            grid = GridSearchCV(pipeline, {f"{name.lower()}__alpha": alphas}, cv=5,
+                                scoring="neg_mean_absolute_error", n_jobs=-1)
+            grid.fit(X_train, Y_train[:, i])
+            alpha = grid.best_params_[f"{name.lower()}__alpha"]
+            assert np.isclose(best[target][0]["alpha"], alpha), (name, target, best[target], alpha)
+            assert np.isclose(best[target][1], -grid.best_score_, rtol=1e-4), (name, target)
+        grid_time = time.perf_counter() - start
+
+        console.print(f"[success]{name}: mateix alpha i MAE que GridSearchCV[/success] "
+                      + ", ".join(f"{t}: alpha={best[t][0]['alpha']:.4g}, MAE={best[t][1]:.3f}" for t in targets))
+        console.print(f"[info]{n_alphas} alphas x 2 objectius:[/info] camí {path_time:.2f} s, "
+                      f"GridSearchCV {grid_time:.1f} s ({grid_time / path_time:.0f}x)")
+
+    best, _ = ridge_loo(X_train, Y_train, np.logspace(-3, 4, n_alphas), targets, feature_names=names)
+    console.print("[info]Ridge leave-one-out:[/info] "
+                  + ", ".join(f"{t}: alpha={best[t][0]['alpha']:.4g}, MAE={best[t][1]:.3f}" for t in targets))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_regularization(df)
@@ -0,0 +1,170 @@
+"""
+scoring.py
+
+Predicció per lots de fitxers grans d'ofertes crues.
+
+El CSV es llegeix per blocs, cada bloc es codifica i es prediu en un procés del
+pool i les prediccions s'escriuen en el mateix ordre que l'entrada a mesura que
+acaben. Només hi ha `2 x processos` blocs en vol alhora, així que la memòria no
+depèn de la mida del fitxer.
+
+Després de cada bloc escrit es desa un punt de control (`<sortida>.progress`)
+amb les files i els bytes escrits. Si l'execució s'interromp, tornar-la a
+llançar amb la mateixa entrada i el mateix model continua des de l'últim bloc
+complet.
+
+Ús:
+    python -m src.scoring entrada.csv sortida.csv --model model.pkl [--train DataAnalyst.csv]
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from config.log_config import console
+from config.tracing import traced
+from src.predictor import SalaryPredictor
+from src.streaming import read_chunks
+
+
+CHUNK_SIZE = 50_000
+
+# Valors per omplir els camps de text buits (el codificador espera text)
+TEXT_DEFAULTS = {
+    "Job Title": "", "Job Description": "", "Location": "",
+    "Competitors": "-1", "Easy Apply": "-1",
+}
+
+_predictor = None
+
+
+def _init_worker(model_path):
+    global _predictor
+    _predictor = SalaryPredictor.load(model_path)
+
+
+def score_chunk(chunk: pd.DataFrame, predictor=None) -> pd.DataFrame:
+    """Prediccions d'un bloc d'ofertes crues (mateix índex que el bloc)."""
+    predictor = predictor or _predictor
+    return predictor.predict(chunk.fillna(TEXT_DEFAULTS))
+
+
+def _signature(csv_path, model_path, chunksize) -> dict:
+    """Identifica una execució: si l'entrada o el model canvien no es reprèn."""
+    csv_stat, model_stat = os.stat(csv_path), os.stat(model_path)
+    return {
+        "input": [str(Path(csv_path).resolve()), csv_stat.st_size, csv_stat.st_mtime_ns],
+        "model": [str(Path(model_path).resolve()), model_stat.st_size, model_stat.st_mtime_ns],
+        "chunksize": chunksize,
+    }
+
+
+def _read_progress(path: Path, signature: dict):
+    if not path.exists():
+        return None
+    progress = json.loads(path.read_text())
+    return progress if progress["signature"] == signature else None
+
+
+def _write_progress(path: Path, signature: dict, rows: int, size: int):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"signature": signature, "rows": rows, "bytes": size}))
+    os.replace(tmp, path)
+
+
+@traced()
+def score_csv(csv_path, out_path, model_path, chunksize: int = CHUNK_SIZE,
+              workers: int = None, id_column: str = None) -> int:
+    """
+    Prediu totes les ofertes de `csv_path` i escriu les prediccions a `out_path`.
+
+    Args:
+        model_path: SalaryPredictor desat amb `save`.
+        workers (int): Processos del pool (per defecte, tots els nuclis). Amb 1
+            es treballa al procés principal.
+        id_column (str): Columna de l'entrada que s'afegeix a la sortida per
+            identificar cada oferta. Per defecte, el número de fila.
+
+    Returns:
+        int: Nombre total de files a la sortida.
+    """
+    console.rule("[title]Predicció per lots[/title]")
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    progress_path = out_path.with_name(out_path.name + ".progress")
+    signature = _signature(csv_path, model_path, chunksize)
+    workers = workers or os.cpu_count()
+
+    progress = _read_progress(progress_path, signature) if out_path.exists() else None
+    done = progress["rows"] if progress else 0
+    if progress:
+        console.print(f"[info]Es reprèn l'execució anterior:[/info] {done} files ja escrites")
+        with open(out_path, "r+b") as f:
+            f.truncate(progress["bytes"])  # descartar un bloc escrit a mitges
+
+    rows = done
+    start = time.perf_counter()
+    with open(out_path, "ab" if progress else "wb") as f:
+        def write(chunk, predictions):
+            nonlocal rows
+            ids = chunk[id_column].to_numpy() if id_column else chunk.index + done
+            predictions.insert(0, id_column or "row", ids)
+            predictions.to_csv(f, header=(rows == 0), index=False)
+            f.flush()
+            rows += len(predictions)
+            _write_progress(progress_path, signature, rows, f.tell())
+            elapsed = time.perf_counter() - start
+            console.print(f"[info]{rows} files[/info] ({(rows - done) / elapsed:,.0f} files/s)")
+
+        chunks = read_chunks(csv_path, chunksize, skip=done)
+        if workers == 1:
+            predictor = SalaryPredictor.load(model_path)
+            for chunk in chunks:
+                write(chunk, score_chunk(chunk, predictor))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(str(model_path),)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((chunk, pool.submit(score_chunk, chunk)))
+                    if len(pending) >= 2 * workers:
+                        chunk, future = pending.popleft()
+                        write(chunk, future.result())
+                while pending:
+                    chunk, future = pending.popleft()
+                    write(chunk, future.result())
+
+    progress_path.unlink()
+    console.print(f"[success]Predicció completa:[/success] {rows} files a {out_path}")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predicció del salari per lots")
+    parser.add_argument("input", help="CSV d'ofertes crues")
+    parser.add_argument("output", help="CSV de sortida amb les prediccions")
+    parser.add_argument("--model", required=True, help="SalaryPredictor desat (pickle)")
+    parser.add_argument("--train", help="CSV per entrenar i desar el model si no existeix")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--id-column", default=None)
+    args = parser.parse_args(argv)
+
+    if not Path(args.model).exists():
+        if not args.train:
+            parser.error(f"No existeix el model {args.model} (feu servir --train)")
+        from src.predictor import train_predictor
+        predictor, _, _ = train_predictor(pd.read_csv(args.train))
+        predictor.save(args.model)
+        console.print(f"[success]Model desat a {args.model}[/success]")
+
+    score_csv(args.input, args.output, args.model, args.chunksize, args.workers, args.id_column)
+
+
+if __name__ == "__main__":
+    main()
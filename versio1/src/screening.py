@@ -0,0 +1,271 @@
+"""
+screening.py
+
+ANOVA d'un factor (F, p-valor i R²) per triar variables, vectoritzada.
+
+`anova_r2` del notebook Preprocessing.ipynb filtra el DataFrame per a cada grup
+diverses vegades. Aquí cada variable es codifica un sol cop amb `factorize` i
+les mides, mitjanes i sumes de quadrats de tots els grups surten de
+`np.bincount`. Amb això es poden avaluar:
+
+- moltes variables alhora (`screen`),
+- moltes columnes 0/1 alhora, p. ex. les paraules de la descripció
+  (`screen_indicators`, amb productes de matrius),
+- una variable dins d'una altra, p. ex. ciutat dins de cada estat
+  (`screen_nested`), en una sola crida.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+
+from config.log_config import console
+
+
+# Valors que el notebook no considera un grup
+EXCLUDED = ["-1", None, "Unknown", "Other Organization", "other"]
+
+
+def _f_test(counts, sums, ss_within):
+    """F i p-valor (com `stats.f_oneway`) a partir de les estadístiques de cada grup."""
+    n, k = counts.sum(), len(counts)
+    grand = sums.sum() / n
+    ss_between = (counts * (sums / counts - grand) ** 2).sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f_stat = (ss_between / (k - 1)) / (ss_within / (n - k))
+    return f_stat, stats.f.sf(f_stat, k - 1, n - k)
+
+
+def _group_stats(codes: np.ndarray, y: np.ndarray, n_groups: int):
+    counts = np.bincount(codes, minlength=n_groups).astype(float)
+    sums = np.bincount(codes, weights=y, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    ss_within = np.bincount(codes, weights=(y - means[codes]) ** 2, minlength=n_groups)
+    return counts, sums, ss_within
+
+
+def anova(values, y, min_size: int = 2, excluded=EXCLUDED):
+    """
+    ANOVA d'un factor de `y` segons `values` (sense nuls).
+
+    Returns:
+        dict amb 'F', 'P-value', 'R²' i 'Grups', o None si hi ha menys de dos
+        grups vàlids. Com al notebook, la mitjana global de l'R² inclou les
+        files dels grups descartats.
+    """
+    y = np.asarray(y, dtype=float)
+    codes, uniques = pd.factorize(values)
+    counts, sums, ss_within = _group_stats(codes, y, len(uniques))
+    valid = (counts >= min_size) & np.array([u not in excluded for u in uniques], dtype=bool)
+    if valid.sum() < 2:
+        return None
+
+    f_stat, p_value = _f_test(counts[valid], sums[valid], ss_within[valid].sum())
+    ss_between = (counts[valid] * (sums[valid] / counts[valid] - y.mean()) ** 2).sum()
+    within = ss_within[valid].sum()
+    return {"F": f_stat, "P-value": p_value, "R²": ss_between / (ss_between + within),
+            "Grups": int(valid.sum())}
+
+
+def anova_r2(df: pd.DataFrame, attribute: str, target: str = "avg_salary"):
+    """Mateix resultat que `anova_r2` del notebook: (p-valor, R²) o (None, None)."""
+    clean = df[[attribute, target]].dropna()
+    result = anova(clean[attribute].to_numpy(), clean[target].to_numpy())
+    return (None, None) if result is None else (result["P-value"], result["R²"])
+
+
+def _decision(p_value, r2):
+    if p_value >= 0.05 and r2 < 0.05:
+        return "Eliminar"
+    if p_value >= 0.05 or r2 < 0.05:
+        return "Valorar"
+    return "Mantenir"
+
+
+def screen(df: pd.DataFrame, attributes=None, target: str = "avg_salary",
+           exclude=("avg_salary", "min_salary", "max_salary")) -> pd.DataFrame:
+    """
+    ANOVA de cada variable amb `target` i decisió (Mantenir / Valorar /
+    Eliminar) com la taula `resultats_df` del notebook, ordenada per R².
+    """
+    clean = df.dropna(subset=[target])
+    attributes = attributes or [c for c in clean.columns if c not in exclude]
+    y = clean[target].to_numpy(dtype=float)
+
+    rows = []
+    for col in attributes:
+        values = clean[col]
+        keep = values.notna().to_numpy()
+        if values[keep].nunique() <= 1:
+            continue
+        result = anova(values[keep].to_numpy(), y[keep])
+        if result is None:
+            continue
+        rows.append({"Variable": col, **result,
+                     "Decisió": _decision(result["P-value"], result["R²"])})
+
+    columns = ["Variable", "F", "P-value", "R²", "Grups", "Decisió"]
+    return pd.DataFrame(rows, columns=columns).sort_values("R²", ascending=False, ignore_index=True)
+
+
+def screen_indicators(X, y, names=None, min_size: int = 2) -> pd.DataFrame:
+    """
+    ANOVA de dos grups (0 / diferent de 0) per a cada columna de `X` (densa o
+    CSR), totes alhora, sense les files amb `y` nul. Equival al bucle de
+    `f_oneway` per paraula del notebook.
+    """
+    y = np.asarray(y, dtype=float)
+    keep = ~np.isnan(y)
+    X, y = sparse.csr_matrix(X)[keep], y[keep]
+    X.data = (X.data != 0).astype(float)
+    X.eliminate_zeros()
+    n = len(y)
+
+    n1 = np.asarray(X.sum(axis=0)).ravel()
+    s1 = X.T @ y
+    q1 = X.T @ (y ** 2)
+    n0, s0, q0 = n - n1, y.sum() - s1, (y ** 2).sum() - q1
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ss_within = (q1 - s1 ** 2 / n1) + (q0 - s0 ** 2 / n0)
+        ss_between = n1 * (s1 / n1 - y.mean()) ** 2 + n0 * (s0 / n0 - y.mean()) ** 2
+        f_stat = ss_between / (ss_within / (n - 2))
+        r2 = ss_between / (ss_between + ss_within)
+    p_value = stats.f.sf(f_stat, 1, n - 2)
+
+    names = names if names is not None else [f"x{j}" for j in range(X.shape[1])]
+    valid = (n1 >= min_size) & (n0 >= min_size)
+    result = pd.DataFrame({"word": names, "F": f_stat, "p_value": p_value, "R²": r2})
+    return result[valid].sort_values("p_value", ignore_index=True)
+
+
+def screen_nested(df: pd.DataFrame, outer: str, inner: str, target: str = "avg_salary",
+                  min_size: int = 2) -> pd.DataFrame:
+    """
+    ANOVA de `inner` dins de cada valor de `outer` (p. ex. ciutat dins de cada
+    estat) amb una sola passada: els grups (outer, inner) es codifiquen junts.
+    Com al notebook, només compten els grups amb `min_size` files o més i cal
+    tenir almenys dos grups.
+    """
+    clean = df.dropna(subset=[outer, inner, target])
+    y = clean[target].to_numpy(dtype=float)
+    outer_codes, outer_values = pd.factorize(clean[outer])
+    pair_codes, pairs = pd.factorize(pd.MultiIndex.from_arrays([outer_codes, clean[inner].to_numpy()]))
+    pair_outer = np.asarray(pairs.get_level_values(0))
+
+    counts, sums, ss_within = _group_stats(pair_codes, y, len(pairs))
+    valid = counts >= min_size
+    n_outer = len(outer_values)
+    obs = np.bincount(outer_codes, minlength=n_outer)
+    groups = np.bincount(pair_outer[valid], minlength=n_outer)
+
+    # Estadístiques per valor de `outer` només amb els grups vàlids
+    o = pair_outer[valid]
+    n = np.bincount(o, weights=counts[valid], minlength=n_outer)
+    s = np.bincount(o, weights=sums[valid], minlength=n_outer)
+    ssw = np.bincount(o, weights=ss_within[valid], minlength=n_outer)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        grand = s / n
+        ssb = np.bincount(o, weights=counts[valid] * (sums[valid] / counts[valid] - grand[o]) ** 2,
+                          minlength=n_outer)
+        f_stat = (ssb / (groups - 1)) / (ssw / (n - groups))
+        r2 = ssb / (ssb + ssw)
+    p_value = stats.f.sf(f_stat, groups - 1, n - groups)
+
+    keep = groups >= 2
+    result = pd.DataFrame({
+        outer: np.asarray(outer_values)[keep], f"Num_{inner}": groups[keep], "Num_obs": obs[keep],
+        "F": f_stat[keep], "P_value": p_value[keep], "R²": r2[keep],
+    })
+    return result.sort_values("P_value", ignore_index=True)
+
+
+def check_screening(df: pd.DataFrame, n_columns: int = 300):
+    """
+    Compara `screen`, `screen_indicators` i `screen_nested` amb els bucles del
+    notebook i mesura el temps amb `n_columns` variables candidates.
+    """
+    from src.features import BEST_WORDS, clean_text, state_and_city
+
+    console.rule("[title]ANOVA vectoritzada[/title]")
+    columns = [c for c in df.columns if c not in ("avg_salary", "min_salary", "max_salary")]
+
+    # Referència: anova_r2 del notebook
+    def notebook_anova_r2(data, attribute, target="avg_salary"):
+        data = data.dropna(subset=[target, attribute])
+        groups, valid = [], []
+        for val in data[attribute].unique():
+            if val in EXCLUDED:
+                continue
+            g = data.loc[data[attribute] == val, target]
+            if len(g) >= 2:
+                groups.append(g)
+                valid.append(val)
+        if len(groups) < 2:
+            return None, None
+        _, p_value = stats.f_oneway(*groups)
+        mean = data[target].mean()
+        ssb = sum(len(data[data[attribute] == g]) * (data[data[attribute] == g][target].mean() - mean) ** 2
+                  for g in valid)
+        ssw = sum(((data[data[attribute] == g][target] - data[data[attribute] == g][target].mean()) ** 2).sum()
+                  for g in valid)
+        return p_value, ssb / (ssb + ssw)
+
+    start = time.perf_counter()
+    expected = {c: notebook_anova_r2(df, c) for c in columns if df[c].nunique() > 1}
+    notebook_time = time.perf_counter() - start
+    start = time.perf_counter()
+    result = screen(df, columns)
+    screen_time = time.perf_counter() - start
+    for row in result.itertuples(index=False):
+        p_value, r2 = expected[row.Variable]
+        assert np.isclose(row[2], p_value, rtol=1e-6, atol=1e-300) and np.isclose(row[3], r2), row.Variable
+    assert set(result["Variable"]) == {c for c, (p, _) in expected.items() if p is not None}
+    console.print(f"[success]screen:[/success] {len(result)} variables iguals que anova_r2 "
+                  f"({notebook_time:.2f} s -> {screen_time:.3f} s)")
+
+    # Paraules de la descripció
+    df = df.dropna(subset=["avg_salary"])
+    cleaned = df["Job Description"].apply(clean_text)
+    flags = np.column_stack([cleaned.str.contains(w, regex=False) for w in BEST_WORDS])
+    words = screen_indicators(flags, df["avg_salary"], BEST_WORDS)
+    for row in words.itertuples(index=False):
+        j = BEST_WORDS.index(row.word)
+        _, p_value = stats.f_oneway(df["avg_salary"][~flags[:, j]], df["avg_salary"][flags[:, j]])
+        assert np.isclose(row.p_value, p_value), row.word
+    console.print(f"[success]screen_indicators:[/success] {len(words)} paraules iguals que f_oneway")
+
+    # Ciutat dins de cada estat
+    data = df.assign(State=state_and_city(df["Location"])[0])
+    nested = screen_nested(data, "State", "Location")
+    for row in nested.itertuples(index=False):
+        state = data[data["State"] == row.State]
+        counts = state["Location"].value_counts()
+        groups = [state.loc[state["Location"] == city, "avg_salary"] for city in counts[counts >= 2].index]
+        assert np.isclose(row.P_value, stats.f_oneway(*groups)[1]), row.State
+    console.print(f"[success]screen_nested:[/success] {len(nested)} estats iguals que el bucle per estat")
+
+    # Moltes variables candidates
+    rng = np.random.default_rng(0)
+    wide = pd.DataFrame(rng.integers(0, 20, size=(len(df), n_columns)),
+                        columns=[f"c{i}" for i in range(n_columns)])
+    wide["avg_salary"] = df["avg_salary"].to_numpy()
+    start = time.perf_counter()
+    screen(wide)
+    console.print(f"[info]{n_columns} variables candidates:[/info] {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    import sys
+
+    from src.features import salary_targets
+
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_screening(df.join(salary_targets(df)))
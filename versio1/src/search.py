@@ -0,0 +1,269 @@
+"""
+search.py
+
+Cerca d'hiperparàmetres per successive halving amb pressupost.
+
+Cada candidat s'avalua primer amb poques files d'entrenament (o pocs arbres /
+etapes de boosting). Només el millor terç passa a la ronda següent, on
+s'avalua amb tres vegades més recurs, fins a arribar a totes les files. Les
+rondes es fan per a tots els models alhora, així que si s'acaba el pressupost
+(nombre d'ajustos o segons) tots els models han passat com a mínim per la
+primera.
+
+Els resultats de cada (model, paràmetres, fold, recurs) es desen a
+`results`. Si es passa el mateix diccionari a una segona cerca (p. ex. la
+graella refinada del notebook), els candidats que ja s'havien avaluat no es
+tornen a entrenar. Els nivells de recurs són sempre màxim / eta^k, de manera
+que coincideixen entre cerques.
+
+Quan el recurs són les files, cada fold en fa servir un subconjunt aleatori
+(amb `random_state`) de les d'entrenament, no les primeres del fitxer. Els
+subconjunts de cada fold estan niats: les files d'una ronda inclouen les de
+l'anterior, i a l'última ronda s'entrena amb totes.
+"""
+
+import itertools
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.model_selection import KFold
+
+from config.log_config import console
+from src.fit_cache import array_hash, cached_parallel
+from src.models import NUM_COLS
+from src.training import train_targets
+
+
+MIN_ROWS = 100
+
+
+def _candidates(param_grid: dict) -> list:
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+
+
+def result_key(name, params: dict, fold: int, resource) -> tuple:
+    """Clau d'un resultat a `results`."""
+    return name, tuple(sorted((k, repr(v)) for k, v in params.items())), fold, resource
+
+
+def _rows(train_idx: np.ndarray, order: np.ndarray, resource: int) -> np.ndarray:
+    """Les `resource` primeres files de l'ordre aleatori del fold, en l'ordre original."""
+    return train_idx if resource >= len(train_idx) else np.sort(order[:resource])
+
+
+def _evaluate(model, params, X, Y, train_idx, test_idx, resource_param, resource,
+              scale_cols, feature_names):
+    # Amb recurs 'rows', `train_idx` ja és el subconjunt de files
+    if resource_param != "rows":
+        params = {**params, resource_param: resource}
+    fitted = train_targets(clone(model).set_params(**params), X[train_idx], Y[train_idx],
+                           scale_cols, feature_names)
+    pred = fitted.predict(X[test_idx]).reshape(len(test_idx), -1)
+    return np.abs(pred - Y[test_idx]).mean(axis=0)
+
+
+def _ladder(max_resource: int, min_resource: int, eta: int, n_candidates: int) -> list:
+    """Nivells de recurs màxim / eta^k, del més petit al més gran."""
+    by_candidates = math.ceil(math.log(max(n_candidates, 1), eta)) + 1
+    by_resource = int(math.floor(math.log(max_resource / min_resource, eta))) + 1
+    rungs = max(1, min(by_candidates, by_resource))
+    return [int(round(max_resource / eta ** k)) for k in reversed(range(rungs))]
+
+
+def successive_halving(searches: dict, X, Y, results: dict = None, eta: int = 3, cv: int = 5,
+                       max_fits: int = None, max_seconds: float = None, scale_cols=NUM_COLS,
+                       feature_names=None, n_jobs: int = -1, cache=None, random_state: int = 0):
+    """
+    Args:
+        searches (dict): {nom: (model, graella)} o {nom: (model, graella,
+            recurs, màxim)}. El recurs és 'rows' (per defecte) o un paràmetre
+            del model com 'n_estimators', que no pot ser a la graella.
+        Y: Un objectiu o diversos; els candidats s'ordenen per la MAE mitjana.
+        results (dict): Resultats d'una cerca anterior per reaprofitar. Es
+            modifica amb els resultats nous.
+        max_fits, max_seconds: Pressupost. Els ajustos de cada ronda es
+            llancen per lots i, quan s'esgota, no se'n llancen més: mai es
+            fan més de `max_fits` ajustos nous. Al rànquing només hi entren
+            els candidats amb tots els folds avaluats en alguna ronda.
+        cache (FitCache): Memòria cau en disc dels resultats, entre execucions.
+        random_state (int): Llavor dels subconjunts de files de cada fold.
+            Per reaprofitar `results` cal fer servir la mateixa.
+
+    Returns:
+        (ranking, results): DataFrame ordenat (com la taula `rows` del
+        notebook) i el diccionari de resultats.
+    """
+    results = {} if results is None else results
+    Y = np.asarray(Y, dtype=float).reshape(len(Y), -1)
+    folds = list(KFold(n_splits=cv).split(X))
+    rng = np.random.default_rng(random_state)
+    orders = [rng.permutation(train_idx) for train_idx, _ in folds]
+    data = (array_hash(X), array_hash(Y), list(scale_cols), feature_names) if cache is not None else None
+    train_rows = min(len(train_idx) for train_idx, _ in folds)
+
+    state = {}
+    for name, spec in searches.items():
+        model, grid, *resource = spec
+        resource_param = resource[0] if resource else "rows"
+        max_resource = resource[1] if len(resource) > 1 else train_rows
+        min_resource = MIN_ROWS if resource_param == "rows" else max(1, max_resource // eta ** 2)
+        candidates = _candidates(grid)
+        state[name] = {
+            "model": model, "param": resource_param, "survivors": candidates,
+            "ladder": _ladder(max_resource, min_resource, eta, len(candidates)),
+            "reached": {},
+        }
+
+    fits = reused = 0
+    start = time.perf_counter()
+    batch_size = 2 * effective_n_jobs(n_jobs)
+
+    def exhausted():
+        return (max_fits is not None and fits >= max_fits) or \
+            (max_seconds is not None and time.perf_counter() - start >= max_seconds)
+
+    for rung in range(max(len(s["ladder"]) for s in state.values())):
+        if exhausted():
+            console.print("[warning]Pressupost esgotat: no es fan més rondes[/warning]")
+            break
+
+        jobs = []
+        for name, s in state.items():
+            if rung >= len(s["ladder"]):
+                continue
+            resource = s["ladder"][rung]
+            for params in s["survivors"]:
+                for k, (train_idx, test_idx) in enumerate(folds):
+                    key = result_key(name, params, k, resource)
+                    if key in results:
+                        reused += 1
+                        continue
+                    if s["param"] == "rows":
+                        train_idx = _rows(train_idx, orders[k], resource)
+                    jobs.append((key, s["model"], params, train_idx, test_idx, s["param"], resource))
+
+        # Sense pressupost, tota la ronda en un sol lot
+        step = len(jobs) if max_fits is None and max_seconds is None else batch_size
+        done = 0
+        while done < len(jobs) and not exhausted():
+            size = step if max_fits is None else min(step, max_fits - fits)
+            batch = jobs[done:done + max(size, 1)]
+            hits_before = 0 if cache is None else cache.hits
+            keys = [] if cache is None else [
+                cache.key("halving", clone(model).set_params(**params), data, param, resource, train_idx, test_idx)
+                for _, model, params, train_idx, test_idx, param, resource in batch
+            ]
+            errors = cached_parallel(cache, keys, [
+                delayed(_evaluate)(model, params, X, Y, train_idx, test_idx, param, resource,
+                                   scale_cols, feature_names)
+                for _, model, params, train_idx, test_idx, param, resource in batch
+            ], n_jobs)
+            results.update((job[0], error) for job, error in zip(batch, errors))
+            hits = 0 if cache is None else cache.hits - hits_before
+            fits += len(batch) - hits
+            reused += hits
+            done += len(batch)
+
+        for name, s in state.items():
+            if rung >= len(s["ladder"]):
+                continue
+            resource = s["ladder"][rung]
+            # Només els candidats amb tots els folds avaluats en aquesta ronda
+            scored = [params for params in s["survivors"]
+                      if all(result_key(name, params, k, resource) in results for k in range(len(folds)))]
+            scores = [float(np.mean([results[result_key(name, params, k, resource)]
+                                     for k in range(len(folds))])) for params in scored]
+            share = resource / s["ladder"][-1]
+            for params, score in zip(scored, scores):
+                s["reached"][result_key(name, params, None, None)[:2]] = (params, resource, rung, share, score)
+            keep = max(1, math.ceil(len(s["survivors"]) / eta))
+            order = np.argsort(scores, kind="stable")[:keep]
+            s["survivors"] = [scored[i] for i in order]
+
+        if done < len(jobs):
+            console.print("[warning]Pressupost esgotat a mitja ronda: no es fan més ajustos[/warning]")
+            break
+
+    rows = []
+    for name, s in state.items():
+        for params, resource, rung, share, score in s["reached"].values():
+            full = clone(s["model"]).set_params(**params).get_params()
+            rows.append({"Model": name, "MAE": score, "Recurs": resource, "Ronda": rung + 1,
+                         "Complet": share == 1, "Hiperparàmetres": full, "_share": share})
+    # Primer els candidats avaluats amb més recurs, després per MAE
+    columns = ["Model", "MAE", "Recurs", "Ronda", "Complet", "Hiperparàmetres", "_share"]
+    ranking = pd.DataFrame(rows, columns=columns).sort_values(["_share", "MAE"], ascending=[False, True],
+                                                              kind="stable")
+
+    console.print(f"[info]Ajustos:[/info] {fits} nous, {reused} reaprofitats "
+                  f"({time.perf_counter() - start:.1f} s)")
+    return ranking.drop(columns="_share").reset_index(drop=True), results
+
+
+def best_candidate(ranking: pd.DataFrame):
+    """(model, MAE, hiperparàmetres) del primer candidat del rànquing."""
+    top = ranking.iloc[0]
+    return top["Model"], top["MAE"], top["Hiperparàmetres"]
+
+
+def check_search(df: pd.DataFrame, max_fits: int = None, max_seconds: float = None):
+    """
+    Les dues rondes del notebook (graella inicial i refinada de KNN,
+    RandomForest i GradientBoosting) amb successive halving per a
+    'min_salary', reaprofitant els resultats de la primera a la segona.
+
+    El KNN creix en files. RandomForest i GradientBoosting creixen en arbres
+    (n_estimators surt de la graella) fins al màxim de les dues rondes, perquè
+    els nivells coincideixin i la segona ronda reaprofiti la primera.
+    """
+    import warnings
+
+    from sklearn.model_selection import train_test_split
+
+    from src.encoding import FeatureEncoder
+    from src.features import salary_targets
+    from src.models import get_models
+    from src.training import PARAM_GRIDS, PARAM_GRIDS_REFINED
+
+    console.rule("[title]Successive halving[/title]")
+    warnings.filterwarnings("ignore", category=UserWarning)
+    df = df[df["Salary Estimate"] != "-1"]
+    encoder = FeatureEncoder().fit(df)
+    X, names = encoder.transform(df), encoder.feature_names_
+    y = salary_targets(df)["min_salary"].to_numpy()
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=0)
+    models = get_models()
+
+    trees = {name: max(PARAM_GRIDS[name]["n_estimators"] + PARAM_GRIDS_REFINED[name]["n_estimators"])
+             for name in ("RandomForest", "GradientBoosting")}
+
+    results = {}
+    for title, grids in [("Ronda 1", PARAM_GRIDS), ("Ronda 2", PARAM_GRIDS_REFINED)]:
+        grid_fits = 5 * sum(len(_candidates(grids[name])) for name in ("KNN", *trees))
+        console.print(f"[info]{title}:[/info] GridSearchCV faria {grid_fits} ajustos complets")
+        searches = {"KNN": (models["KNN"], grids["KNN"])}
+        for name, max_trees in trees.items():
+            grid = {k: v for k, v in grids[name].items() if k != "n_estimators"}
+            searches[name] = (models[name], grid, "n_estimators", max_trees)
+        ranking, results = successive_halving(searches, X_train, y_train, results, max_fits=max_fits,
+                                              max_seconds=max_seconds, feature_names=names)
+        console.print(ranking.head(5).drop(columns="Hiperparàmetres").to_string(index=False))
+
+    name, mae, params = best_candidate(ranking)
+    console.print(f"[success]Millor model:[/success] {name} (MAE {mae:.3f})")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_search(df)
@@ -0,0 +1,95 @@
+"""
+streaming.py
+
+Neteja de dades per parts: es llegeix el CSV en blocs de files, es neteja cada
+bloc amb les mateixes etapes que `preprocessing()` i s'escriu el resultat de
+manera incremental. Les dummies fan servir l'esquema fix dels mapejos, així que
+tots els blocs tenen les mateixes columnes i la memòria no depèn de la mida
+del fitxer.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from config.log_config import console
+from src.pipeline import run_stages
+from src.preprocessing import preprocessing_stages, DROP_COLUMNS
+
+
+# Columnes de text del CSV original. Es llegeixen sempre com a text perquè un
+# bloc amb només '-1' no es converteixi en numèric.
+TEXT_COLUMNS = [
+    "Job Title", "Salary Estimate", "Job Description", "Company Name",
+    "Location", "Headquarters", "Size", "Type of ownership", "Industry",
+    "Sector", "Revenue", "Competitors", "Easy Apply",
+]
+
+# Tipus fixos de les columnes generades (el tipus inferit pot canviar entre blocs)
+OUTPUT_DTYPES = {
+    "min_salary": "Int64",
+    "max_salary": "Int64",
+    "avg_salary": "float64",
+    "Company Age": "Int64",
+    "Size mean": "float64",
+    "Revenue mean": "float64",
+}
+
+CHUNK_SIZE = 100_000
+
+
+def read_chunks(csv_path, chunksize: int = CHUNK_SIZE, skip: int = 0):
+    """Llegeix el CSV en blocs de `chunksize` files, saltant les `skip` primeres."""
+    skiprows = range(1, skip + 1) if skip else None
+    return pd.read_csv(csv_path, chunksize=chunksize, skiprows=skiprows,
+                       dtype={col: str for col in TEXT_COLUMNS})
+
+
+def clean_chunk(chunk: pd.DataFrame, stages=None) -> pd.DataFrame:
+    """Neteja un bloc amb l'esquema fix de columnes."""
+    stages = stages or preprocessing_stages(fixed=True)
+    clean, _ = run_stages(chunk, stages, drop=DROP_COLUMNS)
+    return clean.astype({c: t for c, t in OUTPUT_DTYPES.items() if c in clean.columns})
+
+
+def iter_preprocessed(csv_path, chunksize: int = CHUNK_SIZE):
+    """Generador de blocs nets. Tots els blocs tenen les mateixes columnes."""
+    stages = preprocessing_stages(fixed=True)
+    columns = None
+    for chunk in read_chunks(csv_path, chunksize):
+        clean = clean_chunk(chunk, stages)
+        if columns is None:
+            columns = list(clean.columns)
+        elif list(clean.columns) != columns:
+            raise ValueError("Les columnes del bloc no coincideixen amb l'esquema del primer bloc")
+        yield clean
+
+
+def preprocessing_stream(csv_path, out_path, chunksize: int = CHUNK_SIZE) -> int:
+    """
+    Neteja el CSV `csv_path` per blocs i escriu el resultat a `out_path`.
+    Retorna el nombre de files escrites.
+    """
+    console.rule("[title]Neteja de dades per blocs[/title]")
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows = 0
+    start = time.perf_counter()
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        for i, clean in enumerate(iter_preprocessed(csv_path, chunksize)):
+            clean.to_csv(f, header=(i == 0), index=False)
+            rows += len(clean)
+            elapsed = time.perf_counter() - start
+            console.print(f"[info]Bloc {i + 1}:[/info] {rows} files ({rows / elapsed:,.0f} files/s)")
+
+    console.print(f"[success]Neteja per blocs completa:[/success] {rows} files a {out_path}")
+    return rows
+
+
+if __name__ == "__main__":
+    csv_path, out_path = sys.argv[1], sys.argv[2]
+    chunksize = int(sys.argv[3]) if len(sys.argv) > 3 else CHUNK_SIZE
+    preprocessing_stream(csv_path, out_path, chunksize)
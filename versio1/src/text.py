@@ -0,0 +1,231 @@
+"""
+text.py
+
+Índex de paraules de la 'Job Description'.
+
+Cada descripció es neteja i es tokenitza un sol cop, i les paraules queden en
+una matriu dispersa (descripcions x vocabulari) amb el nombre d'aparicions.
+A partir d'aquest índex s'obtenen, sense tornar a llegir el text:
+
+- les paraules més freqüents (com `CountVectorizer(max_features=k)`),
+- les columnes 'contains_<paraula>' (amb el mateix criteri que `word in text`
+  del notebook: la paraula pot ser part d'una paraula més llarga),
+- el nombre d'aparicions de qualsevol conjunt de paraules.
+
+Amb `n_features` l'índex fa servir hashing: no es desa el vocabulari i la
+memòria queda fitada, però només es poden buscar paraules senceres. Els textos
+es poden tokenitzar en paral·lel per blocs.
+"""
+
+import re
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import sparse
+
+from config.log_config import console
+
+
+# Equival a `clean_text` (treure nombres i signes de puntuació) en una passada
+_REMOVE = re.compile(r"\d|[^\w\s]")
+# El mateix per als caràcters ASCII amb `str.translate`, molt més ràpid
+_ASCII_REMOVE = str.maketrans({chr(i): None for i in range(128) if _REMOVE.match(chr(i))})
+
+CHUNK_SIZE = 20_000
+
+_SEPARATOR = "DOCSEP"
+
+
+def _clean(text: str) -> str:
+    text = text.translate(_ASCII_REMOVE)
+    return text if text.isascii() else _REMOVE.sub("", text)
+
+
+def tokenize(text) -> list:
+    """Paraules de `clean_text(text)`."""
+    if not isinstance(text, str):
+        return []
+    return _clean(text.lower()).split()
+
+
+def _hash(token: str, n_features: int) -> int:
+    return zlib.crc32(token.encode()) % n_features
+
+
+def _index_chunk(texts, n_features):
+    # Tot el bloc en un sol text: una passada de l'expressió regular i un
+    # `split`. El separador és en majúscules, així que no pot sortir d'un text.
+    joined = f" {_SEPARATOR} ".join(t.lower() if isinstance(t, str) else "" for t in texts)
+    tokens = _clean(joined).split()
+    codes, terms = pd.factorize(np.array(tokens, dtype=object))
+    separator = np.array([t == _SEPARATOR for t in terms], dtype=bool)
+    is_separator = separator[codes] if len(codes) else np.zeros(0, dtype=bool)
+    rows = np.cumsum(is_separator)[~is_separator]
+    codes = codes[~is_separator]
+
+    terms = list(terms)
+    if separator.any():
+        # Treure el separador del vocabulari
+        position = int(np.flatnonzero(separator)[0])
+        codes = codes - (codes > position)
+        del terms[position]
+
+    if n_features:
+        columns = np.array([_hash(t, n_features) for t in terms], dtype=np.int64)
+        codes, terms = (columns[codes] if len(codes) else codes), []
+    width = n_features or len(terms)
+    X = sparse.csr_matrix((np.ones(len(codes), dtype=np.int32), (rows, codes)), shape=(len(texts), width))
+    X.sum_duplicates()
+    return X, terms
+
+
+class TokenIndex:
+    """
+    Args:
+        n_features (int): Nombre de columnes amb hashing. None per desar el
+            vocabulari.
+        n_jobs (int): Processos per tokenitzar (si hi ha més d'un bloc).
+        chunk_size (int): Descripcions per bloc.
+    """
+
+    def __init__(self, n_features: int = None, n_jobs: int = 1, chunk_size: int = CHUNK_SIZE):
+        self.n_features = n_features
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+
+    def fit(self, descriptions):
+        """Tokenitza les descripcions i construeix la matriu `counts_`."""
+        texts = list(descriptions)
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)] or [[]]
+        if self.n_jobs == 1 or len(chunks) == 1:
+            parts = [_index_chunk(chunk, self.n_features) for chunk in chunks]
+        else:
+            parts = Parallel(n_jobs=self.n_jobs)(delayed(_index_chunk)(c, self.n_features) for c in chunks)
+
+        if self.n_features:
+            self.vocabulary_ = None
+            self.counts_ = sparse.vstack([X for X, _ in parts], format="csr")
+            return self
+
+        # Unir els vocabularis dels blocs
+        vocabulary = {}
+        matrices = []
+        for X, terms in parts:
+            remap = np.array([vocabulary.setdefault(t, len(vocabulary)) for t in terms], dtype=np.int64)
+            matrices.append((X, remap))
+        width = len(vocabulary)
+        self.counts_ = sparse.vstack([
+            sparse.csr_matrix((X.data, remap[X.indices] if len(remap) else X.indices, X.indptr),
+                              shape=(X.shape[0], width))
+            for X, remap in matrices
+        ], format="csr")
+        self.counts_.sort_indices()
+        self.vocabulary_ = vocabulary
+        self.terms_ = np.array(list(vocabulary), dtype=object)
+        return self
+
+    def _columns(self, word: str, substring: bool) -> list:
+        if self.vocabulary_ is None:
+            if substring:
+                raise ValueError("Amb hashing només es poden buscar paraules senceres (substring=False)")
+            return [_hash(word, self.n_features)]
+        if substring:
+            return [i for i, term in enumerate(self.terms_) if word in term]
+        return [self.vocabulary_[word]] if word in self.vocabulary_ else []
+
+    def counts(self, words, substring: bool = False):
+        """Matriu CSR (descripcions x paraules) amb les aparicions de cada paraula."""
+        rows, cols = [], []
+        for j, word in enumerate(words):
+            ids = self._columns(word, substring)
+            rows.extend(ids)
+            cols.extend([j] * len(ids))
+        select = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                                   shape=(self.counts_.shape[1], len(words)))
+        return (self.counts_ @ select).tocsr()
+
+    def contains(self, words, substring: bool = True):
+        """Matriu CSR uint8 amb 1 si la descripció conté la paraula."""
+        found = self.counts(words, substring)
+        found.data = (found.data > 0).astype(np.uint8)
+        found.eliminate_zeros()
+        return found
+
+    def contains_frame(self, words, substring: bool = True, prefix: str = "contains_", index=None) -> pd.DataFrame:
+        """Columnes '<prefix><paraula>' (0/1) com a DataFrame dispers."""
+        return pd.DataFrame.sparse.from_spmatrix(
+            self.contains(words, substring), index=index, columns=[f"{prefix}{w}" for w in words])
+
+    def top_k(self, k: int, stop_words=()) -> list:
+        """
+        Les `k` paraules més freqüents (de 2 o més lletres, sense `stop_words`),
+        en ordre alfabètic, com `CountVectorizer(max_features=k).get_feature_names_out()`.
+        """
+        if self.vocabulary_ is None:
+            raise ValueError("Amb hashing no hi ha vocabulari")
+        stop_words = set(stop_words)
+        order = np.argsort(self.terms_.astype(str), kind="stable")
+        keep = np.array([len(t) > 1 and t not in stop_words for t in self.terms_[order]], dtype=bool)
+        order = order[keep]
+        frequency = np.asarray(self.counts_.sum(axis=0)).ravel()[order]
+        best = order[np.argsort(-frequency, kind="stable")[:k]]
+        return sorted(self.terms_[best])
+
+
+def check_text_index(descriptions: pd.Series, n_words: int = 20):
+    """
+    Compara l'índex amb el procés del notebook (clean_text, CountVectorizer i
+    un `apply` per paraula) i mostra el temps de cada un.
+    """
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, CountVectorizer
+
+    from src.features import BEST_WORDS, clean_text
+
+    console.rule("[title]Índex de paraules de la descripció[/title]")
+    stop_words = sorted(ENGLISH_STOP_WORDS)
+
+    start = time.perf_counter()
+    cleaned = descriptions.apply(clean_text)
+    vectorizer = CountVectorizer(stop_words=stop_words, max_features=n_words)
+    vectorizer.fit_transform(cleaned)
+    frequent = list(vectorizer.get_feature_names_out())
+    words = list(dict.fromkeys(frequent + BEST_WORDS))
+    expected = pd.DataFrame({f"contains_{w}": cleaned.apply(lambda x: 1 if w in x else 0) for w in words})
+    notebook_time = time.perf_counter() - start
+
+    timings = {}
+    for n_jobs in (1, -1):
+        start = time.perf_counter()
+        index = TokenIndex(n_jobs=n_jobs).fit(descriptions)
+        top = index.top_k(n_words, stop_words)
+        flags = index.contains(list(dict.fromkeys(top + BEST_WORDS)))
+        timings[n_jobs] = time.perf_counter() - start
+
+    assert top == frequent, (top, frequent)
+    assert (flags.toarray() == expected.to_numpy()).all()
+    console.print("[success]Mateixes paraules freqüents i mateixes columnes 'contains_'[/success]")
+
+    start = time.perf_counter()
+    hashed = TokenIndex(n_features=2 ** 18).fit(descriptions)
+    hashed.counts(BEST_WORDS)
+    hashing_time = time.perf_counter() - start
+
+    console.print(f"[info]{len(descriptions)} descripcions.[/info] Notebook: {notebook_time:.2f} s, "
+                  f"índex: {timings[1]:.2f} s (1 procés), {timings[-1]:.2f} s (tots els nuclis), "
+                  f"hashing: {hashing_time:.2f} s")
+    console.print(f"[info]Vocabulari:[/info] {len(index.vocabulary_)} paraules, "
+                  f"matriu de {index.counts_.data.nbytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_text_index(df["Job Description"])
@@ -0,0 +1,220 @@
+"""
+titles.py
+
+Classificació del 'Job Title' en senioritat i rol.
+
+`extract_seniority` i `extract_role` (features.py, com al notebook) passen
+cada títol a minúscules i el comparen amb cada paraula clau per separat. Aquí
+totes les paraules clau de les dues classificacions es compilen en una sola
+expressió regular: una passada de `finditer` per títol dona el conjunt de
+paraules que hi apareixen, i la senioritat i el rol surten de les mateixes
+regles que les funcions originals (la primera regla amb alguna paraula
+trobada).
+
+Cada títol diferent es classifica un sol cop (també entre crides) i el
+resultat es copia a totes les files amb el mateix títol, així que el temps
+depèn del nombre de títols diferents i no del de files.
+"""
+
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.log_config import console
+from src.features import SENIORITY_MAPPING, SENIORITY_ORDER
+
+
+# Paraula clau: (text, opcions). 'i': sense distingir majúscules (com
+# `title.lower()`); 'b': paraula sencera (`\b...\b`).
+SENIORITY_RULES = [
+    ("manager", [("director", "i"), ("manegement", "i"), ("head", "i"), ("vp", "i"), ("manager", "i"),
+                 ("lead", "i"), (" iv", "i"), ("iv ", "i"), ("IV", "b")]),
+    ("senior", [("senior", "i"), ("sr ", "i"), ("principal", "i"), ("iii", "i"), ("specialist", "i")]),
+    ("mid", [("ii", "i")]),
+    ("junior", [("junior", "i"), ("jr ", "i"), ("entry level", "i"), ("intern", "i"), ("summer", "i"),
+                ("associate", "i"), ("I", "b")]),
+]
+SENIORITY_DEFAULT = "mid"
+
+ROLE_RULES = [
+    # rols especifics
+    ("data_scientist", [("data scientist", "ib"), ("data engineer", "ib"), ("developer", "i")]),
+    ("data_warehouse", [("data warehouse", "ib"), ("etl", "i"), ("integration", "i")]),
+    # rols de negoci
+    ("financial_analyst", [("financial", "i"), ("pricing", "i"), ("accounting", "i"), ("revenue", "i")]),
+    ("marketing_analyst", [("marketing", "i"), ("product", "i")]),
+    ("business_analyst", [("business analyst", "i")]),
+    # rols especialitzats
+    ("data_quality", [("quality", "i")]),
+    ("data_governance", [("governance", "i"), ("steward", "i"), ("lineage", "i")]),
+    ("data_reporting", [("report", "i"), ("visualization", "i")]),
+    ("data_management", [("management analyst", "i"), ("management", "i")]),
+    ("healthcare_analyst", [("health", "i"), ("clinical", "i"), ("patient", "i"), ("epidemiology", "i"),
+                            ("healthcare", "i")]),
+    ("security_analyst", [("security", "i"), ("risk", "i"), ("protection", "i")]),
+    ("sql_analyst", [("sql", "i")]),
+    # rols generals
+    ("data_analyst", [("data analyst", "i")]),
+]
+ROLE_DEFAULT = "other"
+
+ROLES = [role for role, _ in ROLE_RULES] + [ROLE_DEFAULT]
+
+# Màxim de títols a la memòria (quan s'omple es buida)
+MEMO_SIZE = 1 << 16
+
+
+def _pattern(text: str, options: str) -> str:
+    pattern = re.escape(text)
+    if "b" in options:
+        pattern = rf"\b{pattern}\b"
+    return f"(?i:{pattern})" if "i" in options else pattern
+
+
+class TitleClassifier:
+    """Senioritat i rol dels títols amb una sola expressió regular i memòria per títol."""
+
+    def __init__(self, seniority_rules=SENIORITY_RULES, role_rules=ROLE_RULES):
+        self.seniority_rules = [(label, set(keywords)) for label, keywords in seniority_rules]
+        self.role_rules = [(label, set(keywords)) for label, keywords in role_rules]
+
+        keywords = list(dict.fromkeys(k for _, ks in [*seniority_rules, *role_rules] for k in ks))
+        # Les més llargues primer: si dues comencen a la mateixa posició, una
+        # és prefix de l'altra i es comprova a part (`_nested`)
+        keywords.sort(key=lambda k: -len(k[0]))
+        self._keywords = keywords
+        self._regex = re.compile("(?=(?:" + "|".join(
+            f"(?P<k{i}>{_pattern(*k)})" for i, k in enumerate(keywords)) + "))")
+        self._single = [re.compile(_pattern(*k)) for k in keywords]
+        self._nested = [
+            [j for j, other in enumerate(keywords)
+             if j != i and len(other[0]) < len(k[0]) and k[0].lower().startswith(other[0].lower())]
+            for i, k in enumerate(keywords)
+        ]
+        self._memo = {}
+
+    def keywords(self, title: str) -> set:
+        """Paraules clau que apareixen al títol."""
+        found = set()
+        for match in self._regex.finditer(title):
+            i = int(match.lastgroup[1:])
+            found.add(self._keywords[i])
+            start = match.start()
+            for j in self._nested[i]:
+                if self._single[j].match(title, start):
+                    found.add(self._keywords[j])
+        return found
+
+    @staticmethod
+    def _first(rules, found: set, default: str) -> str:
+        for label, keywords in rules:
+            if keywords & found:
+                return label
+        return default
+
+    def classify_one(self, title: str) -> tuple:
+        """(senioritat, rol) d'un títol, com (`extract_seniority`, `extract_role`)."""
+        result = self._memo.get(title)
+        if result is None:
+            found = self.keywords(title)
+            result = (self._first(self.seniority_rules, found, SENIORITY_DEFAULT),
+                      self._first(self.role_rules, found, ROLE_DEFAULT))
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[title] = result
+        return result
+
+    def seniority(self, title: str) -> str:
+        return self.classify_one(title)[0]
+
+    def role(self, title: str) -> str:
+        return self.classify_one(title)[1]
+
+    def classify(self, titles, one_hot: bool = False) -> pd.DataFrame:
+        """
+        'Seniority' i 'Role' (categòriques) i 'Seniority_code' de cada títol.
+        Amb `one_hot` també les columnes 'Seniority_<x>' i 'Role_<x>' (0/1)
+        amb totes les categories, encara que no apareguin.
+        """
+        titles = pd.Series(titles) if not isinstance(titles, pd.Series) else titles
+        codes, uniques = pd.factorize(titles)
+        labels = np.array([self.classify_one(t) for t in uniques], dtype=object).reshape(len(uniques), 2)
+
+        seniority_categories = pd.Index(SENIORITY_ORDER)
+        role_categories = pd.Index(ROLES)
+        seniority_codes = seniority_categories.get_indexer(labels[:, 0])[codes]
+        role_codes = role_categories.get_indexer(labels[:, 1])[codes]
+        # Títols nuls: sense categoria
+        seniority_codes[codes < 0] = -1
+        role_codes[codes < 0] = -1
+
+        seniority = pd.Categorical.from_codes(seniority_codes, SENIORITY_ORDER)
+        out = pd.DataFrame({
+            "Seniority": seniority,
+            "Seniority_code": pd.Series(seniority).map(SENIORITY_MAPPING).to_numpy(dtype=float),
+            "Role": pd.Categorical.from_codes(role_codes, ROLES),
+        }, index=titles.index)
+
+        if one_hot:
+            blocks = [out]
+            for name, values, categories in [("Seniority", seniority_codes, SENIORITY_ORDER),
+                                             ("Role", role_codes, ROLES)]:
+                onehot = np.zeros((len(values), len(categories)), dtype=np.uint8)
+                valid = values >= 0
+                onehot[np.flatnonzero(valid), values[valid]] = 1
+                blocks.append(pd.DataFrame(onehot, index=titles.index,
+                                           columns=[f"{name}_{c}" for c in categories]))
+            out = pd.concat(blocks, axis=1)
+        return out
+
+
+# Classificador compartit (la memòria de títols es reaprofita entre crides)
+TITLES = TitleClassifier()
+
+
+def check_titles(titles: pd.Series, repeat: int = 100):
+    """
+    Compara el classificador amb `extract_seniority` / `extract_role` per a
+    cada títol diferent i mesura el temps amb `repeat` còpies de la columna.
+    """
+    from src.features import extract_role, extract_seniority
+
+    console.rule("[title]Classificació dels títols[/title]")
+    titles = titles.dropna()
+    uniques = titles.unique()
+    classifier = TitleClassifier()
+    for title in uniques:
+        expected = (extract_seniority(title), extract_role(title))
+        assert classifier.classify_one(title) == expected, (title, expected)
+    console.print(f"[success]Mateixa senioritat i rol que el notebook[/success] ({len(uniques)} títols)")
+
+    # Casos amb paraules que comencen a la mateixa posició
+    for title in ["Data Analyst IV", "Analyst III", "Sr Data Analyst I", "Healthcare Data Analyst",
+                  "Management Analyst II", "Data Scientist/Engineer", "ETL Developer", "Intern - I"]:
+        assert classifier.classify_one(title) == (extract_seniority(title), extract_role(title)), title
+
+    big = pd.concat([titles] * repeat, ignore_index=True)
+    start = time.perf_counter()
+    expected = pd.DataFrame({"Seniority": big.apply(extract_seniority), "Role": big.apply(extract_role)})
+    row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = TitleClassifier().classify(big, one_hot=True)
+    classifier_time = time.perf_counter() - start
+    assert (result["Seniority"].astype(str) == expected["Seniority"]).all()
+    assert (result["Role"].astype(str) == expected["Role"]).all()
+    console.print(f"[info]{len(big)} files, {len(uniques)} títols diferents:[/info] "
+                  f"fila a fila {row_time:.2f} s, classificador {classifier_time:.3f} s")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_titles(df["Job Title"])
@@ -0,0 +1,277 @@
+"""
+training.py
+
+Entrenament conjunt dels objectius de salari.
+
+El notebook Modelitzacio.ipynb repeteix tot el procés (divisió, normalització,
+comparació de models i GridSearchCV) un cop per a 'min_salary' i un altre per a
+'max_salary'. Aquí els objectius s'entrenen alhora amb una sola divisió i una
+sola normalització. Els models lineals i el KNN accepten diversos objectius
+directament: es fa una sola factorització (o una sola cerca de veïns) per a
+tots i cada objectiu obté el mateix resultat que entrenat per separat. El
+RandomForest entrena un sol bosc per a tots els objectius (cada tall minimitza
+l'error conjunt, així que el resultat no és idèntic al de boscos separats). La
+resta de models s'embolcallen amb MultiOutputRegressor.
+"""
+
+import itertools
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from joblib import delayed
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LinearRegression, Ridge, Lasso
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.neighbors import KNeighborsRegressor
+
+from config.log_config import console
+from config.tracing import traced
+from src.encoding import TARGETS
+from src.fit_cache import array_hash, cached_fit, cached_parallel
+from src.models import NUM_COLS, get_models, train
+
+
+# Models que accepten una matriu d'objectius amb un sol ajust
+MULTI_OUTPUT = (LinearRegression, Ridge, Lasso, KNeighborsRegressor, RandomForestRegressor)
+
+# Graelles del notebook (primera ronda)
+PARAM_GRIDS = {
+    "KNN": {"n_neighbors": [3, 5, 7, 9, 15], "weights": ["uniform", "distance"], "p": [1, 2]},
+    "RandomForest": {"n_estimators": [100, 200, 300], "max_depth": [None, 10, 20, 30],
+                     "min_samples_split": [2, 5, 10], "min_samples_leaf": [1, 2, 4]},
+    "GradientBoosting": {"n_estimators": [100, 200, 300], "learning_rate": [0.01, 0.05, 0.1],
+                         "max_depth": [2, 3, 4], "subsample": [0.6, 0.8, 1.0]},
+    "Ridge": {"alpha": [0.01, 0.1, 1, 10, 100]},
+    "Lasso": {"alpha": [0.0001, 0.001, 0.01, 0.1, 1]},
+}
+
+# Segona ronda del notebook
+PARAM_GRIDS_REFINED = {
+    "KNN": {"n_neighbors": [15, 20, 25, 30, 40, 50], "weights": ["uniform", "distance"], "p": [1, 2]},
+    "RandomForest": {"n_estimators": [200, 300, 400], "max_depth": [5, 10, 15, 20],
+                     "min_samples_split": [2, 3, 4, 6], "min_samples_leaf": [2, 4, 6]},
+    "GradientBoosting": {"n_estimators": [300, 400, 500], "learning_rate": [0.005, 0.01, 0.02],
+                         "max_depth": [4, 5, 6], "subsample": [0.6, 0.8, 1.0]},
+    "Ridge": {"alpha": [100, 200, 300, 500, 800, 1000]},
+    "Lasso": {"alpha": [1, 2, 5, 10, 20, 50]},
+}
+
+
+# Graelles per defecte de `train_all_targets`: els models ràpids. Les de
+# RandomForest i GradientBoosting (189 combinacions x 5 folds) s'han de
+# demanar passant `PARAM_GRIDS`.
+FAST_GRIDS = {name: PARAM_GRIDS[name] for name in ("Ridge", "Lasso", "KNN")}
+
+
+def multi_target(model):
+    """Còpia de `model` que prediu diversos objectius alhora."""
+    model = clone(model)
+    return model if isinstance(model, MULTI_OUTPUT) else MultiOutputRegressor(model)
+
+
+def train_targets(model, X, Y, scale_cols=NUM_COLS, feature_names=None):
+    """
+    Com `train`, però amb Y de forma (files, objectius) i un sol ajust. Amb un
+    sol objectiu el model s'entrena amb un vector (com espera sklearn) i
+    prediu un vector: qui crida fa `reshape(len(X), -1)`.
+    """
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim == 2 and Y.shape[1] == 1:
+        return train(model, X, Y.ravel(), scale_cols, feature_names)
+    return train(multi_target(model), X, Y, scale_cols, feature_names)
+
+
+def target_metrics(Y_true, Y_pred, targets=TARGETS) -> pd.DataFrame:
+    """MAE, RMSE i R² de cada objectiu."""
+    Y_true, Y_pred = np.asarray(Y_true).reshape(len(Y_true), -1), np.asarray(Y_pred).reshape(len(Y_pred), -1)
+    return pd.DataFrame([{
+        "Objectiu": target,
+        "MAE": mean_absolute_error(Y_true[:, i], Y_pred[:, i]),
+        "RMSE": np.sqrt(mean_squared_error(Y_true[:, i], Y_pred[:, i])),
+        "R2": r2_score(Y_true[:, i], Y_pred[:, i]),
+    } for i, target in enumerate(targets)])
+
+
+def _fit_fold(model, params, X, Y, train_idx, test_idx, scale_cols, feature_names):
+    fitted = train_targets(clone(model).set_params(**params), X[train_idx], Y[train_idx],
+                           scale_cols, feature_names)
+    pred = fitted.predict(X[test_idx]).reshape(len(test_idx), -1)
+    return np.abs(pred - Y[test_idx]).mean(axis=0)
+
+
+def grid_search_targets(model, param_grid: dict, X, Y, targets=TARGETS, cv: int = 5,
+                        scale_cols=NUM_COLS, feature_names=None, n_jobs: int = -1, cache=None):
+    """
+    GridSearchCV per MAE de tots els objectius alhora: cada (paràmetres, fold)
+    s'entrena un sol cop i se'n treu l'error de cada objectiu.
+
+    Ridge i Lasso amb només una graella d'alphas fan servir el camí de
+    regularització (src.regularization) en lloc d'entrenar cada alpha. Amb
+    `cache` (FitCache) la MAE de cada (paràmetres, fold) es llegeix del disc si
+    ja s'havia calculat.
+
+    Returns:
+        (best, scores): `best` és {objectiu: (paràmetres, MAE)} i `scores` un
+        DataFrame amb la MAE mitjana de cada combinació i objectiu.
+    """
+    if set(param_grid) == {"alpha"} and type(model) in (Ridge, Lasso):
+        from src.regularization import lasso_cv_path, ridge_path
+
+        if type(model) is Ridge:
+            return ridge_path(X, Y, param_grid["alpha"], targets, cv, scale_cols, feature_names)
+        return lasso_cv_path(X, Y, param_grid["alpha"], targets, cv, scale_cols, feature_names,
+                             max_iter=model.max_iter, tol=model.tol)
+
+    Y = np.asarray(Y, dtype=float).reshape(len(Y), -1)
+    names = list(param_grid)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+    folds = list(KFold(n_splits=cv).split(X))
+
+    keys = []
+    if cache is not None:
+        data = (array_hash(X), array_hash(Y), list(scale_cols), feature_names)
+        keys = [cache.key("mae", clone(model).set_params(**params), data, train_idx, test_idx)
+                for params in candidates for train_idx, test_idx in folds]
+    errors = cached_parallel(cache, keys, [
+        delayed(_fit_fold)(model, params, X, Y, train_idx, test_idx, scale_cols, feature_names)
+        for params in candidates for train_idx, test_idx in folds
+    ], n_jobs)
+    mae = np.array(errors).reshape(len(candidates), len(folds), -1).mean(axis=1)
+
+    scores = pd.DataFrame(mae, columns=list(targets))
+    scores.insert(0, "Hiperparàmetres", candidates)
+    best = {target: (candidates[int(np.argmin(mae[:, i]))], float(mae[:, i].min()))
+            for i, target in enumerate(targets)}
+    return best, scores
+
+
+def compare_targets(models: dict, X, Y, targets=TARGETS, cv: int = 5,
+                    scale_cols=NUM_COLS, feature_names=None, n_jobs: int = -1, cache=None) -> pd.DataFrame:
+    """MAE de validació creuada (KFold 5 com al notebook) de cada model i objectiu."""
+    from src.evaluation import METRICS, evaluate_models
+
+    results, _ = evaluate_models(models, X, Y, cv, {"MAE": METRICS["MAE"]}, list(targets),
+                                 scale_cols, feature_names, n_jobs, cache)
+    return results.pivot(index="Model", columns="Objectiu", values="MAE_mean") \
+        .loc[list(models), list(targets)].rename_axis(columns=None).reset_index()
+
+
+@traced()
+def train_all_targets(X, Y, targets=TARGETS, models=None, param_grids=None,
+                      feature_names=None, test_size: float = 0.3, random_state: int = 0, cache=None):
+    """
+    Flux complet del notebook per a tots els objectius alhora: divisió,
+    comparació de models, cerca d'hiperparàmetres i avaluació final de cada
+    objectiu amb els seus millors hiperparàmetres.
+
+    Args:
+        param_grids (dict, optional): Graelles per model. Per defecte
+            `FAST_GRIDS` (Ridge, Lasso i KNN). Amb `PARAM_GRIDS` es cerquen
+            també RandomForest i GradientBoosting com al notebook, amb un
+            cost molt més gran.
+
+    Returns:
+        dict amb 'comparison', 'search' ({model: {objectiu: (paràmetres, MAE)}}),
+        'pipelines' ({objectiu: pipeline}) i 'metrics' (test per objectiu).
+    """
+    models = models if models is not None else get_models()
+    param_grids = param_grids if param_grids is not None else FAST_GRIDS
+    Y = np.asarray(Y, dtype=float).reshape(len(Y), -1)
+    X_train, X_test, Y_train, Y_test = train_test_split(X, Y, test_size=test_size, random_state=random_state)
+
+    comparison = compare_targets(models, X_train, Y_train, targets, feature_names=feature_names, cache=cache)
+    search = {name: grid_search_targets(models[name], grid, X_train, Y_train, targets,
+                                        feature_names=feature_names, cache=cache)[0]
+              for name, grid in param_grids.items()}
+
+    # Millor (model, paràmetres) per objectiu. Els objectius que comparteixen
+    # la mateixa elecció s'entrenen junts.
+    choice = {}
+    for i, target in enumerate(targets):
+        name = min(search, key=lambda m: search[m][target][1])
+        choice.setdefault((name, repr(search[name][target][0])), []).append(i)
+
+    pipelines, pred = {}, np.empty_like(Y_test)
+    for (name, _), columns in choice.items():
+        params = search[name][targets[columns[0]]][0]
+        fitted = cached_fit(cache, clone(models[name]).set_params(**params), X_train, Y_train[:, columns],
+                            NUM_COLS, feature_names)
+        pred[:, columns] = fitted.predict(X_test).reshape(len(X_test), -1)
+        for i in columns:
+            pipelines[targets[i]] = fitted
+
+    return {
+        "comparison": comparison,
+        "search": search,
+        "pipelines": pipelines,
+        "metrics": target_metrics(Y_test, pred, targets),
+    }
+
+
+def check_joint_training(df: pd.DataFrame):
+    """
+    Compara el temps de dues passades separades (min i max, com al notebook)
+    amb l'entrenament conjunt dels tres objectius i comprova que la cerca
+    dona els mateixos hiperparàmetres per objectiu.
+
+    Les dues bandes fan servir `FAST_GRIDS`: el bosc conjunt no dona el
+    mateix resultat que boscos separats.
+    """
+    from rich.table import Table
+
+    from src.encoding import FeatureEncoder
+    from src.features import salary_targets
+
+    console.rule("[title]Entrenament conjunt dels objectius[/title]")
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+    df = df[df["Salary Estimate"] != "-1"]
+    encoder = FeatureEncoder().fit(df)
+    X, names = encoder.transform(df), encoder.feature_names_
+    Y = salary_targets(df)[TARGETS].to_numpy()
+
+    start = time.perf_counter()
+    grids = FAST_GRIDS
+    separate = {}
+    for i, target in enumerate(["min_salary", "max_salary"]):
+        X_train, _, Y_train, _ = train_test_split(X, Y[:, [i]], test_size=0.3, random_state=0)
+        compare_targets(get_models(), X_train, Y_train, [target], feature_names=names)
+        for name, grid in grids.items():
+            best, _ = grid_search_targets(get_models()[name], grid, X_train, Y_train,
+                                          [target], feature_names=names)
+            separate[(name, target)] = best[target]
+    separate_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = train_all_targets(X, Y, param_grids=grids, feature_names=names)
+    joint_time = time.perf_counter() - start
+
+    for (name, target), (params, mae) in separate.items():
+        joint_params, joint_mae = result["search"][name][target]
+        assert joint_params == params and np.isclose(joint_mae, mae, rtol=1e-4), (name, target)
+    console.print("[success]Mateixos hiperparàmetres que entrenant cada objectiu per separat[/success]")
+
+    table = Table(title="Mètriques de test per objectiu", show_lines=True)
+    for col in ["Objectiu", "MAE", "RMSE", "R2"]:
+        table.add_column(col, style="cyan")
+    for row in result["metrics"].itertuples(index=False):
+        table.add_row(row.Objectiu, f"{row.MAE:.2f}", f"{row.RMSE:.2f}", f"{row.R2:.3f}")
+    console.print(table)
+    console.print(f"[info]Dues passades (min, max):[/info] {separate_time:.1f} s")
+    console.print(f"[info]Conjunt (min, max, avg):[/info] {joint_time:.1f} s")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        df = pd.read_csv(sys.argv[1])
+    else:
+        from data.data import load_data
+        df = load_data()
+    check_joint_training(df)
@@ -0,0 +1,469 @@
+"""
+workflow.py
+
+Executor incremental del flux dels notebooks:
+
+    EDA.ipynb
+    Preprocessing.ipynb -> data_preprocessed.csv -> Modelitzacio.ipynb
+        -> data_predicted.csv -> AnalisiFinal.ipynb
+
+Cada pas és una `Task` amb les tasques de les quals depèn. La sortida de cada
+tasca es desa com a artefacte a `data/cache/workflow/` (`WORKFLOW_DIR`):
+Feather si és un DataFrame i pickle si no. El nom de l'artefacte porta una
+clau (blake2b) de:
+
+- el nom i els paràmetres de la tasca (el CSV d'entrada pel contingut),
+- el codi font del mòdul de la funció i de tots els mòduls del projecte
+  (`src`, `data`, `config`) que importa, directament o a través d'altres
+  mòduls, incloent-hi els imports dins de funcions,
+- les claus de les tasques d'entrada.
+
+Els imports de la funció de la tasca es llegeixen del seu codi (no de tot el
+mòdul), així que un canvi a `src/eda.py` no torna a executar l'entrenament.
+
+Si l'artefacte ja existeix la tasca no s'executa (per a les tasques que
+retornen fitxers, només si els fitxers encara hi són). Un canvi en el CSV o en el
+codi d'un pas canvia la seva clau i, per tant, la de tots els passos
+posteriors, que són els únics que es tornen a calcular.
+
+Les tasques que no depenen l'una de l'altra (l'EDA i la neteja) s'executen
+alhora, cada una en un procés: llegeixen les entrades dels artefactes i
+escriuen la sortida al seu.
+
+    python -m src.workflow DataAnalyst.csv
+    python -m src.workflow DataAnalyst.csv --targets preprocessed --export .
+"""
+
+import ast
+import functools
+import hashlib
+import importlib.util
+import inspect
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from config.log_config import console, Table
+from data.cache import CACHE_DIR, HAS_ARROW, file_hash, read_cache, write_cache
+
+
+WORKFLOW_DIR = Path(os.environ.get("WORKFLOW_DIR", CACHE_DIR / "workflow"))
+
+# Paquets del projecte: els seus mòduls entren a la clau de les tasques
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PROJECT_PACKAGES = ("src", "data", "config")
+
+
+@dataclass
+class Task:
+    """
+    Pas del flux.
+
+    Args:
+        name (str): Nom de la tasca (i de l'artefacte).
+        func (Callable): Funció de mòdul (s'executa en un altre procés). Rep
+            les sortides de `inputs`, en ordre, i `params` com a arguments amb nom.
+        inputs (list): Tasques de les quals depèn.
+        params (dict): Paràmetres. Els `Path` entren a la clau pel contingut.
+        code (list): Mòduls addicionals que no es poden trobar pels imports
+            (p. ex. importats amb `importlib`). Els importats es detecten sols.
+        files (bool): La tasca retorna una llista de fitxers. L'artefacte
+            només es reaprofita si tots encara existeixen.
+    """
+    name: str
+    func: Callable
+    inputs: list = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+    code: list = field(default_factory=list)
+    files: bool = False
+
+
+
+
+def _source_file(module: str):
+    """Fitxer d'un mòdul del projecte (sense importar-lo), o None."""
+    if module.split(".")[0] not in PROJECT_PACKAGES:
+        return None
+    base = PROJECT_ROOT.joinpath(*module.split("."))
+    for path in (base.with_suffix(".py"), base / "__init__.py"):
+        if path.is_file():
+            return path
+    return None
+
+
+def _module_hash(module: str) -> str:
+    path = _source_file(module) or getattr(sys.modules.get(module), "__file__", None)
+    if path is None or not os.path.isfile(path):
+        return module
+    return file_hash(Path(path))
+
+
+def _is_main_guard(node) -> bool:
+    return (isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+            and isinstance(node.test.left, ast.Name) and node.test.left.id == "__name__")
+
+
+def _imports(tree, package: str) -> set:
+    """Mòduls del projecte importats a `tree` (sense el bloc `if __name__ == ...`)."""
+    found = set()
+    nodes = [tree]
+    while nodes:
+        node = nodes.pop()
+        if _is_main_guard(node):
+            continue
+        nodes.extend(ast.iter_child_nodes(node))
+        if isinstance(node, ast.Import):
+            found.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = importlib.util.resolve_name("." * node.level + (node.module or ""), package) \
+                if node.level else node.module
+            found.add(base)
+            # `from src import encoding` importa el submòdul
+            found.update(f"{base}.{alias.name}" for alias in node.names)
+    return {m for m in found if m and _source_file(m) is not None}
+
+
+def _package(module: str, path: Path) -> str:
+    return module if path.name == "__init__.py" else module.rpartition(".")[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _module_imports(module: str) -> frozenset:
+    path = _source_file(module)
+    if path is None:
+        return frozenset()
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return frozenset(_imports(tree, _package(module, path)))
+
+
+def code_modules(func) -> list:
+    """
+    Mòduls del projecte dels quals depèn `func`: el seu mòdul, els imports
+    del cos de la funció i del nivell de mòdul, i els imports d'aquests
+    (tot el fitxer, també dins de funcions), recursivament.
+    """
+    func = getattr(func, "func", func)                       # functools.partial
+    module = func.__module__
+    source = Path(inspect.getsourcefile(func))
+    package = _package(module, source)
+    tree = ast.parse(source.read_text(encoding="utf-8"))
+    top_level = ast.Module(body=[n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))],
+                           type_ignores=[])
+    body = ast.parse(inspect.cleandoc("\n" + inspect.getsource(func)))
+
+    seen = {module}
+    pending = list(_imports(top_level, package) | _imports(body, package))
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        pending.extend(_module_imports(name))
+    return sorted(seen)
+
+
+def _param_token(value) -> str:
+    if isinstance(value, Path):
+        return file_hash(value) if value.is_file() else str(value)
+    return repr(value)
+
+
+def task_key(task: Task, input_keys: list) -> str:
+    """Clau de l'artefacte d'una tasca (vegeu el mòdul)."""
+    func = getattr(task.func, "func", task.func)           # functools.partial
+    modules = sorted(set(code_modules(func)) | set(task.code))
+    digest = hashlib.blake2b(task.name.encode(), digest_size=16)
+    parts = [
+        f"{func.__module__}.{func.__qualname__}",
+        *[_module_hash(m) for m in modules],
+        *[f"{k}={_param_token(v)}" for k, v in sorted(task.params.items())],
+        *input_keys,
+    ]
+    for part in parts:
+        digest.update(b"\0" + part.encode())
+    return digest.hexdigest()
+
+
+def _artifact(directory: Path, name: str, key: str):
+    """Artefacte existent d'una tasca amb aquesta clau, o None."""
+    for suffix in (".feather", ".pkl"):
+        path = directory / f"{name}-{key}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def _reusable(task: Task, path: Path) -> bool:
+    """Per a les tasques que retornen fitxers, comprova que encara existeixen."""
+    return not task.files or all(Path(p).exists() for p in load_artifact(path))
+
+
+def load_artifact(path: Path):
+    path = Path(path)
+    if path.suffix == ".feather":
+        return read_cache(path)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def save_artifact(value, directory: Path, name: str, key: str) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    if isinstance(value, pd.DataFrame) and HAS_ARROW:
+        path = directory / f"{name}-{key}.feather"
+        # Feather només accepta un índex per defecte i noms de columna de text
+        write_cache(value.reset_index(drop=True), path)
+        return path
+    path = directory / f"{name}-{key}.pkl"
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+
+def _execute(task: Task, input_paths: list, directory: Path, key: str):
+    """Executa una tasca (en un procés del pool o en el mateix). Retorna (ruta, segons)."""
+    start = time.perf_counter()
+    inputs = [load_artifact(path) for path in input_paths]
+    value = task.func(*inputs, **task.params)
+    path = save_artifact(value, directory, task.name, key)
+    return path, time.perf_counter() - start
+
+
+def _plan(tasks: list, targets=None) -> list:
+    """Tasques necessàries per als objectius, en ordre topològic."""
+    by_name = {t.name: t for t in tasks}
+    order, state = [], {}
+
+    def visit(name, path=()):
+        if name not in by_name:
+            raise KeyError(f"Tasca desconeguda: {name}")
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Cicle al flux: {' -> '.join((*path, name))}")
+        state[name] = "visiting"
+        for dep in by_name[name].inputs:
+            visit(dep, (*path, name))
+        state[name] = "done"
+        order.append(by_name[name])
+
+    for name in targets or [t.name for t in tasks]:
+        visit(name)
+    return order
+
+
+def run_workflow(tasks: list, targets=None, directory: Path = WORKFLOW_DIR, workers: int = None,
+                 force=()) -> dict:
+    """
+    Executa les tasques necessàries per obtenir `targets` (per defecte, totes).
+
+    Args:
+        directory (Path): Directori dels artefactes.
+        workers (int): Processos per a les tasques independents. Amb 1
+            s'executen en ordre en aquest mateix procés.
+        force (list): Tasques a executar encara que tinguin artefacte.
+
+    Returns:
+        dict {tasca: ruta de l'artefacte}.
+    """
+    directory = Path(directory)
+    order = _plan(tasks, targets)
+    keys, paths, status = {}, {}, {}
+    for task in order:
+        keys[task.name] = task_key(task, [keys[d] for d in task.inputs])
+        path = None if task.name in force else _artifact(directory, task.name, keys[task.name])
+        if path is not None and _reusable(task, path):
+            paths[task.name] = path
+            status[task.name] = ("reaprofitat", 0.0)
+
+    pending = [t for t in order if t.name not in paths]
+    workers = workers or min(len(pending), os.cpu_count() or 1) or 1
+
+    console.rule("[title]Flux de treball[/title]")
+    if workers == 1:
+        for task in pending:
+            console.print(f"[info]Executant:[/info] {task.name}")
+            paths[task.name], seconds = _execute(task, [paths[d] for d in task.inputs], directory,
+                                                 keys[task.name])
+            status[task.name] = ("executat", seconds)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            running = {}
+            while pending or running:
+                # Llançar totes les tasques amb les entrades ja disponibles
+                for task in [t for t in pending if all(d in paths for d in t.inputs)]:
+                    console.print(f"[info]Executant:[/info] {task.name}")
+                    future = pool.submit(_execute, task, [paths[d] for d in task.inputs], directory,
+                                         keys[task.name])
+                    running[future] = task
+                    pending.remove(task)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    paths[task.name], seconds = future.result()
+                    status[task.name] = ("executat", seconds)
+
+    print_status(order, status, paths)
+    return paths
+
+
+def print_status(order: list, status: dict, paths: dict):
+    table = Table(title="Tasques", show_lines=True)
+    for col, style in [("Tasca", "cyan"), ("Estat", None), ("Temps (s)", "magenta"), ("Artefacte", None)]:
+        table.add_column(col, style=style)
+    for task in order:
+        state, seconds = status[task.name]
+        color = "green" if state == "executat" else "yellow"
+        table.add_row(task.name, f"[{color}]{state}[/{color}]", f"{seconds:.2f}", paths[task.name].name)
+    console.print(table)
+
+
+# Tasques del flux dels notebooks
+def raw_data(path: Path) -> pd.DataFrame:
+    from data.data import load_data
+    return load_data(path)
+
+
+def eda_reports(raw: pd.DataFrame) -> list:
+    """Pàgines de distribució i informe de correlacions (EDA.ipynb). Retorna els fitxers."""
+    from src.eda import EDA_COLUMNS, EDA_DIR, initial_correlations, plot_column_distribution
+
+    pages = plot_column_distribution(raw, EDA_COLUMNS, max_per_page=2)
+    initial_correlations(raw)
+    return [str(p) for p in pages] + [str(EDA_DIR / "simple_correlation_report.txt")]
+
+
+def preprocessed_data(raw: pd.DataFrame) -> pd.DataFrame:
+    """Variables codificades i objectius de les ofertes amb salari (data_preprocessed.csv)."""
+    from src.encoding import TARGETS, FeatureEncoder
+    from src.features import salary_targets
+
+    labelled = raw[raw["Salary Estimate"] != "-1"]
+    features = FeatureEncoder().fit(labelled).transform_frame(labelled, compact=True)
+    targets = salary_targets(labelled)[TARGETS].reset_index(drop=True)
+    return pd.concat([targets, features], axis=1)
+
+
+def trained_models(preprocessed: pd.DataFrame, test_size: float = 0.3, random_state: int = 0,
+                   full_grids: bool = False) -> dict:
+    """
+    Selecció de models, hiperparàmetres i entrenament final (Modelitzacio.ipynb).
+    Amb `full_grids` es cerquen també RandomForest i GradientBoosting.
+    """
+    import warnings
+
+    from sklearn.exceptions import ConvergenceWarning
+
+    from src.encoding import TARGETS
+    from src.training import PARAM_GRIDS, train_all_targets
+
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+    X = preprocessed.drop(columns=TARGETS)
+    return train_all_targets(X.to_numpy(dtype=float), preprocessed[TARGETS].to_numpy(dtype=float),
+                             param_grids=PARAM_GRIDS if full_grids else None,
+                             feature_names=list(X.columns), test_size=test_size, random_state=random_state)
+
+
+def _test_split(preprocessed: pd.DataFrame, test_size: float, random_state: int):
+    """(X_test, Y_test) amb la mateixa divisió que `train_all_targets`."""
+    from sklearn.model_selection import train_test_split
+
+    from src.encoding import TARGETS
+
+    X = preprocessed.drop(columns=TARGETS).to_numpy(dtype=float)
+    Y = preprocessed[TARGETS].to_numpy(dtype=float)
+    _, X_test, _, Y_test = train_test_split(X, Y, test_size=test_size, random_state=random_state)
+    return X_test, Y_test
+
+
+def predicted_data(preprocessed: pd.DataFrame, models: dict, test_size: float = 0.3,
+                   random_state: int = 0) -> pd.DataFrame:
+    """Salari real i predit del conjunt de test (data_predicted.csv)."""
+    from src.encoding import TARGETS
+
+    X_test, Y_test = _test_split(preprocessed, test_size, random_state)
+    pipelines = models["pipelines"]
+    columns, predictions = {}, {}
+    for i, target in enumerate(TARGETS):
+        pipeline = pipelines[target]
+        if id(pipeline) not in predictions:
+            predictions[id(pipeline)] = np.asarray(pipeline.predict(X_test)).reshape(len(X_test), -1)
+        # Els objectius entrenats junts comparteixen pipeline, amb una columna
+        # per objectiu en l'ordre de TARGETS
+        shared = [t for t in TARGETS if pipelines[t] is pipeline]
+        columns[f"real_{target}"] = Y_test[:, i]
+        columns[f"pred_{target}"] = predictions[id(pipeline)][:, shared.index(target)]
+    return pd.DataFrame(columns)
+
+
+def final_report(predicted: pd.DataFrame) -> pd.DataFrame:
+    """Mètriques de test per objectiu i ofertes amb el salari mitjà dins de l'interval real (AnalisiFinal.ipynb)."""
+    from src.training import target_metrics
+
+    targets = [c[len("real_"):] for c in predicted.columns if c.startswith("real_")]
+    report = target_metrics(predicted[[f"real_{t}" for t in targets]].to_numpy(),
+                            predicted[[f"pred_{t}" for t in targets]].to_numpy(), targets)
+    if {"avg_salary", "min_salary", "max_salary"} <= set(targets):
+        inside = predicted["pred_avg_salary"].between(predicted["real_min_salary"], predicted["real_max_salary"])
+        console.print(f"[info]Salari mitjà predit dins de l'interval real:[/info] {inside.mean():.1%}")
+    return report
+
+
+def notebook_workflow(csv_path, full_grids: bool = False) -> list:
+    """Tasques del flux dels notebooks a partir del CSV de DataAnalyst."""
+    return [
+        Task("raw", raw_data, params={"path": Path(csv_path)}),
+        Task("eda", eda_reports, ["raw"], files=True),
+        Task("preprocessed", preprocessed_data, ["raw"]),
+        Task("models", trained_models, ["preprocessed"], params={"full_grids": full_grids}),
+        Task("predicted", predicted_data, ["preprocessed", "models"]),
+        Task("report", final_report, ["predicted"]),
+    ]
+
+
+# Artefactes que es poden exportar amb el nom de fitxer que fan servir els notebooks
+EXPORTS = {"preprocessed": "data_preprocessed.csv", "predicted": "data_predicted.csv"}
+
+
+def export_artifacts(paths: dict, out_dir: Path):
+    out_dir = Path(out_dir)
+    for name, filename in EXPORTS.items():
+        if name in paths:
+            load_artifact(paths[name]).to_csv(out_dir / filename, index=False)
+            console.print(f"[info]{name} exportat a:[/info] {out_dir / filename}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Flux dels notebooks amb artefactes reaprofitables")
+    parser.add_argument("csv", nargs="?", default=os.environ.get("DATA_ANALYST_CSV"), help="DataAnalyst.csv")
+    parser.add_argument("--targets", nargs="+", help="Tasques a obtenir (per defecte, totes)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", nargs="+", default=(), help="Tasques a executar encara que no canviïn")
+    parser.add_argument("--export", help="Directori on escriure data_preprocessed.csv i data_predicted.csv")
+    parser.add_argument("--full-grids", action="store_true",
+                        help="Cercar també RandomForest i GradientBoosting (molt més lent)")
+    args = parser.parse_args(argv)
+    if not args.csv:
+        parser.error("Cal indicar el CSV (o la variable DATA_ANALYST_CSV)")
+
+    paths = run_workflow(notebook_workflow(args.csv, args.full_grids), args.targets, workers=args.workers, force=args.force)
+    if "report" in paths:
+        console.print(load_artifact(paths["report"]).to_string(index=False))
+    if args.export:
+        export_artifacts(paths, args.export)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
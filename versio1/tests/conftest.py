@@ -0,0 +1,15 @@
+import pandas as pd
+import pytest
+
+from benchmarks.generator import write_postings
+
+
+@pytest.fixture(scope="session")
+def postings_csv(tmp_path_factory):
+    """CSV d'ofertes sintètiques amb les columnes de DataAnalyst.csv."""
+    return write_postings(tmp_path_factory.mktemp("dades") / "ofertes.csv", 600, seed=0)
+
+
+@pytest.fixture
+def postings(postings_csv):
+    return pd.read_csv(postings_csv)
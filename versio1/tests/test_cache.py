@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+pytest.importorskip("pyarrow")
+
+from data.cache import cache_path, read_csv_cached
+from src.dtypes import compact_dtypes
+
+
+def test_cached_read_matches_csv(postings_csv, postings, tmp_path):
+    first = read_csv_cached(postings_csv, tmp_path)
+    assert cache_path(postings_csv, tmp_path).exists()
+    second = read_csv_cached(postings_csv, tmp_path)
+    assert_frame_equal(first, postings)
+    assert_frame_equal(second, postings)
+
+
+def test_categories_only_after_compact(postings_csv, tmp_path):
+    read_csv_cached(postings_csv, tmp_path)
+    cached = read_csv_cached(postings_csv, tmp_path)
+    assert not any(isinstance(dtype, pd.CategoricalDtype) for dtype in cached.dtypes)
+    assert any(isinstance(dtype, pd.CategoricalDtype) for dtype in compact_dtypes(cached).dtypes)
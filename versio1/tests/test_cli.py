@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from main import build_parser
+from src.preprocessing import preprocessing
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Executa la subordre i falla si ha carregat scikit-learn, matplotlib o seaborn
+LIGHT = ("import sys, main; main.main(sys.argv[1:]); "
+         "assert not {'sklearn', 'matplotlib', 'seaborn'} & set(sys.modules), 'mòduls innecessaris'")
+
+
+@pytest.fixture
+def run(tmp_path):
+    """Executa `main.py` en un procés nou, amb les memòries cau dins de `tmp_path`."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "DATA_CACHE_DIR": str(tmp_path / "cache"),
+           "MODEL_CACHE_DIR": str(tmp_path / "cache" / "models"), "MPLBACKEND": "Agg"}
+
+    def run(*argv, code=None):
+        command = ["-c", code, *map(str, argv)] if code else [str(ROOT / "main.py"), *map(str, argv)]
+        return subprocess.run([sys.executable, *command], cwd=tmp_path, env=env,
+                              capture_output=True, text=True, check=True)
+    return run
+
+
+def test_parser_requires_a_command():
+    with pytest.raises(SystemExit):
+        build_parser().parse_args([])
+    args = build_parser().parse_args(["train", "ofertes.csv", "--model", "m.pkl", "--select"])
+    assert (args.csv, args.model, args.select, args.full_grids) == ("ofertes.csv", "m.pkl", True, False)
+
+
+def test_describe_does_not_import_sklearn(run, postings_csv):
+    out = run("describe", postings_csv, "--chunksize", 200, code=LIGHT).stdout
+    assert "Atributs numèrics" in out
+
+
+def test_preprocess_writes_clean_csv(run, postings_csv, postings, tmp_path):
+    run("preprocess", postings_csv, "-o", tmp_path / "net.csv")
+    expected = preprocessing(postings)
+    expected.to_csv(tmp_path / "esperat.csv", index=False)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "net.csv"), pd.read_csv(tmp_path / "esperat.csv"))
+
+
+def test_train_then_predict(run, postings_csv, tmp_path):
+    run("--trace", "train", postings_csv, "--model", tmp_path / "model.pkl")
+    run("predict", postings_csv, tmp_path / "prediccions.csv", "--model", tmp_path / "model.pkl", code=LIGHT)
+    predictions = pd.read_csv(tmp_path / "prediccions.csv")
+    assert len(predictions) == 600
+    assert {"min_salary", "max_salary"} <= set(predictions.columns)
+    assert predictions[["min_salary", "max_salary"]].notna().all().all()
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.correlation import TEXT_DTYPES, cramers_v_matrix
+from src.dtypes import compact_dtypes
+from src.eda import cramers_v
+
+
+@pytest.fixture
+def categorical(postings):
+    # Sense 'Job Description' (un valor diferent per oferta): el bucle és lent
+    return postings.drop(columns="Job Description").select_dtypes(include=TEXT_DTYPES)
+
+
+def _loop(df):
+    return pd.DataFrame({c1: [cramers_v(df[c1], df[c2]) for c2 in df.columns] for c1 in df.columns},
+                        index=df.columns)
+
+
+def test_matrix_matches_pairwise_loop(categorical):
+    expected = _loop(categorical)
+    result = cramers_v_matrix(categorical, max_categories=None, n_jobs=1)
+    np.testing.assert_allclose(result.loc[expected.index, expected.columns], expected, atol=1e-9)
+
+
+def test_parallel_matches_serial(categorical):
+    pd.testing.assert_frame_equal(cramers_v_matrix(categorical, n_jobs=2), cramers_v_matrix(categorical, n_jobs=1))
+
+
+def test_text_and_category_columns_selected(postings):
+    text = cramers_v_matrix(postings, n_jobs=1)
+    compact = cramers_v_matrix(compact_dtypes(postings), n_jobs=1)
+    assert len(text.columns) > 0
+    pd.testing.assert_frame_equal(compact, text)
+
+
+def test_high_cardinality_columns_skipped_or_hashed(postings):
+    skipped = cramers_v_matrix(postings, max_categories=50, n_jobs=1)
+    hashed = cramers_v_matrix(postings, max_categories=50, high_cardinality="hash", n_jobs=1)
+    assert "Job Description" not in skipped.columns
+    assert "Job Description" in hashed.columns
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_series_equal
+
+from src.dtypes import compact_dtypes
+from src.encoding import FeatureEncoder
+from src.preprocessing import preprocessing
+
+
+def _as_object(values: pd.Series) -> pd.Series:
+    return values.astype(object).where(values.notna(), None)
+
+
+def test_compact_keeps_values(postings):
+    compact = compact_dtypes(postings)
+    assert compact.memory_usage(deep=True).sum() < postings.memory_usage(deep=True).sum()
+    for col in postings.columns:
+        assert_series_equal(_as_object(compact[col]), _as_object(postings[col]))
+
+
+def test_preprocessing_same_on_compact_frame(postings):
+    expected = preprocessing(postings)
+    result = preprocessing(compact_dtypes(postings))
+    assert list(result.columns) == list(expected.columns)
+    for col in expected.columns:
+        if pd.api.types.is_numeric_dtype(expected[col]):
+            # Les columnes originals ja entren compactes
+            assert_series_equal(result[col], expected[col], check_dtype=col not in postings.columns)
+        else:
+            assert_series_equal(_as_object(result[col]), _as_object(expected[col]))
+
+
+def test_compact_encoded_matrix_is_exact(postings):
+    encoded = FeatureEncoder().fit(postings).transform_frame(postings)
+    narrow = compact_dtypes(encoded)
+    assert np.array_equal(narrow.to_numpy(dtype=float), encoded.to_numpy())
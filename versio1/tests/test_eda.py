@@ -0,0 +1,51 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from src.eda import column_summary, plot_column_distribution
+
+
+# Columnes amb poques etiquetes perquè el dibuix sigui ràpid
+COLUMNS = ["Rating", "Founded", "Type of ownership", "Size", "Easy Apply"]
+
+
+def _render(df, out_dir, **kwargs):
+    return plot_column_distribution(df, COLUMNS, out_dir=out_dir, dpi=40, n_jobs=1, **kwargs)
+
+
+def test_no_figures_left_open(postings, tmp_path):
+    pages = _render(postings, tmp_path)
+    assert len(pages) == -(-len(COLUMNS) // 2)
+    assert all(p.exists() for p in pages)
+    assert not plt.get_fignums()
+
+
+def test_unchanged_pages_are_skipped(postings, tmp_path):
+    pages = _render(postings, tmp_path)
+    mtimes = [p.stat().st_mtime_ns for p in pages]
+    _render(postings, tmp_path)
+    assert [p.stat().st_mtime_ns for p in pages] == mtimes
+
+    # Només es torna a dibuixar la pàgina de la columna que canvia
+    changed = postings.assign(Rating=postings["Rating"] + 1)
+    _render(changed, tmp_path)
+    redrawn = [p.stat().st_mtime_ns != m for p, m in zip(pages, mtimes)]
+    assert redrawn == [i == COLUMNS.index("Rating") // 2 for i in range(len(pages))]
+
+
+def test_summary_matches_pandas(postings):
+    bar = column_summary(postings["Sector"])
+    assert bar["kind"] == "bar"
+    assert bar["counts"].equals(postings["Sector"].value_counts())
+
+    hist = column_summary(postings["Founded"])
+    assert hist["kind"] == "hist"
+    counts, edges = np.histogram(postings["Founded"].dropna(), bins=20)
+    assert np.array_equal(hist["counts"], counts) and np.array_equal(hist["edges"], edges)
+    assert hist["nulls"] == int(postings["Founded"].isna().sum())
+
+
+def test_text_columns_as_category(postings):
+    categories = postings.astype({"Sector": "category", "Size": "string"})
+    assert column_summary(categories["Sector"])["kind"] == "bar"
+    assert column_summary(categories["Size"])["kind"] == "bar"
@@ -0,0 +1,46 @@
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.exceptions import DataConversionWarning
+from sklearn.metrics import make_scorer
+from sklearn.model_selection import KFold, cross_val_score
+from sklearn.pipeline import make_pipeline
+
+from src.encoding import FeatureEncoder
+from src.evaluation import METRICS, cross_val_predictions, evaluate_models
+from src.features import salary_targets
+from src.models import NUM_COLS, ColumnScaler, column_positions, get_models
+
+
+KF = KFold(n_splits=5, shuffle=True, random_state=42)
+
+
+@pytest.fixture
+def data(postings):
+    labelled = postings[postings["Salary Estimate"] != "-1"]
+    encoder = FeatureEncoder().fit(labelled)
+    return encoder.transform(labelled), salary_targets(labelled), encoder.feature_names_
+
+
+@pytest.mark.parametrize("name", list(get_models()))
+def test_single_target_fits_a_vector(data, name):
+    X, targets, names = data
+    Y = targets[["min_salary"]].to_numpy()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DataConversionWarning)
+        pred, folds = cross_val_predictions(get_models()[name], X, Y, KF, feature_names=names, n_jobs=1)
+    assert pred.shape == Y.shape
+    assert not np.isnan(pred).any()
+
+
+def test_matches_cross_val_score(data):
+    X, targets, names = data
+    y = targets["min_salary"].to_numpy()
+    models = {name: model for name, model in get_models().items() if name in ("Ridge", "KNN")}
+    results, _ = evaluate_models(models, X, y, KF, targets=["min_salary"], feature_names=names, n_jobs=1)
+    for row in results.itertuples(index=False):
+        pipeline = make_pipeline(ColumnScaler(column_positions(NUM_COLS, names)), models[row.Model])
+        expected = -cross_val_score(pipeline, X, y, cv=KF,
+                                    scoring=make_scorer(METRICS["MAE"], greater_is_better=False)).mean()
+        assert np.isclose(row.MAE_mean, expected, rtol=1e-6), row.Model
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.neighbors import KNeighborsRegressor
+
+from src.encoding import FeatureEncoder
+from src.evaluation import evaluate_models
+from src.features import salary_targets
+from src.fit_cache import FitCache, cached_fit
+
+
+MODELS = {"Ridge": Ridge(alpha=10), "KNN": KNeighborsRegressor()}
+
+
+@pytest.fixture
+def data(postings):
+    labelled = postings[postings["Salary Estimate"] != "-1"]
+    encoder = FeatureEncoder().fit(labelled)
+    return encoder.transform(labelled), salary_targets(labelled)["min_salary"].to_numpy(), encoder.feature_names_
+
+
+def _evaluate(data, cache):
+    X, y, names = data
+    results, oof = evaluate_models(MODELS, X, y, feature_names=names, n_jobs=1, cache=cache)
+    return results, oof
+
+
+def test_cached_results_match_uncached(data, tmp_path):
+    expected, expected_oof = _evaluate(data, None)
+    cache = FitCache(tmp_path)
+    first, _ = _evaluate(data, cache)
+    assert cache.hits == 0
+    second, second_oof = _evaluate(data, cache)
+    assert cache.hits == cache.misses
+    assert first.equals(expected)
+    assert second.equals(expected)
+    for name, (pred, folds) in expected_oof.items():
+        np.testing.assert_array_equal(second_oof[name][0], pred)
+        np.testing.assert_array_equal(second_oof[name][1], folds)
+
+
+def test_key_changes_with_params_and_data(data):
+    X, y, _ = data
+    key = FitCache.key("fit", Ridge(alpha=1), X, y)
+    assert key == FitCache.key("fit", Ridge(alpha=1), X.copy(), y.copy())
+    assert key != FitCache.key("fit", Ridge(alpha=2), X, y)
+    assert key != FitCache.key("fit", Ridge(alpha=1), X, y + 1)
+
+
+def test_cached_fit_returns_stored_model(data, tmp_path):
+    X, y, names = data
+    cache = FitCache(tmp_path)
+    fitted = cached_fit(cache, Ridge(), X, y, [], names)
+    again = cached_fit(cache, Ridge(), X, y, [], names)
+    assert cache.hits == 1
+    np.testing.assert_array_equal(again.predict(X), fitted.predict(X))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = FitCache(tmp_path)
+    for i in range(10):
+        cache.put(f"{i:040d}", np.zeros(10_000))
+        path = cache._file(f"{i:040d}")
+        os.utime(path, (i, i))
+    cache.get(f"{0:040d}")          # la lectura la fa la més recent
+    small = FitCache(tmp_path, max_mb=cache.size_mb() / 2)
+    small._evict()
+    assert small.evictions == 6
+    assert small.size_mb() <= small.max_bytes / 1e6
+    assert cache._file(f"{0:040d}").exists()
+    assert not cache._file(f"{1:040d}").exists()
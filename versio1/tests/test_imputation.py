@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import map_industry
+from src.imputation import GroupImputer, _notebook_imputation, size_bin
+from src.parsing import company_age, map_unique, size_mean
+
+
+@pytest.fixture
+def data(postings):
+    return postings.assign(**{
+        "Company Age": company_age(postings["Founded"]).astype(float),
+        "Size mean": size_mean(postings["Size"]),
+        "Industry_Group": map_unique(postings["Industry"], map_industry),
+    })
+
+
+def _as_object(values: pd.Series) -> pd.Series:
+    return values.astype(object).where(values.notna(), None)
+
+
+@pytest.mark.parametrize("column", ["Company Age", "Headquarters", "Sector"])
+def test_imputer_matches_notebook(data, column):
+    expected = _notebook_imputation(data)
+    result = GroupImputer().fit_transform(data)
+    pd.testing.assert_series_equal(_as_object(result[column]), _as_object(expected[column]))
+
+
+def test_saved_imputer_fills_new_batch(data, tmp_path):
+    imputer = GroupImputer()
+    result = imputer.fit_transform(data)
+    imputer.save(tmp_path / "imputer.pkl")
+    batch = data.sample(frac=0.2, random_state=0)
+    assert GroupImputer.load(tmp_path / "imputer.pkl").transform(batch).equals(result.loc[batch.index])
+
+
+def test_size_bin_matches_cut(data):
+    _, edges = pd.qcut(data["Size mean"], q=6, duplicates="drop", retbins=True)
+    values = np.append(data["Size mean"].to_numpy(), [edges[0] - 1, edges[-1] + 1])
+    expected = pd.cut(values, edges, labels=False, include_lowest=True)
+    np.testing.assert_array_equal(size_bin(values, edges), expected)
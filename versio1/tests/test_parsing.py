@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_series_equal
+
+from src.parsing import (
+    company_age, parse_founded, parse_revenue, parse_salary, parse_size, revenue_mean,
+    salary_columns, size_mean,
+)
+
+
+EDGE_VALUES = {
+    "Salary Estimate": ["$37K-$66K (Glassdoor est.)", "Employer Provided Salary:$80K-$100K",
+                        "$20-$30 Per Hour(Glassdoor est.)", "-1", "$37K-$66K (Glassdoor est.)"],
+    "Size": ["201 to 500 employees", "10000+ employees", "Unknown / Non-Applicable", "-1", "-1"],
+    "Revenue": ["$100 to $500 million (USD)", "$2 to $5 billion (USD)", "$500 million to $1 billion (USD)",
+                "Less than $1 million (USD)", "Unknown / Non-Applicable", "-1"],
+    "Founded": [1990, -1, 2010, None, 1990],
+}
+
+COLUMNAR = [
+    ("Size", parse_size, size_mean),
+    ("Revenue", parse_revenue, revenue_mean),
+    ("Founded", parse_founded, company_age),
+]
+
+
+def _legacy_salary(salary: pd.Series) -> pd.DataFrame:
+    legacy = pd.DataFrame(index=salary.index)
+    legacy["min_salary"], legacy["max_salary"] = zip(*salary.apply(parse_salary))
+    legacy["avg_salary"] = (legacy["min_salary"] + legacy["max_salary"]) / 2
+    return legacy
+
+
+def test_salary_columns_match_row_by_row(postings):
+    salary = salary_columns(postings["Salary Estimate"])
+    legacy = _legacy_salary(postings["Salary Estimate"])
+    for col in ("min_salary", "max_salary"):
+        assert_series_equal(salary[col], legacy[col])
+    assert_series_equal(salary["avg_salary"], legacy["avg_salary"], check_names=False)
+
+
+def test_salary_edge_values():
+    values = pd.Series(EDGE_VALUES["Salary Estimate"])
+    salary = salary_columns(values)
+    legacy = _legacy_salary(values)
+    for col in ("min_salary", "max_salary"):
+        assert_series_equal(salary[col], legacy[col])
+
+
+@pytest.mark.parametrize("col, scalar, columnar", COLUMNAR, ids=[c for c, _, _ in COLUMNAR])
+def test_columnar_parser_matches_row_by_row(postings, col, scalar, columnar):
+    assert_series_equal(columnar(postings[col]), postings[col].apply(scalar))
+
+
+@pytest.mark.parametrize("col, scalar, columnar", COLUMNAR, ids=[c for c, _, _ in COLUMNAR])
+def test_columnar_parser_edge_values(col, scalar, columnar):
+    values = pd.Series(EDGE_VALUES[col])
+    assert_series_equal(columnar(values), values.apply(scalar))
+
+
+@pytest.mark.parametrize("col, columnar", [("Salary Estimate", salary_columns)]
+                         + [(c, f) for c, _, f in COLUMNAR])
+def test_categorical_input_gives_same_result(postings, col, columnar):
+    result = columnar(postings[col].astype("category"))
+    expected = columnar(postings[col])
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(result, expected)
+    else:
+        assert_series_equal(result, expected)
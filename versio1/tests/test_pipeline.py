@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src.pipeline import Stage, run_stages
+from src.preprocessing import (clean_founded, clean_revenue, clean_salary, clean_sector, clean_size,
+                               clean_type_of_ownership, drop_variables, preprocessing)
+
+
+def _chained(df: pd.DataFrame) -> pd.DataFrame:
+    """La cadena de `clean_*` que feia servir `preprocessing()` abans de les etapes."""
+    for step in (clean_salary, clean_founded, clean_size, clean_revenue, clean_type_of_ownership,
+                 clean_sector, drop_variables):
+        df = step(df)
+    return df
+
+
+def test_stages_match_chained_cleaning(postings):
+    assert_frame_equal(preprocessing(postings), _chained(postings))
+
+
+def test_output_does_not_share_memory(postings):
+    original = postings.copy()
+    result = preprocessing(postings)
+    for col in result.columns.intersection(postings.columns):
+        if pd.api.types.is_numeric_dtype(result[col]):
+            assert not np.shares_memory(result[col].to_numpy(), postings[col].to_numpy()), col
+    result.iloc[:, :] = result.iloc[::-1].to_numpy()
+    assert_frame_equal(postings, original)
+
+
+def test_undeclared_writes_are_rejected(postings):
+    stage = Stage("extra", lambda df: {"a": df["Rating"], "b": df["Rating"]}, ["Rating"], ["a"])
+    with pytest.raises(ValueError):
+        run_stages(postings, [stage])
+
+
+def test_undeclared_reads_are_rejected(postings):
+    stage = Stage("extra", lambda df: {"a": df["Size"]}, ["Rating"], ["a"])
+    with pytest.raises(KeyError):
+        run_stages(postings, [stage])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from src.predictor import SalaryPredictor, train_predictor
+
+
+@pytest.fixture
+def trained(postings):
+    return train_predictor(postings)
+
+
+def _labelled(df):
+    return df[df["Salary Estimate"] != "-1"]
+
+
+def _single(predictor, df):
+    return [predictor.predict_one(posting) for posting in df.to_dict("records")]
+
+
+def test_predict_one_matches_pipelines(postings, trained):
+    predictor, encoder, pipelines = trained
+    labelled = _labelled(postings)
+    X = encoder.transform(labelled)
+    single = _single(predictor, labelled)
+    for target, pipeline in pipelines.items():
+        np.testing.assert_allclose([s[target] for s in single], pipeline.predict(X), rtol=0, atol=1e-6)
+
+
+def test_predict_one_matches_batch_predict(postings, trained):
+    predictor, _, _ = trained
+    batch = predictor.predict(postings)
+    single = _single(predictor, postings)
+    for target in predictor.targets:
+        np.testing.assert_allclose([s[target] for s in single], batch[target], rtol=0, atol=1e-6)
+
+
+def test_unseen_companies_without_founded(postings, trained):
+    # Empreses noves sense any de fundació: l'edat surt del grup de mida
+    predictor, _, _ = trained
+    new = postings.head(100).assign(**{"Company Name": [f"Nova {i}" for i in range(100)], "Founded": -1})
+    batch = predictor.predict(new)
+    single = _single(predictor, new)
+    for target in predictor.targets:
+        np.testing.assert_allclose([s[target] for s in single], batch[target], rtol=0, atol=1e-6)
+
+
+def test_saved_predictor_predicts_the_same(postings, trained, tmp_path):
+    predictor, _, _ = trained
+    path = tmp_path / "model.pkl"
+    predictor.save(path)
+    loaded = SalaryPredictor.load(path)
+    postings = postings.head(50)
+    assert _single(loaded, postings) == _single(predictor, postings)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.profile import SENTINELS, DataProfile, _sentinel_label, profile_csv, profile_path
+
+
+def _expected(df: pd.DataFrame) -> pd.DataFrame:
+    """Les comparacions columna a columna de `data_description` i `check_missing`."""
+    expected = {}
+    for col in df.columns:
+        expected[col] = {"Únics": df[col].nunique(), "Nuls": df[col].isnull().sum()}
+        for value in SENTINELS:
+            expected[col][_sentinel_label(value)] = (df[col] == value).sum()
+        expected[col]["Absents"] = expected[col]["Nuls"] + (df[col] == -1).sum() + (df[col] == "-1").sum()
+    return pd.DataFrame.from_dict(expected, orient="index")
+
+
+def _text_dtypes(df: pd.DataFrame) -> dict:
+    return {col: str for col in df.columns if not pd.api.types.is_numeric_dtype(df[col])}
+
+
+def test_profile_matches_column_loop(postings):
+    expected = _expected(postings)
+    result = DataProfile.from_frame(postings).to_frame().set_index("Atribut")[expected.columns]
+    assert np.array_equal(result.to_numpy(), expected.to_numpy())
+
+
+@pytest.mark.parametrize("chunksize", [7, 64, 599])
+def test_chunked_matches_whole(postings_csv, postings, chunksize):
+    text = _text_dtypes(postings)
+    chunked = profile_csv(postings_csv, chunksize=chunksize, cache=False, dtype=text)
+    whole = DataProfile.from_frame(pd.read_csv(postings_csv, dtype=text))
+    pd.testing.assert_frame_equal(chunked.to_frame(), whole.to_frame())
+
+
+def test_int_and_float_chunks_merge(postings):
+    # Un bloc amb NaN es llegeix com a float i un altre com a enter
+    ratings = postings[["Rating"]].assign(Rating=[np.nan, *range(len(postings) - 1)])
+    whole = DataProfile.from_frame(ratings)
+    merged = DataProfile.from_frame(ratings.iloc[:10]).merge(
+        DataProfile.from_frame(ratings.iloc[10:].astype({"Rating": int})))
+    assert merged.columns["Rating"].unique == whole.columns["Rating"].unique
+
+
+def test_profile_is_saved_next_to_cache(postings_csv, tmp_path):
+    first = profile_csv(postings_csv, cache_dir=tmp_path)
+    assert profile_path(postings_csv, tmp_path).exists()
+    pd.testing.assert_frame_equal(profile_csv(postings_csv, cache_dir=tmp_path).to_frame(), first.to_frame())
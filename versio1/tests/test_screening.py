@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from sklearn.feature_selection import f_regression
+
+from src.features import BEST_WORDS, clean_text, salary_targets, state_and_city
+from src.screening import EXCLUDED, anova, screen, screen_indicators, screen_nested
+
+
+@pytest.fixture
+def clean(postings):
+    return postings.join(salary_targets(postings)).dropna(subset=["avg_salary"])
+
+
+def _f_oneway(values: pd.Series, y: pd.Series, min_size: int = 2):
+    counts = values.value_counts()
+    groups = [y[values == g] for g in counts[counts >= min_size].index if g not in EXCLUDED]
+    return stats.f_oneway(*groups)
+
+
+@pytest.mark.parametrize("column", ["Sector", "Type of ownership", "Size", "Rating"])
+def test_anova_matches_f_oneway(clean, column):
+    data = clean.dropna(subset=[column])
+    result = anova(data[column].to_numpy(), data["avg_salary"].to_numpy())
+    expected = _f_oneway(data[column], data["avg_salary"])
+    assert np.isclose(result["F"], expected.statistic)
+    assert np.isclose(result["P-value"], expected.pvalue, rtol=1e-6, atol=1e-300)
+
+
+def test_screen_skips_constant_columns(clean):
+    result = screen(clean.assign(constant=1))
+    assert "constant" not in set(result["Variable"])
+    assert result["R²"].is_monotonic_decreasing
+
+
+def test_indicators_match_f_regression(clean):
+    cleaned = clean["Job Description"].apply(clean_text)
+    flags = np.column_stack([cleaned.str.contains(w, regex=False) for w in BEST_WORDS]).astype(float)
+    result = screen_indicators(flags, clean["avg_salary"], BEST_WORDS).set_index("word")
+    f_stat, p_value = f_regression(flags, clean["avg_salary"])
+    for j, word in enumerate(BEST_WORDS):
+        if word in result.index:
+            assert np.isclose(result.loc[word, "F"], f_stat[j]), word
+            assert np.isclose(result.loc[word, "p_value"], p_value[j]), word
+
+
+def test_nested_matches_loop_per_state(clean):
+    data = clean.assign(State=state_and_city(clean["Location"])[0])
+    nested = screen_nested(data, "State", "Location")
+    assert len(nested) > 0
+    for row in nested.itertuples(index=False):
+        state = data[data["State"] == row.State]
+        expected = _f_oneway(state["Location"], state["avg_salary"])
+        assert np.isclose(row.P_value, expected.pvalue), row.State
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsRegressor
+
+from src.encoding import FeatureEncoder
+from src.features import salary_targets
+from src.search import successive_halving
+
+
+GRID = {"n_neighbors": [3, 5, 9, 15, 25, 40], "weights": ["uniform", "distance"]}
+
+
+@pytest.fixture
+def data(postings):
+    labelled = postings[postings["Salary Estimate"] != "-1"]
+    encoder = FeatureEncoder().fit(labelled)
+    return encoder.transform(labelled), salary_targets(labelled)["min_salary"].to_numpy(), encoder.feature_names_
+
+
+def _search(data, **kwargs):
+    X, y, names = data
+    return successive_halving({"KNN": (KNeighborsRegressor(), GRID)}, X, y, feature_names=names,
+                              n_jobs=1, **kwargs)
+
+
+def test_full_search_reaches_all_rows(data):
+    ranking, results = _search(data)
+    assert ranking["Complet"].iloc[0]
+    assert ranking["Model"].eq("KNN").all()
+
+
+@pytest.mark.parametrize("max_fits", [1, 7, 23])
+def test_budget_is_never_exceeded(data, max_fits):
+    ranking, results = _search(data, max_fits=max_fits)
+    assert len(results) == max_fits
+    # Al rànquing només hi ha candidats amb els 5 folds avaluats
+    assert len(ranking) == max_fits // 5
+
+
+def test_second_search_reuses_results(data):
+    _, results = _search(data)
+    n = len(results)
+    ranking, again = _search(data, results=results)
+    assert len(again) == n
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, CountVectorizer
+
+from src.features import BEST_WORDS, clean_text
+from src.text import TokenIndex, tokenize
+
+
+EXTRA = pd.Series(["Café 3D-modelling, SQL!", "", np.nan, "Team  TEAM\tteam", "naïve résumé 2024"])
+
+
+@pytest.fixture
+def descriptions(postings):
+    return pd.concat([postings["Job Description"], EXTRA], ignore_index=True)
+
+
+def test_tokenize_matches_clean_text(descriptions):
+    for text in descriptions.dropna():
+        assert tokenize(text) == clean_text(text).split()
+
+
+def test_contains_matches_str_contains(descriptions):
+    cleaned = descriptions.fillna("").apply(clean_text)
+    words = BEST_WORDS + ["data", "sql", "ca", "xyzzy"]
+    flags = TokenIndex().fit(descriptions).contains(words).toarray()
+    for j, word in enumerate(words):
+        expected = cleaned.str.contains(word, regex=False).to_numpy()
+        assert np.array_equal(flags[:, j], expected.astype(np.uint8)), word
+
+
+def test_top_k_matches_count_vectorizer(postings):
+    descriptions = postings["Job Description"]
+    stop_words = sorted(ENGLISH_STOP_WORDS)
+    vectorizer = CountVectorizer(stop_words=stop_words, max_features=20).fit(descriptions.apply(clean_text))
+    assert TokenIndex().fit(descriptions).top_k(20, stop_words) == list(vectorizer.get_feature_names_out())
+
+
+def test_chunks_match_single_pass(descriptions):
+    whole = TokenIndex().fit(descriptions)
+    chunked = TokenIndex(chunk_size=37).fit(descriptions)
+    words = sorted(whole.vocabulary_)
+    assert (whole.counts(words) != chunked.counts(words)).nnz == 0
+
+
+def test_hashing_counts_whole_words(descriptions):
+    exact = TokenIndex().fit(descriptions)
+    hashed = TokenIndex(n_features=2 ** 18).fit(descriptions)
+    assert (exact.counts(BEST_WORDS) != hashed.counts(BEST_WORDS)).nnz == 0
+    with pytest.raises(ValueError):
+        hashed.contains(BEST_WORDS, substring=True)
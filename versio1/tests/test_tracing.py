@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from config.tracing import TRACER, Tracer, _env_flag, traced
+from src.preprocessing import clean_salary
+
+
+@pytest.fixture
+def tracer():
+    """El `TRACER` global activat i buit; es restaura en acabar."""
+    enabled = TRACER.enabled
+    TRACER.enable().reset()
+    yield TRACER
+    TRACER.enable(enabled).reset()
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1", True), ("true", True), ("YES", True), (" on ", True),
+    ("0", False), ("false", False), ("no", False), ("", False),
+])
+def test_env_flag(monkeypatch, value, expected):
+    monkeypatch.setenv("PIPELINE_TRACE_TEST", value)
+    assert _env_flag("PIPELINE_TRACE_TEST") is expected
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.stage("etapa", rows=10) as span:
+        span.done([1, 2])
+    assert tracer.records == []
+
+
+def test_traced_stage_records_rows(tracer, postings):
+    result = clean_salary(postings)
+    (record,) = tracer.records
+    assert record["name"] == "clean_salary"
+    assert record["rows_in"] == record["rows_out"] == len(result)
+    assert record["mb_out"] > record["mb_in"]
+    assert record["error"] is None
+
+
+def test_nested_stages_and_errors(tracer):
+    @traced("interna")
+    def failing(df):
+        raise ValueError
+
+    with tracer.stage("externa", rows=5):
+        with pytest.raises(ValueError):
+            failing(None)
+    inner, outer = tracer.records
+    assert (inner["name"], inner["depth"], inner["error"]) == ("interna", 1, "ValueError")
+    assert (outer["name"], outer["depth"], outer["error"]) == ("externa", 0, None)
+    assert outer["rows_per_s"] > 0
+
+
+def test_export_chrome_trace(tracer, tmp_path):
+    with tracer.stage("etapa", rows=3):
+        pass
+    events = json.loads(tracer.export(tmp_path / "trace.json").read_text())["traceEvents"]
+    assert [(e["name"], e["ph"]) for e in events] == [("etapa", "X")]
+    assert events[0]["args"]["rows_in"] == 3
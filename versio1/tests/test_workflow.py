@@ -0,0 +1,105 @@
+import functools
+import shutil
+
+import pandas as pd
+import pytest
+
+import data.data
+from data.cache import read_csv_cached
+from src.workflow import Task, code_modules, load_artifact, notebook_workflow, preprocessed_data, run_workflow
+
+
+CALLS = []
+
+
+def numbers(n: int) -> list:
+    CALLS.append("numbers")
+    return list(range(n))
+
+
+def total(values: list) -> int:
+    CALLS.append("total")
+    return sum(values)
+
+
+def listed_files(values: list, directory: str) -> list:
+    CALLS.append("files")
+    path = f"{directory}/llista.txt"
+    with open(path, "w") as f:
+        f.write(repr(values))
+    return [path]
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    """Memòria cau del CSV a `tmp_path` i recompte d'execucions buit."""
+    monkeypatch.setattr(data.data, "read_csv_cached",
+                        functools.partial(read_csv_cached, cache_dir=tmp_path / "cache"))
+    CALLS.clear()
+
+
+def _tasks(n: int, directory) -> list:
+    return [
+        Task("numbers", numbers, params={"n": n}),
+        Task("total", total, ["numbers"]),
+        Task("files", listed_files, ["numbers"], params={"directory": str(directory)}, files=True),
+    ]
+
+
+def _run(tasks, tmp_path, **kwargs):
+    return run_workflow(tasks, directory=tmp_path / "workflow", workers=1, **kwargs)
+
+
+def test_unchanged_tasks_are_skipped(tmp_path):
+    first = _run(_tasks(5, tmp_path), tmp_path)
+    assert CALLS == ["numbers", "total", "files"]
+    assert load_artifact(first["total"]) == 10
+
+    CALLS.clear()
+    assert _run(_tasks(5, tmp_path), tmp_path) == first
+    assert CALLS == []
+
+
+def test_param_change_reruns_downstream_only(tmp_path):
+    _run(_tasks(5, tmp_path), tmp_path, targets=["total"])
+    CALLS.clear()
+    paths = _run(_tasks(6, tmp_path), tmp_path, targets=["total"])
+    assert CALLS == ["numbers", "total"]
+    assert load_artifact(paths["total"]) == 15
+
+
+def test_missing_files_and_force_rerun(tmp_path):
+    _run(_tasks(5, tmp_path), tmp_path)
+    (tmp_path / "llista.txt").unlink()
+    CALLS.clear()
+    _run(_tasks(5, tmp_path), tmp_path, force=["total"])
+    assert sorted(CALLS) == ["files", "total"]
+
+
+def test_plan_errors(tmp_path):
+    with pytest.raises(KeyError):
+        _run(_tasks(5, tmp_path), tmp_path, targets=["desconeguda"])
+    cycle = [Task("a", numbers, ["b"]), Task("b", total, ["a"])]
+    with pytest.raises(ValueError):
+        _run(cycle, tmp_path)
+
+
+def test_task_code_follows_imports():
+    modules = code_modules(preprocessed_data)
+    assert {"src.workflow", "src.encoding", "src.features"} <= set(modules)
+    assert "src.eda" not in modules
+
+
+def test_notebook_preprocessing_reused_until_csv_changes(postings_csv, postings, tmp_path):
+    csv_path = shutil.copy(postings_csv, tmp_path / "ofertes.csv")
+    first = _run(notebook_workflow(csv_path), tmp_path, targets=["preprocessed"])
+    preprocessed = load_artifact(first["preprocessed"])
+    assert len(preprocessed) == (postings["Salary Estimate"] != "-1").sum()
+
+    mtime = first["preprocessed"].stat().st_mtime_ns
+    assert _run(notebook_workflow(csv_path), tmp_path, targets=["preprocessed"]) == first
+    assert first["preprocessed"].stat().st_mtime_ns == mtime
+
+    postings.iloc[:300].to_csv(csv_path, index=False)
+    changed = _run(notebook_workflow(csv_path), tmp_path, targets=["preprocessed"])
+    assert changed["raw"] != first["raw"] and changed["preprocessed"] != first["preprocessed"]